@@ -23,14 +23,20 @@ from .model import (
 from .ner import (
     Annotation,
     Annotator,
+    DictGrounder,
     GildaGrounder,
     Grounder,
     GrounderHint,
     Match,
     Matcher,
+    annotate_corpus,
+    iter_annotations,
+    iter_corpus_annotations,
     make_grounder,
     read_annotations,
+    read_corpus_annotations,
     write_annotations,
+    write_corpus_annotations,
 )
 from .ontology import write_owl_ttl
 
@@ -39,6 +45,7 @@ __all__ = [
     "PREDICATES",
     "Annotation",
     "Annotator",
+    "DictGrounder",
     "GildaGrounder",
     "Grounder",
     "GrounderHint",
@@ -48,20 +55,25 @@ __all__ = [
     "Matcher",
     "Metadata",
     "Repository",
+    "annotate_corpus",
     "append_literal_mapping",
     "df_to_literal_mappings",
     "get_prefixes",
     "group_literal_mappings",
+    "iter_annotations",
+    "iter_corpus_annotations",
     "lint_literal_mappings",
     "literal_mappings_to_df",
     "literal_mappings_to_gilda",
     "make_grounder",
     "read_annotations",
+    "read_corpus_annotations",
     "read_gilda_terms",
     "read_literal_mappings",
     "read_skos",
     "remap_literal_mappings",
     "write_annotations",
+    "write_corpus_annotations",
     "write_gilda_terms",
     "write_literal_mappings",
     "write_owl_ttl",
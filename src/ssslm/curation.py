@@ -12,7 +12,7 @@ from curies import NamableReference, Reference
 from pydantic import BaseModel, Field
 
 from .model import LiteralMapping, R, lint_literal_mappings, read_literal_mappings
-from .ner import Grounder, make_grounder
+from .ner import FilteredGrounder, Grounder, make_grounder
 from .ontology import write_owl_ttl
 
 __all__ = [
@@ -137,6 +137,19 @@ class Repository(Generic[R]):
             self.get_positive_synonyms(), cast(str | Path, path), metadata=self.metadata, **kwargs
         )
 
-    def make_grounder(self, **kwargs: Any) -> Grounder[R]:
-        """Get a grounder from all positive synonyms."""
-        return make_grounder(self.get_positive_synonyms(), **kwargs)
+    def make_grounder(self, *, filtered: bool = False, **kwargs: Any) -> Grounder[R]:
+        """Get a grounder from all positive synonyms.
+
+        :param filtered: Should the grounder drop matches and annotations for negative
+            synonyms and stop words? If so, wraps the grounder in a
+            :class:`ssslm.ner.FilteredGrounder`.
+        :param kwargs: Keyword arguments passed to :func:`ssslm.make_grounder`
+        """
+        grounder = make_grounder(self.get_positive_synonyms(), **kwargs)
+        if filtered:
+            return FilteredGrounder(
+                grounder=grounder,
+                negatives=self.get_negative_synonyms(),
+                stop_words=self.load_stop_words(),
+            )
+        return grounder
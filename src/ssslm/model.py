@@ -10,6 +10,7 @@ import importlib.util
 import itertools as itt
 from collections import defaultdict
 from collections.abc import Iterable, Mapping, Sequence
+from functools import lru_cache
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
@@ -26,6 +27,7 @@ from typing import (
 from curies import NamableReference, Reference, ReferenceTuple
 from curies import vocabulary as v
 from pydantic import BaseModel, Field
+from pydantic_core import PydanticCustomError, core_schema
 from pydantic_extra_types.language_code import LanguageAlpha2
 from pystow.utils import safe_open, safe_open_writer
 from tqdm import tqdm
@@ -39,6 +41,7 @@ __all__ = [
     "DEFAULT_PREDICATE",
     "PREDICATES",
     "GildaErrorPolicy",
+    "LanguageCode",
     "LiteralMapping",
     "LiteralMappingIndex",
     "LiteralMappingTuple",
@@ -98,6 +101,35 @@ DEFAULT_PREDICATE = v.has_related_synonym
 GildaErrorPolicy: TypeAlias = Literal["ignore", "raise"]
 
 
+class LanguageCode(LanguageAlpha2):
+    """A language code in the ISO 639-1 alpha-2 format.
+
+    This works the same as :class:`pydantic_extra_types.language_code.LanguageAlpha2`,
+    but validates against a lookup table that is precomputed once. Valid codes are
+    memoized, so all literal mappings in the same language share the same object.
+    """
+
+    @classmethod
+    def _validate(cls, input_value: str, /, _: core_schema.ValidationInfo) -> LanguageCode:
+        """Validate a language code using the precomputed lookup table."""
+        try:
+            return _get_language_codes()[input_value]
+        except KeyError:
+            raise PydanticCustomError("language_alpha2", "Invalid language alpha2 code") from None
+
+
+@lru_cache(1)
+def _get_language_codes() -> dict[str, LanguageCode]:
+    """Get a dictionary from ISO 639-1 codes to pre-constructed language codes."""
+    import pycountry
+
+    return {
+        language.alpha_2: str.__new__(LanguageCode, language.alpha_2)
+        for language in pycountry.languages
+        if hasattr(language, "alpha_2")
+    }
+
+
 class LiteralMapping(BaseModel, Generic[R]):
     """A data model for literal mappings."""
 
@@ -113,7 +145,7 @@ class LiteralMapping(BaseModel, Generic[R]):
     ] = DEFAULT_PREDICATE
     text: Annotated[str, Field(description="The object of the literal mapping")]
     language: Annotated[
-        LanguageAlpha2 | None,
+        LanguageCode | None,
         Field(
             description="The language of the synonym. If not given, typically "
             "assumed to be american english.",
@@ -0,0 +1,138 @@
+"""NER utilities build on literal mappings."""
+
+from .api import GrounderHint, make_grounder
+from .api import Implementation as Implementation
+from .base import (
+    ANNOTATION_DTYPE,
+    Annotation,
+    AnnotationTable,
+    Annotator,
+    CacheInfo,
+    Grounder,
+    Match,
+    Matcher,
+    PandasTargetType,
+    RawAnnotation,
+    WrappedMatcher,
+    get_async_executor,
+    set_async_executor,
+)
+from .corpus import annotate_corpus, write_corpus_annotations
+from .dictionary import (
+    DEFAULT_PREDICATE_SCORE,
+    NORMALIZED_MATCH_FACTOR,
+    PREDICATE_SCORES,
+    PREVIOUS_NAME_SCORE,
+    AhoCorasickGrounder,
+    DictGrounder,
+    DictMatcher,
+    RegexTokenizer,
+    Tokenizer,
+    TrieGrounder,
+)
+from .dictionary import _Automaton as _Automaton
+from .dictionary import _normalize as _normalize
+from .dictionary import _normalize_with_offsets as _normalize_with_offsets
+from .embedding import EmbeddingMatcher, Encoder
+from .ensemble import Aggregation, EnsembleMatcher
+from .entity import (
+    GLINER_DEFAULT,
+    SPACY_DISABLE_DEFAULT,
+    DeduplicationInfo,
+    GLiNERGrounder,
+    SpacyGrounder,
+)
+from .entity import _get_windows as _get_windows
+from .entity import _merge_window_entities as _merge_window_entities
+from .fuzzy import FuzzyMatcher
+from .fuzzy import _get_deletes as _get_deletes
+from .fuzzy import _get_edit_distance as _get_edit_distance
+from .gilda import GildaGrounder, GildaMatcher
+from .gilda import _get_gilda_priority_key as _get_gilda_priority_key
+from .gilda import _get_gilda_term_key as _get_gilda_term_key
+from .gilda import _group_duplicate_gilda_terms as _group_duplicate_gilda_terms
+from .gilda import _ScopedGildaEntries as _ScopedGildaEntries
+from .io import (
+    ANNOTATION_COLUMNS,
+    CORPUS_ANNOTATION_COLUMNS,
+    AnnotationFormat,
+    iter_annotations,
+    iter_corpus_annotations,
+    read_annotations,
+    read_corpus_annotations,
+    write_annotations,
+)
+from .minhash import MinHashMatcher
+from .sharded import ShardedGrounder, ShardPartition
+from .sharded import _get_shard_normalizer as _get_shard_normalizer
+from .sharded import _merge_shard_annotations as _merge_shard_annotations
+from .sharded import _merge_shard_matches as _merge_shard_matches
+from .sharded import _partition_literal_mappings as _partition_literal_mappings
+from .tfidf import TfidfMatcher
+from .wrappers import (
+    CachedGrounder,
+    CachedMatcher,
+    ChunkedGrounder,
+    FilteredGrounder,
+    FilteredMatcher,
+)
+from .wrappers import _get_chunks as _get_chunks
+
+__all__ = [
+    "ANNOTATION_COLUMNS",
+    "ANNOTATION_DTYPE",
+    "CORPUS_ANNOTATION_COLUMNS",
+    "DEFAULT_PREDICATE_SCORE",
+    "GLINER_DEFAULT",
+    "NORMALIZED_MATCH_FACTOR",
+    "PREDICATE_SCORES",
+    "PREVIOUS_NAME_SCORE",
+    "SPACY_DISABLE_DEFAULT",
+    "Aggregation",
+    "AhoCorasickGrounder",
+    "Annotation",
+    "AnnotationFormat",
+    "AnnotationTable",
+    "Annotator",
+    "CacheInfo",
+    "CachedGrounder",
+    "CachedMatcher",
+    "ChunkedGrounder",
+    "DeduplicationInfo",
+    "DictGrounder",
+    "DictMatcher",
+    "EmbeddingMatcher",
+    "Encoder",
+    "EnsembleMatcher",
+    "FilteredGrounder",
+    "FilteredMatcher",
+    "FuzzyMatcher",
+    "GLiNERGrounder",
+    "GildaGrounder",
+    "GildaMatcher",
+    "Grounder",
+    "GrounderHint",
+    "Match",
+    "Matcher",
+    "MinHashMatcher",
+    "PandasTargetType",
+    "RawAnnotation",
+    "RegexTokenizer",
+    "ShardPartition",
+    "ShardedGrounder",
+    "SpacyGrounder",
+    "TfidfMatcher",
+    "Tokenizer",
+    "TrieGrounder",
+    "WrappedMatcher",
+    "annotate_corpus",
+    "get_async_executor",
+    "iter_annotations",
+    "iter_corpus_annotations",
+    "make_grounder",
+    "read_annotations",
+    "read_corpus_annotations",
+    "set_async_executor",
+    "write_annotations",
+    "write_corpus_annotations",
+]
@@ -0,0 +1,174 @@
+"""Construct grounders from literal mappings and other objects."""
+
+from __future__ import annotations
+
+import importlib.util
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, TypeAlias, TypeGuard, Union, cast, overload
+
+from curies import NamableReference
+
+from .base import Grounder
+from .dictionary import AhoCorasickGrounder, DictGrounder, TrieGrounder
+from .gilda import GildaGrounder
+from .wrappers import CachedGrounder
+from ..model import LiteralMapping, R, read_literal_mappings
+
+if TYPE_CHECKING:
+    import gilda
+
+__all__ = [
+    "GrounderHint",
+    "make_grounder",
+]
+
+
+Implementation: TypeAlias = Literal["gilda", "dict", "aho-corasick", "trie"]
+
+#: A type for an object can be coerced into a SSSLM-backed grounder via :func:`make_grounder`
+GrounderHint: TypeAlias = Union[
+    Iterable[LiteralMapping[R]], str, Path, "gilda.Grounder", "Grounder[R]"
+]
+
+
+# docstr-coverage:excused `overload`
+@overload
+def make_grounder(
+    grounder_hint: Iterable[LiteralMapping[R]] | Grounder[R],
+    *,
+    implementation: Implementation | None = ...,
+    progress: bool = ...,
+    cache_size: int | None = ...,
+    **kwargs: Any,
+) -> Grounder[R]: ...
+
+
+# docstr-coverage:excused `overload`
+@overload
+def make_grounder(
+    grounder_hint: str | Path | gilda.Grounder,
+    *,
+    implementation: Implementation | None = ...,
+    progress: bool = ...,
+    cache_size: int | None = ...,
+    **kwargs: Any,
+) -> Grounder[NamableReference]: ...
+
+
+def make_grounder(
+    grounder_hint: Iterable[LiteralMapping[R]] | str | Path | gilda.Grounder | Grounder[R],
+    *,
+    implementation: Implementation | None = None,
+    progress: bool = False,
+    cache_size: int | None = None,
+    **kwargs: Any,
+) -> Grounder[NamableReference] | Grounder[R]:
+    """Get a grounder from literal mappings.
+
+    :param grounder_hint: An object that can be coerced into a SSSLM-backed grounder.
+        Can be one of the following:
+
+        1. A URL or file path
+        2. An iterable of literal mappings
+        3. A pre-instantiated grounder or gilda grounder
+    :param implementation: If literal mappings are passed, what kind of grounder to
+        use. Defaults to ``gilda``, which uses :class:`GildaGrounder`. The following
+        dependency-free implementations are also available: ``dict`` for
+        :class:`DictGrounder`, ``aho-corasick`` for :class:`AhoCorasickGrounder`, and
+        ``trie`` for :class:`TrieGrounder`.
+    :param progress: If True, show a progress bar when loading literal mappings
+    :param cache_size: If given, wraps the grounder in a :class:`CachedGrounder` whose
+        caches hold up to this many entries
+    :param kwargs: If literal mappings are passed, keyword arguments passed to the
+        construction of the grounder
+
+    :returns: A SSSLM standard grounder
+
+    A grounder can be constructed from a URL. In the following example, a pre-processed
+    lexical index of anatomical terms from UBERON, BTO, MeSH, and other resources is
+    loaded from the :mod:`biolexica` project.
+
+    .. code-block:: python
+
+        import ssslm
+
+        url = f"https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        grounder = ssslm.make_grounder(url)
+
+        match = grounder.get_best_match("purkinje cell")
+
+    A grounder can be constructed from literal mappings that are already stored in a
+    Python object. This example uses the same lexical index as above, first loading it
+    by URL.
+
+    .. code-block:: python
+
+        import ssslm
+
+        url = f"https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        literal_mappings = ssslm.read_literal_mappings(url)
+        grounder = ssslm.make_grounder(literal_mappings)
+
+        match = grounder.get_best_match("purkinje cell")
+
+    A grounder can be constructed from a pre-existing :mod:`gilda.Grounder` object. As
+    SSSLM is extended, this will incorporate other grounder interfaces.
+
+    .. code-block:: python
+
+        import ssslm
+        from gilda.api import grounder as gilda_default_grounder
+
+        grounder = ssslm.make_grounder(gilda_default_grounder)
+
+        match = grounder.get_best_match("purkinje cell")
+    """
+    grounder = _make_grounder(
+        grounder_hint, implementation=implementation, progress=progress, **kwargs
+    )
+    if cache_size is not None:
+        return CachedGrounder(grounder=grounder, max_size=cache_size)
+    return grounder
+
+
+def _make_grounder(
+    grounder_hint: Iterable[LiteralMapping[R]] | str | Path | gilda.Grounder | Grounder[R],
+    *,
+    implementation: Implementation | None = None,
+    progress: bool = False,
+    **kwargs: Any,
+) -> Grounder[NamableReference] | Grounder[R]:
+    if isinstance(grounder_hint, Grounder):
+        return grounder_hint
+    if _is_gilda_grounder(grounder_hint):
+        return GildaGrounder(grounder_hint)
+    if isinstance(grounder_hint, str | Path):
+        grounder_hint = read_literal_mappings(grounder_hint, show_progress=progress)
+
+    if implementation is None or implementation == "gilda":
+        return GildaGrounder.from_literal_mappings(
+            cast(Iterable[LiteralMapping[R]], grounder_hint), **kwargs
+        )
+    if implementation == "dict":
+        return DictGrounder.from_literal_mappings(
+            cast(Iterable[LiteralMapping[R]], grounder_hint), **kwargs
+        )
+    if implementation == "aho-corasick":
+        return AhoCorasickGrounder.from_literal_mappings(
+            cast(Iterable[LiteralMapping[R]], grounder_hint), **kwargs
+        )
+    if implementation == "trie":
+        return TrieGrounder.from_literal_mappings(
+            cast(Iterable[LiteralMapping[R]], grounder_hint), **kwargs
+        )
+    raise ValueError(f"Unsupported implementation: {implementation}")
+
+
+def _is_gilda_grounder(obj: Any) -> TypeGuard[gilda.Grounder]:
+    if not importlib.util.find_spec("gilda"):
+        return False
+
+    import gilda
+
+    return isinstance(obj, gilda.Grounder)
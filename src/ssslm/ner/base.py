@@ -0,0 +1,782 @@
+"""Base classes for matchers, annotators, and grounders."""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import itertools
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Generic, Literal, NamedTuple, TypeVar, cast, overload
+
+from curies import NamableReference
+from pydantic import BaseModel, ConfigDict
+from typing_extensions import Self
+
+from ..model import LiteralMapping, R
+
+if TYPE_CHECKING:
+    import numpy
+    import pandas as pd
+
+__all__ = [
+    "ANNOTATION_DTYPE",
+    "Annotation",
+    "AnnotationTable",
+    "Annotator",
+    "CacheInfo",
+    "Grounder",
+    "Match",
+    "Matcher",
+    "PandasTargetType",
+    "RawAnnotation",
+    "WrappedMatcher",
+    "get_async_executor",
+    "set_async_executor",
+]
+
+
+X = TypeVar("X")
+
+
+class Match(BaseModel, Generic[R]):
+    """A match from NER."""
+
+    # matches are immutable, like references, so they can be shared, e.g., by caches
+    model_config = ConfigDict(frozen=True)
+
+    reference: R
+    score: float
+
+    @property
+    def prefix(self) -> str:
+        """Get the scored match's term's prefix."""
+        return self.reference.prefix
+
+    @property
+    def identifier(self) -> str:
+        """Get the scored match's term's identifier."""
+        return self.reference.identifier
+
+    @property
+    def curie(self) -> str:
+        """Get the scored match's CURIE."""
+        return self.reference.curie
+
+    @property
+    def name(self) -> str | None:
+        """Get the scored match's term's name."""
+        return self.reference.name
+
+
+class Annotation(BaseModel, Generic[R]):
+    """Data about an annotation."""
+
+    model_config = ConfigDict(frozen=True)
+
+    text: str
+    start: int
+    end: int
+    match: Match[R]
+
+    @property
+    def reference(self) -> R:
+        """Get the scored match's reference."""
+        return self.match.reference
+
+    @property
+    def prefix(self) -> str:
+        """Get the scored match's term's prefix."""
+        return self.reference.prefix
+
+    @property
+    def identifier(self) -> str:
+        """Get the scored match's term's identifier."""
+        return self.reference.identifier
+
+    @property
+    def curie(self) -> str:
+        """Get the scored match's CURIE."""
+        return self.reference.curie
+
+    @property
+    def name(self) -> str | None:
+        """Get the scored match's term's name."""
+        return self.reference.name
+
+    @property
+    def score(self) -> float:
+        """Get the match's score."""
+        return self.match.score
+
+    @property
+    def substr(self) -> str:
+        """Get the substring that was matched."""
+        return self.text[self.start : self.end]
+
+
+class RawAnnotation(NamedTuple):
+    """A compact annotation, stored in an :class:`AnnotationTable`."""
+
+    #: The position of the document in the batch
+    document: int
+    start: int
+    end: int
+    #: The position of the reference in :attr:`AnnotationTable.references`
+    reference: int
+    score: float
+
+
+#: The NumPy structured data type for :meth:`AnnotationTable.to_numpy`
+ANNOTATION_DTYPE = [
+    ("document", "i8"),
+    ("start", "i8"),
+    ("end", "i8"),
+    ("reference", "i8"),
+    ("score", "f8"),
+]
+
+
+class AnnotationTable(Generic[R]):
+    """A compact representation of annotations on a batch of documents.
+
+    Annotations are stored as tuples of integers and floats, where each reference is
+    stored once in :attr:`references` and referred to by its position. This avoids
+    allocating a :class:`Match` and :class:`Annotation` for each result in bulk
+    workloads.
+
+    .. code-block:: python
+
+        import ssslm
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/phenotype/phenotype.ssslm.tsv.gz"
+        grounder = ssslm.make_grounder(url, implementation="aho-corasick")
+
+        texts = ["The APOE e4 mutation is correlated with risk for Alzheimer's disease."]
+        table = grounder.annotate_batch_raw(texts)
+        array = table.to_numpy()
+
+        # convert back to annotations, when needed
+        annotations = table.to_annotations(texts)
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self.references: list[R] = []
+        self.rows: list[RawAnnotation] = []
+        self._reference_ids: dict[R, int] = {}
+
+    def __len__(self) -> int:
+        """Get the number of annotations."""
+        return len(self.rows)
+
+    def add(self, document: int, start: int, end: int, reference: R, score: float) -> None:
+        """Add an annotation to the table."""
+        reference_id = self._reference_ids.get(reference)
+        if reference_id is None:
+            reference_id = self._reference_ids[reference] = len(self.references)
+            self.references.append(reference)
+        self.rows.append(RawAnnotation(document, start, end, reference_id, score))
+
+    @classmethod
+    def from_annotations(cls, batch: Iterable[Iterable[Annotation[R]]]) -> Self:
+        """Construct a table from a list of annotations for each document."""
+        rv = cls()
+        for document, document_annotations in enumerate(batch):
+            for annotation in document_annotations:
+                rv.add(
+                    document,
+                    annotation.start,
+                    annotation.end,
+                    annotation.reference,
+                    annotation.score,
+                )
+        return rv
+
+    def to_numpy(self) -> numpy.ndarray:
+        """Get the annotations as a NumPy structured array, see :data:`ANNOTATION_DTYPE`."""
+        import numpy as np
+
+        return np.array(self.rows, dtype=ANNOTATION_DTYPE)
+
+    def to_annotations(self, texts: Sequence[str]) -> list[list[Annotation[R]]]:
+        """Convert to a list of annotations for each document.
+
+        :param texts: The texts that were annotated, in the same order
+        :returns: A list of annotations for each text, like from
+            :meth:`Annotator.annotate_batch`
+        """
+        rv: list[list[Annotation[R]]] = [[] for _ in texts]
+        for row in self.rows:
+            rv[row.document].append(
+                Annotation(
+                    text=texts[row.document],
+                    start=row.start,
+                    end=row.end,
+                    match=Match(reference=self.references[row.reference], score=row.score),
+                )
+            )
+        return rv
+
+
+class PandasTargetType(enum.Enum):
+    """How should pandas columns be filled."""
+
+    #: Fill columns with stringified CURIEs
+    curie = enum.auto()
+    #: Fill columns with :mod:`curies.NamableReference` objects
+    reference = enum.auto()
+    #: Fill columns with :mod:`ssslm.Match` objects
+    match = enum.auto()
+
+
+_ASYNC_EXECUTOR: Executor | None = None
+#: Whether the async executor was created by SSSLM, so it gets shut down when replaced
+_ASYNC_EXECUTOR_OWNED = False
+_ASYNC_EXECUTOR_LOCK = threading.Lock()
+
+
+def set_async_executor(executor: Executor | int | None) -> None:
+    """Set the executor used by the default implementations of async methods.
+
+    :param executor: An executor, such as a :class:`concurrent.futures.ThreadPoolExecutor`
+        or :class:`concurrent.futures.ProcessPoolExecutor`, or an integer for the
+        number of workers in a new thread pool. If None, a thread pool with the default
+        number of workers is created on next use. Note that a process pool requires
+        the matcher or annotator to be picklable, and sends it with each call.
+
+    Thread pools created by SSSLM, i.e., from an integer or by default, are shut down
+    when they're replaced. Executors that are passed in are owned by the caller, who is
+    responsible for shutting them down.
+
+    .. code-block:: python
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        from ssslm.ner import set_async_executor
+
+        set_async_executor(ThreadPoolExecutor(max_workers=4))
+    """
+    global _ASYNC_EXECUTOR, _ASYNC_EXECUTOR_OWNED
+    owned = isinstance(executor, int)
+    if isinstance(executor, int):
+        executor = ThreadPoolExecutor(max_workers=executor, thread_name_prefix="ssslm")
+    with _ASYNC_EXECUTOR_LOCK:
+        previous, previous_owned = _ASYNC_EXECUTOR, _ASYNC_EXECUTOR_OWNED
+        _ASYNC_EXECUTOR, _ASYNC_EXECUTOR_OWNED = executor, owned
+    if previous is not None and previous_owned and previous is not executor:
+        # don't wait, since calls that are already running finish in the background
+        previous.shutdown(wait=False)
+
+
+def get_async_executor() -> Executor:
+    """Get the executor used by the default implementations of async methods."""
+    global _ASYNC_EXECUTOR, _ASYNC_EXECUTOR_OWNED
+    with _ASYNC_EXECUTOR_LOCK:
+        if _ASYNC_EXECUTOR is None:
+            _ASYNC_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="ssslm")
+            _ASYNC_EXECUTOR_OWNED = True
+        return _ASYNC_EXECUTOR
+
+
+async def _run_async(func: Callable[..., X], /, *args: Any, **kwargs: Any) -> X:
+    """Run a blocking function in the async executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_async_executor(), partial(func, *args, **kwargs))
+
+
+def _overrides(obj: object, cls: type, name: str) -> bool:
+    """Return if the object's class overrides a method defined by the given class.
+
+    Wrappers use this to only forward async methods to the wrapped object's async
+    methods if a subclass doesn't change the corresponding sync method.
+    """
+    return getattr(type(obj), name) is not getattr(cls, name)
+
+
+class Matcher(ABC, Generic[R]):
+    """An interface for a named entity normalizer."""
+
+    @abstractmethod
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:
+        """Get matches in the SSSLM format."""
+
+    # docstr-coverage:excused `overload`
+    @overload
+    def get_best_match(
+        self, text: str, *, strict: Literal[False] = ..., **kwargs: Any
+    ) -> Match[R] | None: ...
+
+    # docstr-coverage:excused `overload`
+    @overload
+    def get_best_match(
+        self, text: str, *, strict: Literal[True] = ..., **kwargs: Any
+    ) -> Match[R]: ...
+
+    def get_best_match(self, text: str, *, strict: bool = False, **kwargs: Any) -> Match[R] | None:
+        """Get matches in the SSSLM format."""
+        matches = self.get_matches(text, **kwargs)
+        if matches:
+            return matches[0]
+        elif strict:
+            raise ValueError
+        else:
+            return None
+
+    async def aget_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:
+        """Get matches in the SSSLM format without blocking the event loop.
+
+        :param text: The text to ground
+        :param kwargs: Keyword arguments passed to :meth:`get_matches`
+
+        :returns: A list of matches
+
+        By default, this runs :meth:`get_matches` in the executor from
+        :func:`get_async_executor`. Matchers that do I/O, e.g., calling a remote
+        service, should override this with a native coroutine.
+        """
+        return await _run_async(self.get_matches, text, **kwargs)
+
+    # docstr-coverage:excused `overload`
+    @overload
+    async def aget_best_match(
+        self, text: str, *, strict: Literal[False] = ..., **kwargs: Any
+    ) -> Match[R] | None: ...
+
+    # docstr-coverage:excused `overload`
+    @overload
+    async def aget_best_match(
+        self, text: str, *, strict: Literal[True] = ..., **kwargs: Any
+    ) -> Match[R]: ...
+
+    async def aget_best_match(
+        self, text: str, *, strict: bool = False, **kwargs: Any
+    ) -> Match[R] | None:
+        """Get the best match in the SSSLM format without blocking the event loop."""
+        matches = await self.aget_matches(text, **kwargs)
+        if matches:
+            return matches[0]
+        elif strict:
+            raise ValueError
+        else:
+            return None
+
+    def get_matches_batch(self, texts: Iterable[str], **kwargs: Any) -> list[list[Match[R]]]:
+        """Get matches in the SSSLM format for several texts.
+
+        :param texts: The texts to ground
+        :param kwargs: Keyword arguments passed to :meth:`get_matches`
+
+        :returns: A list of matches for each text
+
+        By default, this calls :meth:`get_matches` for each text. Matchers that can
+        amortize work over several texts should override this.
+        """
+        return [self.get_matches(text, **kwargs) for text in texts]
+
+    def get_best_match_batch(self, texts: Iterable[str], **kwargs: Any) -> list[Match[R] | None]:
+        """Get the best match in the SSSLM format for several texts.
+
+        :param texts: The texts to ground
+        :param kwargs: Keyword arguments passed to :meth:`get_matches_batch`
+
+        :returns: The best match for each text, or None if there were no matches
+        """
+        return [
+            matches[0] if matches else None for matches in self.get_matches_batch(texts, **kwargs)
+        ]
+
+    def empty(self) -> bool:
+        """Return if the matcher doesn't entries in it."""
+        return not self.not_empty()
+
+    @abstractmethod
+    def not_empty(self) -> bool:
+        """Return if the matcher has entries in it."""
+
+    def add_literal_mappings(self, literal_mappings: Iterable[LiteralMapping[R]]) -> None:
+        """Add literal mappings to the matcher's index in place.
+
+        :param literal_mappings: The literal mappings to add
+
+        :raises NotImplementedError: If the matcher's index can't be updated in place,
+            e.g., for :class:`EnsembleMatcher`, whose matchers might not share literal
+            mappings, and :class:`ShardedGrounder`, whose shards are in other processes
+
+        This gives the same results as building a new matcher from all literal mappings,
+        but only updates the index entries for the given texts, which is much faster
+        for large lexica.
+
+        .. code-block:: python
+
+            import ssslm
+            from curies import NamedReference
+
+            url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+            grounder = ssslm.make_grounder(url)
+
+            reference = NamedReference(prefix="UBERON", identifier="0002037", name="cerebellum")
+            literal_mapping = ssslm.LiteralMapping(reference=reference, text="little brain")
+            grounder.add_literal_mappings([literal_mapping])
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} can't be updated in place")
+
+    def remove_literal_mappings(self, literal_mappings: Iterable[LiteralMapping[R]]) -> None:
+        """Remove literal mappings from the matcher's index in place.
+
+        :param literal_mappings: The literal mappings to remove. Ones that aren't in the
+            index are skipped.
+
+        :raises NotImplementedError: If the matcher's index can't be updated in place,
+            e.g., for :class:`EnsembleMatcher` and :class:`ShardedGrounder`
+
+        This gives the same results as building a new matcher from all literal mappings
+        except for the removed ones.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} can't be updated in place")
+
+    def ground_df(
+        self,
+        df: pd.DataFrame,
+        column: str | int,
+        *,
+        target_column: None | str | int = None,
+        target_type: PandasTargetType | str = PandasTargetType.curie,
+        executor: Executor | int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Ground the elements of a column in a Pandas dataframe as CURIEs, in-place.
+
+        :param df: A pandas dataframe
+        :param column: The column to ground. This column contains text corresponding to
+            named entities' labels or synonyms
+        :param target_column: The column where to put the groundings (either a CURIE
+            string, or None). It's possible to create a new column when passing a string
+            for this argument. If not given, will create a new column name like
+            ``<source column>_grounded``.
+        :param target_type: The type to fill columns with
+        :param executor: An executor, or a number of workers for a thread pool, used to
+            ground the unique values in the column in parallel. Note that a process pool
+            requires the matcher to be picklable.
+        :param kwargs: Keyword arguments passed to :meth:`Grounder.ground`, could
+            include context, organisms, or namespaces.
+
+        Each unique value in the column is only grounded once, then the results are
+        broadcast back to the rows, so columns with many repeated values, such as
+        categorical columns, are grounded quickly.
+
+        .. code-block:: python
+
+            import pandas as pd
+            import ssslm
+
+            INDEX = "phenotype"
+            mappings_url = f"https://github.com/biopragmatics/biolexica/raw/main/lexica/{INDEX}/{INDEX}.ssslm.tsv.gz"
+
+            grounder = ssslm.make_grounder(mappings_url)
+
+            data_url = "https://raw.githubusercontent.com/OBOAcademy/obook/master/docs/tutorial/linking_data/data.csv"
+            df = pd.read_csv(data_url)
+
+            grounder.ground_df(df, "disease", target_column="disease_curie")
+        """
+        if target_column is None:
+            target_column = f"{column}_grounded"
+        if isinstance(target_type, str):
+            target_type = PandasTargetType[target_type]
+        df[target_column] = self._ground_series(
+            df[column], target_type=target_type, executor=executor, **kwargs
+        )
+
+    def ground_df_chunks(
+        self,
+        dfs: Iterable[pd.DataFrame],
+        column: str | int,
+        *,
+        target_column: None | str | int = None,
+        target_type: PandasTargetType | str = PandasTargetType.curie,
+        executor: Executor | int | None = None,
+        memo_size: int | None = 1_000_000,
+        **kwargs: Any,
+    ) -> Iterable[pd.DataFrame]:
+        """Ground the elements of a column in chunks of a dataframe, in-place.
+
+        :param dfs: An iterable of pandas dataframes, e.g., from passing ``chunksize``
+            to :func:`pandas.read_csv` for tables that don't fit in memory
+        :param column: The column to ground
+        :param target_column: The column where to put the groundings
+        :param target_type: The type to fill columns with
+        :param executor: An executor, or a number of workers for a thread pool, used to
+            ground the unique values in each chunk in parallel
+        :param memo_size: The maximum number of values whose groundings are remembered
+            across chunks, dropping the least recently used ones. If None, all are
+            remembered, which uses memory proportional to the number of unique values
+            in all chunks.
+        :param kwargs: Keyword arguments passed to :meth:`Grounder.ground`
+
+        :yields: Each dataframe, after grounding. Values are only grounded once across
+            chunks, as long as they're remembered.
+
+        .. code-block:: python
+
+            import pandas as pd
+            import ssslm
+
+            grounder = ssslm.make_grounder(...)
+            chunks = pd.read_csv("data.csv", chunksize=100_000)
+            for i, df in enumerate(grounder.ground_df_chunks(chunks, "disease")):
+                df.to_csv("grounded.csv", mode="a", header=i == 0, index=False)
+        """
+        if target_column is None:
+            target_column = f"{column}_grounded"
+        if isinstance(target_type, str):
+            target_type = PandasTargetType[target_type]
+        memo = _Cache(max_size=memo_size)
+        for df in dfs:
+            df[target_column] = self._ground_series(
+                df[column], target_type=target_type, executor=executor, memo=memo, **kwargs
+            )
+            yield df
+
+    def _ground_series(
+        self,
+        series: pd.Series,
+        *,
+        target_type: PandasTargetType,
+        executor: Executor | int | None,
+        memo: _Cache | None = None,
+        **kwargs: Any,
+    ) -> numpy.ndarray:
+        """Ground the unique string values in a series, and broadcast them to rows.
+
+        :param memo: A cache of groundings from previous calls, whose values are
+            1-tuples, since a value of None means a miss
+        """
+        import numpy as np
+        import pandas as pd
+
+        try:
+            # missing values get the code -1
+            codes, uniques = pd.factorize(series)
+        except TypeError:
+            # unhashable values, like lists, can't be factorized, so only the rows with
+            # strings are grounded, and the others get None
+            is_text = np.fromiter(
+                (isinstance(value, str) for value in series), dtype=bool, count=len(series)
+            )
+            rv = np.empty(len(series), dtype=object)
+            rv[is_text] = self._ground_series(
+                series[is_text], target_type=target_type, executor=executor, memo=memo, **kwargs
+            )
+            return rv
+
+        matches: dict[str, Match[R] | None] = {}
+        texts = []
+        # this skips non-string values
+        for value in uniques:
+            if not isinstance(value, str):
+                continue
+            cached = memo.get(value) if memo is not None else None
+            if cached is None:
+                texts.append(value)
+            else:
+                matches[value] = cached[0]
+        for text, match in zip(
+            texts, self._get_best_match_batch_parallel(texts, executor, **kwargs), strict=True
+        ):
+            matches[text] = match
+            if memo is not None:
+                memo.put(text, (match,))
+        # the extra None at the end is selected by missing values' code -1
+        targets = np.empty(len(uniques) + 1, dtype=object)
+        for i, value in enumerate(uniques):
+            match = matches.get(value) if isinstance(value, str) else None
+            if match is not None:
+                targets[i] = _get_target(match, target_type)
+        return cast("numpy.ndarray", targets[codes])
+
+    def _get_best_match_batch_parallel(
+        self, texts: list[str], executor: Executor | int | None, **kwargs: Any
+    ) -> list[Match[R] | None]:
+        if not texts:
+            return []
+        if executor is None or len(texts) < 2:
+            return self.get_best_match_batch(texts, **kwargs)
+        if isinstance(executor, int):
+            with ThreadPoolExecutor(max_workers=executor) as pool:
+                return self._get_best_match_batch_parallel(texts, pool, **kwargs)
+        size = max(1, math.ceil(len(texts) / (4 * (os.cpu_count() or 1))))
+        chunks = [texts[i : i + size] for i in range(0, len(texts), size)]
+        func = partial(self.get_best_match_batch, **kwargs)
+        return list(itertools.chain.from_iterable(executor.map(func, chunks)))
+
+
+class WrappedMatcher(Matcher[R], Generic[R]):
+    """A matcher that wraps another matcher, allowing for composition."""
+
+    def __init__(self, *, matcher: Matcher[R]) -> None:
+        """Instantiate the matcher around another matcher."""
+        self._matcher = matcher
+
+    def not_empty(self) -> bool:
+        """Return if the wrapped matcher is not empty."""
+        return self._matcher.not_empty()
+
+    # docstr-coverage:excused `inherited`
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:  # noqa:D102
+        return self._matcher.get_matches(text, **kwargs)
+
+    # docstr-coverage:excused `inherited`
+    async def aget_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:  # noqa:D102
+        if _overrides(self, WrappedMatcher, "get_matches"):
+            return await _run_async(self.get_matches, text, **kwargs)
+        return await self._matcher.aget_matches(text, **kwargs)
+
+    # docstr-coverage:excused `inherited`
+    def get_matches_batch(  # noqa:D102
+        self, texts: Iterable[str], **kwargs: Any
+    ) -> list[list[Match[R]]]:
+        return self._matcher.get_matches_batch(texts, **kwargs)
+
+    # docstr-coverage:excused `inherited`
+    def add_literal_mappings(  # noqa:D102
+        self, literal_mappings: Iterable[LiteralMapping[R]]
+    ) -> None:
+        self._matcher.add_literal_mappings(literal_mappings)
+
+    # docstr-coverage:excused `inherited`
+    def remove_literal_mappings(  # noqa:D102
+        self, literal_mappings: Iterable[LiteralMapping[R]]
+    ) -> None:
+        self._matcher.remove_literal_mappings(literal_mappings)
+
+
+def _get_target(
+    match: Match[R], target_type: PandasTargetType
+) -> str | Match[R] | NamableReference:
+    if target_type == PandasTargetType.curie:
+        return match.curie
+    elif target_type == PandasTargetType.match:
+        return match
+    elif target_type == PandasTargetType.reference:
+        return match.reference
+    raise TypeError
+
+
+class Annotator(ABC, Generic[R]):
+    """An interface for something that can annotate."""
+
+    @abstractmethod
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:
+        """Annotate the text."""
+
+    async def aannotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:
+        """Annotate the text without blocking the event loop.
+
+        :param text: The text to annotate
+        :param kwargs: Keyword arguments passed to :meth:`annotate`
+
+        :returns: A list of annotations
+
+        By default, this runs :meth:`annotate` in the executor from
+        :func:`get_async_executor`. Annotators that do I/O should override this with a
+        native coroutine.
+        """
+        return await _run_async(self.annotate, text, **kwargs)
+
+    def annotate_batch(self, texts: Iterable[str], **kwargs: Any) -> list[list[Annotation[R]]]:
+        """Annotate several texts.
+
+        :param texts: The texts to annotate
+        :param kwargs: Keyword arguments passed to :meth:`annotate`
+
+        :returns: A list of annotations for each text
+
+        By default, this calls :meth:`annotate` for each text. Annotators that can
+        amortize work over several texts should override this.
+        """
+        return [self.annotate(text, **kwargs) for text in texts]
+
+    def annotate_batch_raw(self, texts: Iterable[str], **kwargs: Any) -> AnnotationTable[R]:
+        """Annotate several texts, returning a compact table.
+
+        :param texts: The texts to annotate
+        :param kwargs: Keyword arguments passed to :meth:`annotate_batch`
+
+        :returns: A table of annotations, which can be converted back to annotations
+            with :meth:`AnnotationTable.to_annotations`
+
+        By default, this converts the results of :meth:`annotate_batch`. Annotators
+        that can produce results without constructing :class:`Annotation` objects
+        should override this.
+        """
+        return AnnotationTable.from_annotations(self.annotate_batch(texts, **kwargs))
+
+
+class Grounder(Matcher[R], Annotator[R], ABC, Generic[R]):
+    """A combine matcher and annotator."""
+
+
+class CacheInfo(NamedTuple):
+    """Statistics about a cache, similar to :func:`functools.lru_cache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    max_size: int | None
+    current_size: int
+
+
+class _Cache:
+    """A thread-safe least recently used (LRU) cache with optional expiration."""
+
+    def __init__(self, max_size: int | None = None, ttl: float | None = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expiration, value = entry
+            if self.ttl is not None and expiration < time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        expiration = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._data[key] = expiration, value
+            self._data.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.max_size, len(self._data))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
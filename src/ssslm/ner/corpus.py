@@ -0,0 +1,157 @@
+"""Annotate corpora of documents."""
+
+from __future__ import annotations
+
+import itertools
+import os
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, TextIO, cast
+
+from .api import GrounderHint, make_grounder
+from .base import Annotation, Grounder
+from .io import CORPUS_ANNOTATION_COLUMNS, AnnotationFormat, _annotation_to_row, _write_rows
+from ..model import R
+
+__all__ = [
+    "annotate_corpus",
+    "write_corpus_annotations",
+]
+
+
+#: The grounder used by :func:`annotate_corpus` in each worker process
+_CORPUS_GROUNDER: Grounder[Any] | None = None
+
+
+def _init_corpus_worker(grounder_hint: GrounderHint[Any], grounder_kwargs: dict[str, Any]) -> None:
+    global _CORPUS_GROUNDER
+    _CORPUS_GROUNDER = make_grounder(grounder_hint, **grounder_kwargs)
+
+
+def _annotate_corpus_chunk(
+    chunk: list[tuple[str, str]], kwargs: dict[str, Any]
+) -> list[tuple[str, list[Annotation[Any]]]]:
+    if _CORPUS_GROUNDER is None:
+        raise RuntimeError("corpus worker was not initialized")
+    return _annotate_chunk(_CORPUS_GROUNDER, chunk, kwargs)
+
+
+def _annotate_chunk(
+    grounder: Grounder[R], chunk: list[tuple[str, str]], kwargs: dict[str, Any]
+) -> list[tuple[str, list[Annotation[R]]]]:
+    annotations = grounder.annotate_batch([text for _, text in chunk], **kwargs)
+    return [
+        (doc_id, doc_annotations)
+        for (doc_id, _), doc_annotations in zip(chunk, annotations, strict=True)
+    ]
+
+
+def _chunk(documents: Iterable[tuple[str, str]], size: int) -> Iterable[list[tuple[str, str]]]:
+    it = iter(documents)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def annotate_corpus(
+    grounder_hint: GrounderHint[R],
+    documents: Iterable[tuple[str, str]],
+    *,
+    workers: int | None = None,
+    chunksize: int = 64,
+    max_pending: int | None = None,
+    grounder_kwargs: dict[str, Any] | None = None,
+    **kwargs: Any,
+) -> Iterable[tuple[str, list[Annotation[R]]]]:
+    """Annotate a corpus of documents in parallel, yielding results in order.
+
+    :param grounder_hint: An object that can be coerced into a grounder with
+        :func:`make_grounder`. This is built once in each worker process, so it should
+        be picklable and cheap to send, e.g., a path or URL for literal mappings.
+    :param documents: An iterable of pairs of document identifiers and texts. This is
+        consumed lazily, so it can be a generator over a large corpus.
+    :param workers: The number of worker processes. Defaults to the number of CPUs. If
+        1 or less, annotates in the current process.
+    :param chunksize: The number of documents sent to a worker at a time. These are
+        annotated with :meth:`Annotator.annotate_batch`.
+    :param max_pending: The maximum number of chunks being annotated or waiting to be
+        yielded at a time, which bounds memory usage when the consumer is slower than
+        the workers. Defaults to twice the number of workers.
+    :param grounder_kwargs: Keyword arguments passed to :func:`make_grounder`
+    :param kwargs: Keyword arguments passed to :meth:`Annotator.annotate_batch`
+
+    :yields: Pairs of document identifiers and their annotations, in the same order
+        as the documents
+
+    .. code-block:: python
+
+        import ssslm
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        documents = [
+            ("doc1", "The purkinje cell is in the cerebellum."),
+            ("doc2", "The heart pumps blood."),
+        ]
+        for doc_id, annotations in ssslm.annotate_corpus(url, documents, workers=4):
+            ...
+    """
+    if grounder_kwargs is None:
+        grounder_kwargs = {}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        # the grounder is local, so generators running at the same time don't share it
+        grounder = cast(Grounder[R], make_grounder(grounder_hint, **grounder_kwargs))
+        for chunk in _chunk(documents, chunksize):
+            yield from _annotate_chunk(grounder, chunk, kwargs)
+        return
+
+    if max_pending is None:
+        max_pending = 2 * workers
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_corpus_worker,
+        initargs=(grounder_hint, grounder_kwargs),
+    ) as executor:
+        pending: deque[Future[list[tuple[str, list[Annotation[R]]]]]] = deque()
+        for chunk in _chunk(documents, chunksize):
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_annotate_corpus_chunk, chunk, kwargs))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_corpus_annotations(
+    grounder_hint: GrounderHint[R],
+    documents: Iterable[tuple[str, str]],
+    path: str | Path | TextIO,
+    *,
+    annotation_format: AnnotationFormat | None = None,
+    batch_size: int = 100_000,
+    **kwargs: Any,
+) -> None:
+    """Annotate a corpus of documents in parallel and stream the annotations to a file.
+
+    :param grounder_hint: An object that can be coerced into a grounder with
+        :func:`make_grounder`
+    :param documents: An iterable of pairs of document identifiers and texts
+    :param path: The path to write annotations to. This has the same columns as files
+        written with :func:`write_annotations`, and a ``document_id`` column first. It
+        can be read with :func:`read_corpus_annotations`.
+    :param annotation_format: The format of the file, see :func:`write_annotations`
+    :param batch_size: The number of annotations in each row group, for Parquet
+    :param kwargs: Keyword arguments passed to :func:`annotate_corpus`
+    """
+    _write_rows(
+        (
+            (document_id, *_annotation_to_row(annotation))
+            for document_id, annotations in annotate_corpus(grounder_hint, documents, **kwargs)
+            for annotation in annotations
+        ),
+        CORPUS_ANNOTATION_COLUMNS,
+        path,
+        annotation_format=annotation_format,
+        batch_size=batch_size,
+    )
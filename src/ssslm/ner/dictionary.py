@@ -0,0 +1,713 @@
+"""Dependency-free matchers and grounders based on dictionary lookup."""
+
+from __future__ import annotations
+
+import itertools
+import re
+from abc import abstractmethod
+from collections.abc import Callable, Iterable
+from typing import Any, Generic, NamedTuple, TypeAlias, cast
+
+from curies import NamableReference, ReferenceTuple
+from curies import vocabulary as v
+from typing_extensions import Self
+
+from .base import Annotation, AnnotationTable, Grounder, Match, Matcher
+from ..model import LiteralMapping, R
+
+__all__ = [
+    "DEFAULT_PREDICATE_SCORE",
+    "NORMALIZED_MATCH_FACTOR",
+    "PREDICATE_SCORES",
+    "PREVIOUS_NAME_SCORE",
+    "AhoCorasickGrounder",
+    "DictGrounder",
+    "DictMatcher",
+    "RegexTokenizer",
+    "Tokenizer",
+    "TrieGrounder",
+]
+
+
+#: Scores for lexical matches based on the predicate in the literal mapping. Like in
+#: :meth:`LiteralMapping._get_gilda_status`, labels are prioritized over synonyms.
+PREDICATE_SCORES: dict[ReferenceTuple, float] = {
+    v.has_label.pair: 1.0,
+    v.has_exact_synonym.pair: 0.9,
+    v.has_related_synonym.pair: 0.8,
+    v.has_narrow_synonym.pair: 0.7,
+    v.has_broad_synonym.pair: 0.7,
+}
+#: The score for literal mappings with predicates not in :data:`PREDICATE_SCORES`
+DEFAULT_PREDICATE_SCORE = 0.6
+#: The score for literal mappings whose synonym type is a previous name
+PREVIOUS_NAME_SCORE = 0.5
+#: The factor applied to scores when the text only matches after normalization
+NORMALIZED_MATCH_FACTOR = 0.9
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _normalize(text: str) -> str:
+    """Normalize text by case folding and collapsing whitespace."""
+    return " ".join(text.casefold().split())
+
+
+def _get_literal_mapping_score(literal_mapping: LiteralMapping[R]) -> float:
+    if literal_mapping.type is not None and literal_mapping.type.pair == v.previous_name.pair:
+        return PREVIOUS_NAME_SCORE
+    return PREDICATE_SCORES.get(literal_mapping.predicate.pair, DEFAULT_PREDICATE_SCORE)
+
+
+class _DictEntry(NamedTuple):
+    """An entry in a :class:`DictMatcher`'s index."""
+
+    reference: NamableReference
+    text: str
+    score: float
+    taxon: str | None
+
+
+def _get_dict_entry(literal_mapping: LiteralMapping[R]) -> _DictEntry:
+    """Get an entry for a :class:`DictMatcher`'s index from a literal mapping."""
+    return _DictEntry(
+        reference=literal_mapping.reference,
+        text=literal_mapping.text,
+        score=_get_literal_mapping_score(literal_mapping),
+        taxon=literal_mapping.taxon.identifier if literal_mapping.taxon else None,
+    )
+
+
+def _sort_scores(scores: dict[NamableReference, float]) -> list[tuple[NamableReference, float]]:
+    """Sort a dictionary of references to scores by descending score."""
+    return sorted(scores.items(), key=lambda pair: (-pair[1], pair[0].curie))
+
+
+def _scores_to_matches(scores: dict[NamableReference, float]) -> list[Match[R]]:
+    """Get matches from a dictionary of references to scores, sorted by descending score."""
+    return [
+        Match(reference=cast(R, reference), score=score)
+        for reference, score in _sort_scores(scores)
+    ]
+
+
+class DictMatcher(Matcher[R], Generic[R]):
+    """A dependency-free matcher that looks up normalized text in a dictionary.
+
+    Text is normalized by case folding and collapsing whitespace. Matches are scored
+    based on the predicate of the literal mapping (see :data:`PREDICATE_SCORES`) and
+    down-weighted by :data:`NORMALIZED_MATCH_FACTOR` when the query only matches after
+    normalization.
+    """
+
+    def __init__(self, index: dict[str, list[_DictEntry]]) -> None:
+        """Initialize the matcher with a pre-built index from normalized text to entries."""
+        self._index = index
+
+    @classmethod
+    def from_literal_mappings(
+        cls, literal_mappings: Iterable[LiteralMapping[R]], **kwargs: Any
+    ) -> Self:
+        """Initialize a dictionary-based matcher from literal mappings.
+
+        :param literal_mappings: The literal mappings to populate the matcher
+        :param kwargs: Keyword arguments passed to the constructor
+
+        :returns: A matcher
+
+        .. code-block:: python
+
+            import ssslm
+            from ssslm.ner import DictMatcher
+
+            url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+            literal_mappings = ssslm.read_literal_mappings(url)
+            matcher = DictMatcher.from_literal_mappings(literal_mappings)
+
+            match = matcher.get_best_match("purkinje cell")
+        """
+        index: dict[str, list[_DictEntry]] = {}
+        for literal_mapping in literal_mappings:
+            key = _normalize(literal_mapping.text)
+            if not key:
+                continue
+            index.setdefault(key, []).append(_get_dict_entry(literal_mapping))
+        for entries in index.values():
+            entries.sort(key=lambda entry: -entry.score)
+        return cls(index, **kwargs)
+
+    def not_empty(self) -> bool:
+        """Return if this matcher has lookups indexed in it."""
+        return bool(self._index)
+
+    def add_literal_mappings(self, literal_mappings: Iterable[LiteralMapping[R]]) -> None:
+        """Add literal mappings to the index in place.
+
+        :param literal_mappings: The literal mappings to add
+
+        New entries are appended to the entries for their normalized text, which are
+        then re-sorted like in :meth:`from_literal_mappings`, so the index is the same
+        as if it were built from all literal mappings.
+        """
+        additions: dict[str, list[_DictEntry]] = {}
+        for literal_mapping in literal_mappings:
+            key = _normalize(literal_mapping.text)
+            if key:
+                additions.setdefault(key, []).append(_get_dict_entry(literal_mapping))
+        # derived indexes are updated first, so the index isn't left half-updated on error
+        self._update_keys([key for key in additions if key not in self._index], [])
+        for key, new_entries in additions.items():
+            entries = self._index.setdefault(key, [])
+            entries.extend(new_entries)
+            entries.sort(key=lambda entry: -entry.score)
+
+    def remove_literal_mappings(self, literal_mappings: Iterable[LiteralMapping[R]]) -> None:
+        """Remove literal mappings from the index in place.
+
+        :param literal_mappings: The literal mappings to remove. Ones that aren't in the
+            index are skipped.
+
+        One entry is removed for each literal mapping, and texts are removed from the
+        index when they have no entries left.
+        """
+        remaining: dict[str, list[_DictEntry]] = {}
+        for literal_mapping in literal_mappings:
+            key = _normalize(literal_mapping.text)
+            if key not in self._index:
+                continue
+            entries = remaining.get(key)
+            if entries is None:
+                entries = remaining[key] = list(self._index[key])
+            entry = _get_dict_entry(literal_mapping)
+            if entry in entries:
+                entries.remove(entry)
+        self._update_keys([], [key for key, entries in remaining.items() if not entries])
+        for key, entries in remaining.items():
+            if entries:
+                self._index[key] = entries
+            else:
+                del self._index[key]
+
+    def _update_keys(self, added: list[str], removed: list[str]) -> None:
+        """Update derived indexes before normalized texts are added to or removed from the index.
+
+        :param added: Normalized texts that are about to be added to the index
+        :param removed: Normalized texts that are about to be removed from the index
+        """
+
+    def get_matches(  # type:ignore[override]
+        self,
+        text: str,
+        context: str | None = None,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+    ) -> list[Match[R]]:
+        """Get matches for the text by dictionary lookup.
+
+        :param text: The text to ground
+        :param context: Unused, accepted for compatibility with :class:`GildaMatcher`
+        :param organisms: NCBITaxon identifiers. If given, drops matches whose literal
+            mappings are specific to a different taxon
+        :param namespaces: Prefixes. If given, only keeps matches with these prefixes
+
+        :returns: A list of matches, sorted by descending score
+        """
+        return self._lookup(
+            _normalize(text), text.strip(), organisms=organisms, namespaces=namespaces
+        )
+
+    def _lookup(
+        self,
+        key: str,
+        text: str | None,
+        *,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+    ) -> list[Match[R]]:
+        """Get matches for a normalized key.
+
+        :param key: The normalized text
+        :param text: The original text, used to check for exact matches. If None,
+            all matches are scored as matches after normalization.
+        :param organisms: NCBITaxon identifiers to filter by
+        :param namespaces: Prefixes to filter by
+
+        :returns: A list of matches, sorted by descending score
+        """
+        return [
+            Match(reference=cast(R, reference), score=score)
+            for reference, score in self._lookup_scores(
+                key, text, organisms=organisms, namespaces=namespaces
+            )
+        ]
+
+    def _lookup_scores(
+        self,
+        key: str,
+        text: str | None,
+        *,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+    ) -> list[tuple[NamableReference, float]]:
+        """Get pairs of references and scores for a normalized key, like :meth:`_lookup`."""
+        entries = self._index.get(key)
+        if not entries:
+            return []
+        scores: dict[NamableReference, float] = {}
+        for entry in entries:
+            if namespaces is not None and entry.reference.prefix not in namespaces:
+                continue
+            if organisms is not None and entry.taxon is not None and entry.taxon not in organisms:
+                continue
+            score = entry.score if entry.text == text else entry.score * NORMALIZED_MATCH_FACTOR
+            if score > scores.get(entry.reference, 0.0):
+                scores[entry.reference] = score
+        return _sort_scores(scores)
+
+
+class _RawDictGrounder(Grounder[R], DictMatcher[R], Generic[R]):
+    """A base class for annotators on a :class:`DictMatcher`'s index.
+
+    Subclasses implement :meth:`_iter_raw`, which yields annotations as tuples so that
+    :meth:`annotate_batch_raw` doesn't need to construct :class:`Annotation` objects.
+    """
+
+    @abstractmethod
+    def _iter_raw(
+        self, text: str, **kwargs: Any
+    ) -> Iterable[tuple[int, int, NamableReference, float]]:
+        """Yield the start, end, reference, and score of annotations in the text."""
+
+    # docstr-coverage:excused `inherited`
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:
+        return [
+            Annotation(
+                text=text, start=start, end=end, match=Match(reference=reference, score=score)
+            )
+            for start, end, reference, score in self._iter_raw(text, **kwargs)
+        ]
+
+    # docstr-coverage:excused `inherited`
+    def annotate_batch_raw(self, texts: Iterable[str], **kwargs: Any) -> AnnotationTable[R]:
+        rv: AnnotationTable[R] = AnnotationTable()
+        for document, text in enumerate(texts):
+            for start, end, reference, score in self._iter_raw(text, **kwargs):
+                rv.add(document, start, end, cast(R, reference), score)
+        return rv
+
+
+class DictGrounder(_RawDictGrounder[R], Generic[R]):
+    """A dependency-free grounder and annotator that looks up normalized text in a dictionary.
+
+    Annotation works by tokenizing the text, then looking up the longest window of
+    tokens starting at each position that appears in the dictionary.
+    """
+
+    def __init__(self, index: dict[str, list[_DictEntry]]) -> None:
+        """Initialize the grounder with a pre-built index from normalized text to entries."""
+        super().__init__(index)
+        self._max_tokens = max(
+            (len(_TOKEN_RE.findall(key)) for key in self._index),
+            default=0,
+        )
+
+    def _update_keys(self, added: list[str], removed: list[str]) -> None:
+        """Update the maximum number of tokens in a normalized text.
+
+        This isn't lowered when texts are removed, since trying longer windows that
+        aren't in the index doesn't change the results.
+        """
+        self._max_tokens = max([self._max_tokens, *(len(_TOKEN_RE.findall(key)) for key in added)])
+
+    def _iter_raw(
+        self,
+        text: str,
+        *,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+        **_kwargs: Any,
+    ) -> Iterable[tuple[int, int, NamableReference, float]]:
+        """Annotate the text using the longest matching windows of tokens."""
+        spans = [(m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+        i = 0
+        while i < len(spans):
+            start = spans[i][0]
+            for j in range(min(len(spans), i + self._max_tokens), i, -1):
+                end = spans[j - 1][1]
+                substr = text[start:end]
+                scores = self._lookup_scores(
+                    _normalize(substr), substr.strip(), organisms=organisms, namespaces=namespaces
+                )
+                if scores:
+                    for reference, score in scores:
+                        yield start, end, reference, score
+                    i = j
+                    break
+            else:
+                i += 1
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _normalize_with_offsets(text: str) -> tuple[str, list[int]]:
+    """Normalize text like :func:`_normalize`, keeping the position of each character.
+
+    :param text: The text to normalize
+    :returns: A pair of the normalized text and a list of the same length whose elements
+        are the position in the original text that each normalized character came from
+    """
+    chars: list[str] = []
+    offsets: list[int] = []
+    in_whitespace = False
+    for i, c in enumerate(text):
+        if c.isspace():
+            if not in_whitespace:
+                chars.append(" ")
+                offsets.append(i)
+            in_whitespace = True
+            continue
+        in_whitespace = False
+        for folded in c.casefold():
+            chars.append(folded)
+            offsets.append(i)
+    return "".join(chars), offsets
+
+
+class _Automaton:
+    """An Aho-Corasick automaton over strings."""
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        """Compile the automaton for the given keys."""
+        # the goto function, where each state is a dictionary from characters to states
+        self.goto: list[dict[str, int]] = [{}]
+        # the failure function, which points to the state for the longest proper suffix
+        self.fail: list[int] = [0]
+        # the lengths of the keys that end in each state, including through failures
+        self.out: list[tuple[int, ...]] = [()]
+        for key in keys:
+            state = 0
+            for c in key:
+                nxt = self.goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][c] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = (len(key),)
+
+        # breadth-first search to fill the failure function
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for c, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and c not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(c, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def __contains__(self, key: object) -> bool:
+        """Check if the key was compiled into the automaton."""
+        if not isinstance(key, str):
+            return False
+        state = 0
+        for c in key:
+            nxt = self.goto[state].get(c)
+            if nxt is None:
+                return False
+            state = nxt
+        # outputs through failures are always shorter than the key itself
+        return len(key) in self.out[state]
+
+    def iter_matches(self, text: str) -> Iterable[tuple[int, int]]:
+        """Iterate over the start and end positions of all keys appearing in the text."""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, c in enumerate(text):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for length in out[state]:
+                yield i + 1 - length, i + 1
+
+
+class AhoCorasickGrounder(_RawDictGrounder[R], Generic[R]):
+    """A dependency-free grounder and annotator based on the Aho-Corasick algorithm.
+
+    All texts from the literal mappings are normalized and compiled into an
+    Aho-Corasick automaton, which finds all occurrences in a document in a single pass,
+    independent of the number of literal mappings. Only occurrences that start and end
+    on word boundaries are kept. Grounding works the same as in :class:`DictMatcher`.
+
+    .. code-block:: python
+
+        import ssslm
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/phenotype/phenotype.ssslm.tsv.gz"
+        grounder = ssslm.make_grounder(url, implementation="aho-corasick")
+
+        annotations = grounder.annotate(
+            "The APOE e4 mutation is correlated with risk for Alzheimer's disease."
+        )
+    """
+
+    def __init__(self, index: dict[str, list[_DictEntry]], *, overlapping: bool = False) -> None:
+        """Initialize the grounder with a pre-built index from normalized text to entries.
+
+        :param index: A dictionary from normalized texts to entries
+        :param overlapping: Should overlapping occurrences be returned? By default, only
+            the leftmost-longest occurrences are kept.
+        """
+        super().__init__(index)
+        self.overlapping = overlapping
+        self._automaton = _Automaton(self._index)
+        # texts added with add_literal_mappings() are compiled in a separate automaton,
+        # since adding keys changes the failure function throughout the automaton
+        self._added_keys: set[str] = set()
+        self._added_automaton: _Automaton | None = None
+
+    def _update_keys(self, added: list[str], removed: list[str]) -> None:
+        """Recompile the automaton for added texts.
+
+        Removed texts are left in the automaton, since occurrences of texts that
+        aren't in the index are skipped.
+        """
+        self._added_keys.update(key for key in added if key not in self._automaton)
+        self._added_keys.difference_update(removed)
+        self._added_automaton = _Automaton(sorted(self._added_keys)) if self._added_keys else None
+
+    def _iter_raw(
+        self, text: str, **kwargs: Any
+    ) -> Iterable[tuple[int, int, NamableReference, float]]:
+        """Annotate the text using the Aho-Corasick automaton."""
+        normalized_text, offsets = _normalize_with_offsets(text)
+        n = len(normalized_text)
+        occurrences = self._automaton.iter_matches(normalized_text)
+        if self._added_automaton is not None:
+            occurrences = itertools.chain(
+                occurrences, self._added_automaton.iter_matches(normalized_text)
+            )
+        spans = [
+            (start, end)
+            for start, end in occurrences
+            if (
+                start == 0
+                or not _is_word_char(normalized_text[start - 1])
+                or not _is_word_char(normalized_text[start])
+            )
+            and (
+                end == n
+                or not _is_word_char(normalized_text[end])
+                or not _is_word_char(normalized_text[end - 1])
+            )
+        ]
+        spans.sort(key=lambda span: (span[0], -span[1]))
+        last_end = 0
+        for start, end in spans:
+            if not self.overlapping and start < last_end:
+                continue
+            original_start, original_end = offsets[start], offsets[end - 1] + 1
+            scores = self._lookup_scores(
+                normalized_text[start:end],
+                text[original_start:original_end],
+                organisms=kwargs.get("organisms"),
+                namespaces=kwargs.get("namespaces"),
+            )
+            if scores:
+                for reference, score in scores:
+                    yield original_start, original_end, reference, score
+                last_end = end
+
+
+#: A function that returns the start and end positions of the tokens in a text
+Tokenizer: TypeAlias = Callable[[str], Iterable[tuple[int, int]]]
+
+
+class RegexTokenizer:
+    """A tokenizer based on a regular expression."""
+
+    def __init__(self, pattern: str | re.Pattern[str] | None = None) -> None:
+        """Initialize the tokenizer.
+
+        :param pattern: A regular expression whose matches are tokens. Defaults to
+            matching runs of word characters and single punctuation characters.
+        """
+        if pattern is None:
+            self.pattern = _TOKEN_RE
+        elif isinstance(pattern, str):
+            self.pattern = re.compile(pattern)
+        else:
+            self.pattern = pattern
+
+    def __call__(self, text: str) -> list[tuple[int, int]]:
+        """Get the start and end positions of the tokens in the text."""
+        return [match.span() for match in self.pattern.finditer(text)]
+
+
+#: The key in a trie node that stores the normalized texts ending at that node. There
+#: can be several, since different normalized texts can have the same tokens.
+_TRIE_KEY = ""
+
+
+class TrieGrounder(_RawDictGrounder[R], Generic[R]):
+    """A dependency-free grounder and annotator based on a token trie.
+
+    The normalized texts of all literal mappings are tokenized and stored in a trie, so
+    entries sharing a prefix of tokens share the same nodes. Annotation greedily takes
+    the longest match in the trie starting from each token, then continues after it,
+    which resolves overlapping matches deterministically in favor of the leftmost then
+    longest. Grounding works the same as in :class:`DictMatcher`.
+
+    .. code-block:: python
+
+        import ssslm
+        from ssslm.ner import RegexTokenizer
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/phenotype/phenotype.ssslm.tsv.gz"
+        # split on alphanumeric runs, and keep other non-space characters as tokens
+        tokenizer = RegexTokenizer("[a-zA-Z0-9]+|[^a-zA-Z0-9 ]")
+        grounder = ssslm.make_grounder(url, implementation="trie", tokenizer=tokenizer)
+
+        annotations = grounder.annotate(
+            "The APOE e4 mutation is correlated with risk for Alzheimer's disease."
+        )
+    """
+
+    def __init__(
+        self, index: dict[str, list[_DictEntry]], *, tokenizer: Tokenizer | None = None
+    ) -> None:
+        """Initialize the grounder with a pre-built index from normalized text to entries.
+
+        :param index: A dictionary from normalized texts to entries
+        :param tokenizer: A function that returns the start and end positions of the
+            tokens in a text. Defaults to :class:`RegexTokenizer`.
+        """
+        super().__init__(index)
+        self.tokenizer: Tokenizer = RegexTokenizer() if tokenizer is None else tokenizer
+        self._trie: dict[str, Any] = {}
+        for key in self._index:
+            self._add_to_trie(key)
+
+    def _add_to_trie(self, key: str) -> None:
+        """Add the tokens of a normalized text to the trie."""
+        node = self._trie
+        for start, end in self.tokenizer(key):
+            node = node.setdefault(key[start:end], {})
+        if node is not self._trie:
+            keys = node.setdefault(_TRIE_KEY, [])
+            if key not in keys:
+                keys.append(key)
+
+    def _update_keys(self, added: list[str], removed: list[str]) -> None:
+        """Add texts to the trie.
+
+        Removed texts are left in the trie, since keys that aren't in the index are
+        skipped in favor of shorter matches.
+        """
+        for key in added:
+            self._add_to_trie(key)
+
+    def _lookup_keys_scores(
+        self,
+        keys: list[str],
+        text: str,
+        *,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+    ) -> list[tuple[NamableReference, float]]:
+        """Get pairs of references and scores for normalized texts with the same tokens."""
+        if len(keys) == 1:
+            return self._lookup_scores(keys[0], text, organisms=organisms, namespaces=namespaces)
+        scores: dict[NamableReference, float] = {}
+        for key in keys:
+            for reference, score in self._lookup_scores(
+                key, text, organisms=organisms, namespaces=namespaces
+            ):
+                if score > scores.get(reference, 0.0):
+                    scores[reference] = score
+        return _sort_scores(scores)
+
+    def _iter_raw(
+        self, text: str, **kwargs: Any
+    ) -> Iterable[tuple[int, int, NamableReference, float]]:
+        """Annotate the text with the longest matches from the token trie."""
+        spans = list(self.tokenizer(text))
+        tokens = [text[start:end].casefold() for start, end in spans]
+        i = 0
+        while i < len(tokens):
+            # keep track of all keys along the path, in case the longest gets filtered
+            candidates: list[tuple[int, list[str]]] = []
+            node = self._trie
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])  # type:ignore[assignment]
+                if node is None:
+                    break
+                if _TRIE_KEY in node:
+                    candidates.append((j + 1, node[_TRIE_KEY]))
+            for j, keys in reversed(candidates):
+                start, end = spans[i][0], spans[j - 1][1]
+                scores = self._lookup_keys_scores(
+                    keys,
+                    text[start:end],
+                    organisms=kwargs.get("organisms"),
+                    namespaces=kwargs.get("namespaces"),
+                )
+                if scores:
+                    for reference, score in scores:
+                        yield start, end, reference, score
+                    i = j
+                    break
+            else:
+                i += 1
+
+
+class _BatchFirstMatcher(DictMatcher[R], Generic[R]):
+    """A dictionary-based matcher that compares texts in batches.
+
+    Subclasses implement :meth:`get_matches_batch`, and a single text is grounded as a
+    batch of one.
+    """
+
+    @abstractmethod
+    def get_matches_batch(
+        self,
+        texts: Iterable[str],
+        *,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[list[Match[R]]]:
+        """Get matches for several texts.
+
+        :param texts: The texts to ground
+        :param organisms: NCBITaxon identifiers. If given, drops matches whose literal
+            mappings are specific to a different taxon
+        :param namespaces: Prefixes. If given, only keeps matches with these prefixes
+        :param kwargs: Unused, accepted for compatibility with other matchers
+
+        :returns: A list of matches for each text, sorted by descending score
+        """
+        raise NotImplementedError
+
+    def get_matches(  # type:ignore[override]
+        self,
+        text: str,
+        context: str | None = None,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+    ) -> list[Match[R]]:
+        """Get matches for the text by grounding it as a batch of one.
+
+        :param text: The text to ground
+        :param context: Unused, accepted for compatibility with :class:`GildaMatcher`
+        :param organisms: NCBITaxon identifiers. If given, drops matches whose literal
+            mappings are specific to a different taxon
+        :param namespaces: Prefixes. If given, only keeps matches with these prefixes
+
+        :returns: A list of matches, sorted by descending score
+        """
+        return self.get_matches_batch([text], organisms=organisms, namespaces=namespaces)[0]
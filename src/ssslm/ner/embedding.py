@@ -0,0 +1,527 @@
+"""A semantic matcher based on the cosine similarity of text embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeAlias
+
+from curies import NamableReference
+
+from .base import Match
+from .dictionary import _BatchFirstMatcher, _DictEntry, _normalize, _scores_to_matches
+from ..model import R
+
+if TYPE_CHECKING:
+    import numpy
+
+__all__ = [
+    "EmbeddingMatcher",
+    "Encoder",
+]
+
+
+#: A function that embeds a list of texts as the rows of a 2D array
+Encoder: TypeAlias = Callable[[list[str]], "numpy.ndarray"]
+
+#: The number of stored vectors that are compared with queries at once
+_EMBEDDING_CHUNK_SIZE = 65_536
+
+
+def _normalize_rows(vectors: numpy.ndarray) -> numpy.ndarray:
+    """L2-normalize the rows of a 2D array, such that dot products give cosine similarities."""
+    import numpy as np
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    rv: numpy.ndarray = vectors / norms
+    return rv
+
+
+def _top_k(
+    similarities: numpy.ndarray, columns: numpy.ndarray, k: int
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Get the ``k`` highest similarities in each row, with their columns, unsorted."""
+    import numpy as np
+
+    if similarities.shape[1] <= k:
+        return similarities, columns
+    top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(similarities, top, axis=1), np.take_along_axis(columns, top, axis=1)
+
+
+def _get_embedding_index_path(path: str | Path) -> Path:
+    """Get the path of the ``.npz`` file with the digest and IVF index for stored vectors."""
+    path = Path(path).expanduser().resolve()
+    return path.with_name(f"{path.stem}.index.npz")
+
+
+class EmbeddingMatcher(_BatchFirstMatcher[R], Generic[R]):
+    """A semantic matcher based on the cosine similarity of text embeddings.
+
+    Every normalized text is embedded once with a pluggable encoder, e.g., a
+    sentence-transformers model, and the L2-normalized vectors are stored in a ``.npy``
+    file that is memory-mapped, so only the parts being compared are kept in memory. A
+    digest of the texts, model name, and data type is stored in an ``.npz`` file next to
+    it, along with the IVF index if one is used.
+    Queries are embedded in batches and compared with batched dot products, and the top
+    candidates are selected with :func:`numpy.argpartition`. Matches are scored by
+    scaling the score from :class:`DictMatcher` by the cosine similarity.
+
+    For large lexica, passing ``clusters`` builds an inverted file (IVF) index by
+    clustering the vectors with spherical k-means, so each query is only compared with
+    the vectors in the ``probes`` clusters whose centroids are most similar to it.
+
+    This requires :mod:`numpy`, which can be installed with ``pip install
+    ssslm[embedding]``, and an encoder.
+
+    .. code-block:: python
+
+        import ssslm
+        from sentence_transformers import SentenceTransformer
+        from ssslm.ner import EmbeddingMatcher
+
+        model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        literal_mappings = ssslm.read_literal_mappings(url)
+        matcher = EmbeddingMatcher.from_literal_mappings(
+            literal_mappings,
+            encoder=model.encode,
+            model_name="all-MiniLM-L6-v2",
+            path="anatomy.npy",
+            dtype="float16",
+        )
+
+        matches = matcher.get_matches_batch(["cerebellar neuron", "heart muscle"])
+    """
+
+    def __init__(
+        self,
+        index: dict[str, list[_DictEntry]],
+        *,
+        encoder: Encoder,
+        model_name: str | None = None,
+        path: str | Path | None = None,
+        dtype: Literal["float32", "float16"] = "float32",
+        batch_size: int = 1024,
+        top_k: int = 10,
+        min_similarity: float = 0.5,
+        clusters: int | None = None,
+        probes: int = 4,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the matcher with a pre-built index from normalized text to entries.
+
+        :param index: A dictionary from normalized texts to entries
+        :param encoder: A function that takes a list of texts and returns a 2D array
+            with a vector for each text
+        :param model_name: The name of the encoder's model, which is included in the
+            digest of stored vectors so that vectors from a different model aren't
+            loaded
+        :param path: The path to a ``.npy`` file for storing the vectors. If it exists,
+            the vectors are memory-mapped from it instead of being computed, otherwise
+            the vectors are computed, written to it, then memory-mapped. Its digest and
+            IVF index are stored next to it, see :meth:`save`. If None, the vectors are
+            kept in memory.
+        :param dtype: The data type for storing vectors. ``float16`` halves the size
+            with a small loss of precision.
+        :param batch_size: The number of texts embedded at once
+        :param top_k: The maximum number of candidate texts to consider for each query
+        :param min_similarity: The minimum cosine similarity between a query and a
+            candidate text
+        :param clusters: If given, the number of clusters for an IVF index
+        :param probes: The number of clusters searched for each query, if using an IVF
+            index
+        :param seed: The seed for clustering
+
+        :raises ValueError: If the vectors stored at ``path`` were built from different
+            texts, with a different model, or with a different data type
+        """
+        import numpy as np
+
+        super().__init__(index)
+        self.encoder = encoder
+        self.model_name = model_name
+        self.dtype = dtype
+        self.batch_size = batch_size
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.probes = probes
+        self.seed = seed
+        #: The normalized text for each row of the stored vectors, then of the added vectors
+        self._keys = list(self._index)
+        #: A mask of removed rows, which are skipped when searching
+        self._removed_rows = np.zeros(len(self._keys), dtype=bool)
+        #: Vectors for texts added after the stored vectors were built
+        self._added_vectors = np.zeros((0, 0), dtype=dtype)
+        self._centroids: numpy.ndarray | None = None
+        if clusters is not None:
+            clusters = min(clusters, len(self._keys)) or None
+
+        if path is None:
+            self._vectors = self._encode(self._keys).astype(dtype)
+            if clusters is not None:
+                self._build_ivf(clusters)
+        elif Path(path).expanduser().resolve().is_file():
+            self._load(path, clusters)
+        else:
+            self._write_vectors(Path(path).expanduser().resolve(), dtype)
+            self._memory_map(path)
+            if clusters is not None:
+                self._build_ivf(clusters)
+            self._save_index(path)
+
+    def _update_keys(self, added: list[str], removed: list[str]) -> None:
+        """Update the vectors, only embedding added texts.
+
+        The stored vectors aren't loaded into memory or changed. Instead, rows for
+        removed texts are masked, and vectors for added texts are kept in memory and
+        searched along with the stored vectors. Use :meth:`save` to store the updated
+        vectors. If using an IVF index, added texts are assigned to the most similar of
+        the existing clusters.
+        """
+        import numpy as np
+
+        if removed:
+            removed_keys = set(removed)
+            self._removed_rows |= np.fromiter(
+                (key in removed_keys for key in self._keys), dtype=bool, count=len(self._keys)
+            )
+        if not added:
+            return
+        new_vectors = self._encode(added).astype(self.dtype)
+        if not len(self._added_vectors):
+            self._added_vectors = new_vectors
+        else:
+            self._added_vectors = np.concatenate([self._added_vectors, new_vectors])
+        if self._centroids is not None:
+            new_assignments = np.argmax(
+                np.asarray(new_vectors, dtype=np.float32) @ self._centroids.T, axis=1
+            )
+            self._set_clusters(
+                np.concatenate([self._get_assignments(), new_assignments]), len(self._centroids)
+            )
+        self._keys = self._keys + added
+        self._removed_rows = np.concatenate([self._removed_rows, np.zeros(len(added), dtype=bool)])
+
+    def _encode(self, texts: list[str]) -> numpy.ndarray:
+        """Embed texts in batches and L2-normalize the vectors."""
+        import numpy as np
+
+        results = [
+            _normalize_rows(self.encoder(texts[i : i + self.batch_size]))
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        if not results:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(results)
+
+    def _write_vectors(self, path: Path, dtype: str) -> None:
+        """Embed all texts and write them to a ``.npy`` file, one batch at a time."""
+        import numpy as np
+
+        vectors: numpy.memmap | None = None
+        for i in range(0, len(self._keys), self.batch_size):
+            batch = self._encode(self._keys[i : i + self.batch_size])
+            if vectors is None:
+                vectors = np.lib.format.open_memmap(
+                    path, mode="w+", dtype=dtype, shape=(len(self._keys), batch.shape[1])
+                )
+            vectors[i : i + len(batch)] = batch
+        if vectors is None:
+            np.save(path, np.zeros((0, 0), dtype=dtype))
+        else:
+            vectors.flush()
+
+    def _get_live_keys(self) -> list[str]:
+        """Get the texts for the rows that haven't been removed."""
+        return [
+            key
+            for key, removed in zip(self._keys, self._removed_rows.tolist(), strict=True)
+            if not removed
+        ]
+
+    def _get_digest(self) -> str:
+        """Get a digest of the texts, model name, and data type that the vectors are from."""
+        digest = hashlib.blake2b(f"{self.model_name or ''} {self.dtype}\n".encode())
+        for key in self._get_live_keys():
+            digest.update(key.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def _get_assignments(self) -> numpy.ndarray:
+        """Get the cluster that each row of the vectors is assigned to."""
+        import numpy as np
+
+        rv = np.empty(len(self._keys), dtype=np.int64)
+        for cluster in range(len(self._cluster_offsets) - 1):
+            start, end = self._cluster_offsets[cluster], self._cluster_offsets[cluster + 1]
+            rv[self._cluster_rows[start:end]] = cluster
+        return rv
+
+    def save(self, path: str | Path) -> None:
+        """Save the vectors to a ``.npy`` file, which can be loaded by passing ``path``.
+
+        The digest, and the centroids and cluster assignments of the IVF index if one is
+        used, are saved to an ``.npz`` file next to it.
+        """
+        import numpy as np
+
+        path = Path(path).expanduser().resolve()
+        (rows,) = np.nonzero(~self._removed_rows)
+        # write to a temporary file first, since the vectors might be memory-mapped from
+        # the same path
+        temporary_path = path.with_name(f"{path.name}.tmp")
+        vectors = np.lib.format.open_memmap(
+            temporary_path,
+            mode="w+",
+            dtype=self.dtype,
+            shape=(len(rows), self._get_dimension()),
+        )
+        start = 0
+        for chunk in self._iter_chunks(rows):
+            vectors[start : start + len(chunk)] = chunk
+            start += len(chunk)
+        vectors.flush()
+        del vectors
+        os.replace(temporary_path, path)
+        self._save_index(path)
+
+    def _save_index(self, path: str | Path) -> None:
+        """Save the digest and IVF index for the vectors stored at the path."""
+        import numpy as np
+
+        arrays: dict[str, Any] = {"digest": np.array(self._get_digest())}
+        if self._centroids is not None:
+            arrays.update(
+                seed=np.array(self.seed),
+                centroids=self._centroids,
+                assignments=self._get_assignments()[~self._removed_rows],
+            )
+        with _get_embedding_index_path(path).open("wb") as file:
+            np.savez(file, **arrays)
+
+    def _load(self, path: str | Path, clusters: int | None) -> None:
+        """Load the vectors stored at the path, and their IVF index if it matches."""
+        import numpy as np
+
+        index_path = _get_embedding_index_path(path)
+        if not index_path.is_file():
+            raise ValueError(f"{path} doesn't have a digest at {index_path}")
+        with np.load(index_path) as data:
+            if str(data["digest"]) != self._get_digest():
+                raise ValueError(
+                    f"the vectors in {path} were built from different texts, "
+                    f"with a different model, or with a different data type"
+                )
+            self._memory_map(path)
+            if clusters is None:
+                return
+            if (
+                "centroids" in data
+                and len(data["centroids"]) == clusters
+                and int(data["seed"]) == self.seed
+            ):
+                self._centroids = data["centroids"]
+                self._set_clusters(data["assignments"], clusters)
+                return
+        self._build_ivf(clusters)
+        self._save_index(path)
+
+    def _memory_map(self, path: str | Path) -> None:
+        import numpy as np
+
+        path = Path(path).expanduser().resolve()
+        self._vectors = np.load(path, mmap_mode="r")
+        if self._vectors.dtype != np.dtype(self.dtype):
+            raise ValueError(f"{path} has {self._vectors.dtype} vectors, not {self.dtype}")
+        if self._vectors.shape[0] != len(self._keys):
+            raise ValueError(
+                f"{path} has {self._vectors.shape[0]} vectors, but there are "
+                f"{len(self._keys)} texts"
+            )
+
+    def _get_dimension(self) -> int:
+        """Get the number of dimensions of the vectors."""
+        if len(self._added_vectors):
+            return int(self._added_vectors.shape[1])
+        return int(self._vectors.shape[1])
+
+    def _iter_chunks(self, rows: numpy.ndarray | None = None) -> Iterable[numpy.ndarray]:
+        """Iterate over chunks of the vectors (or some rows of them) as float32 arrays.
+
+        Rows after the stored vectors are read from the vectors for added texts.
+        """
+        import numpy as np
+
+        if rows is None:
+            for vectors in (self._vectors, self._added_vectors):
+                for start in range(0, len(vectors), _EMBEDDING_CHUNK_SIZE):
+                    yield np.asarray(
+                        vectors[start : start + _EMBEDDING_CHUNK_SIZE], dtype=np.float32
+                    )
+            return
+
+        stored = len(self._vectors)
+        for start in range(0, len(rows), _EMBEDDING_CHUNK_SIZE):
+            chunk_rows = rows[start : start + _EMBEDDING_CHUNK_SIZE]
+            is_added = chunk_rows >= stored
+            if not is_added.any():
+                yield np.asarray(self._vectors[chunk_rows], dtype=np.float32)
+                continue
+            chunk = np.empty((len(chunk_rows), self._get_dimension()), dtype=np.float32)
+            chunk[~is_added] = self._vectors[chunk_rows[~is_added]]
+            chunk[is_added] = self._added_vectors[chunk_rows[is_added] - stored]
+            yield chunk
+
+    def _build_ivf(self, clusters: int, *, iterations: int = 10) -> None:
+        """Cluster the vectors with spherical k-means on a sample, then assign all vectors."""
+        import numpy as np
+
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(self._keys), 256 * clusters)
+        sample = np.asarray(
+            self._vectors[np.sort(rng.choice(len(self._keys), sample_size, replace=False))],
+            dtype=np.float32,
+        )
+        centroids = sample[rng.choice(sample_size, clusters, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            # keep the previous centroids for empty clusters
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize_rows(sums)
+
+        assignments = np.concatenate(
+            [np.argmax(chunk @ centroids.T, axis=1) for chunk in self._iter_chunks()]
+        )
+        self._centroids = centroids
+        self._set_clusters(assignments, clusters)
+
+    def _set_clusters(self, assignments: numpy.ndarray, clusters: int) -> None:
+        """Group the rows of the vectors by the cluster each one is assigned to."""
+        import numpy as np
+
+        # the rows for each cluster, sorted so memory-mapped reads are sequential
+        self._cluster_rows = np.argsort(assignments, kind="stable")
+        self._cluster_offsets = np.searchsorted(
+            assignments[self._cluster_rows], np.arange(clusters + 1)
+        )
+
+    def _search(self, queries: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Get the top similarities and rows for each query by comparing all vectors."""
+        import numpy as np
+
+        similarities = np.zeros((len(queries), 0), dtype=np.float32)
+        rows = np.zeros((len(queries), 0), dtype=np.int64)
+        start = 0
+        for chunk in self._iter_chunks():
+            chunk_similarities = queries @ chunk.T
+            chunk_similarities[:, self._removed_rows[start : start + len(chunk)]] = -np.inf
+            chunk_rows = np.broadcast_to(
+                np.arange(start, start + len(chunk)), chunk_similarities.shape
+            )
+            similarities, rows = _top_k(
+                np.concatenate([similarities, chunk_similarities], axis=1),
+                np.concatenate([rows, chunk_rows], axis=1),
+                self.top_k,
+            )
+            start += len(chunk)
+        return similarities, rows
+
+    def _search_ivf(self, queries: numpy.ndarray) -> list[tuple[numpy.ndarray, numpy.ndarray]]:
+        """Get the top similarities and rows for each query by comparing the closest clusters.
+
+        Queries are grouped by cluster, so each cluster's vectors are read once per batch.
+        """
+        import numpy as np
+
+        if self._centroids is None:
+            raise RuntimeError("IVF index was not built")
+        centroid_similarities = queries @ self._centroids.T
+        probes = min(self.probes, len(self._centroids))
+        nearest = np.argpartition(-centroid_similarities, probes - 1, axis=1)[:, :probes]
+        candidates: list[list[tuple[numpy.ndarray, numpy.ndarray]]] = [[] for _ in queries]
+        for cluster in np.unique(nearest).tolist():
+            (cluster_queries,) = np.nonzero((nearest == cluster).any(axis=1))
+            rows = self._cluster_rows[
+                self._cluster_offsets[cluster] : self._cluster_offsets[cluster + 1]
+            ]
+            rows = rows[~self._removed_rows[rows]]
+            if not len(rows):
+                continue
+            similarities = np.concatenate(
+                [queries[cluster_queries] @ chunk.T for chunk in self._iter_chunks(rows)], axis=1
+            )
+            top_similarities, top_rows = _top_k(
+                similarities, np.broadcast_to(rows, similarities.shape), self.top_k
+            )
+            for i, query in enumerate(cluster_queries.tolist()):
+                candidates[query].append((top_similarities[i], top_rows[i]))
+
+        rv = []
+        for query_candidates in candidates:
+            if not query_candidates:
+                rv.append((np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)))
+                continue
+            similarities, rows = _top_k(
+                np.concatenate([similarities for similarities, _ in query_candidates])[None, :],
+                np.concatenate([rows for _, rows in query_candidates])[None, :],
+                self.top_k,
+            )
+            rv.append((similarities[0], rows[0]))
+        return rv
+
+    def get_matches_batch(
+        self,
+        texts: Iterable[str],
+        *,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[list[Match[R]]]:
+        """Get matches for several texts, embedding and comparing them in a batch.
+
+        :param texts: The texts to ground
+        :param organisms: NCBITaxon identifiers. If given, drops matches whose literal
+            mappings are specific to a different taxon
+        :param namespaces: Prefixes. If given, only keeps matches with these prefixes
+        :param kwargs: Unused, accepted for compatibility with other matchers
+
+        :returns: A list of matches for each text, sorted by descending score
+        """
+        texts = list(texts)
+        if not texts or self._removed_rows.all():
+            return [[] for _ in texts]
+        keys = [_normalize(text) for text in texts]
+        queries = self._encode(keys)
+        results: Iterable[tuple[numpy.ndarray, numpy.ndarray]]
+        if self._centroids is None:
+            results = zip(*self._search(queries), strict=True)
+        else:
+            results = self._search_ivf(queries)
+
+        rv: list[list[Match[R]]] = []
+        for key, text, (similarities, rows) in zip(keys, texts, results, strict=True):
+            scores: dict[NamableReference, float] = {}
+            for similarity, row in zip(similarities.tolist(), rows.tolist(), strict=True):
+                if similarity < self.min_similarity:
+                    continue
+                candidate = self._keys[row]
+                for reference, score in self._lookup_scores(
+                    candidate,
+                    text.strip() if candidate == key else None,
+                    organisms=organisms,
+                    namespaces=namespaces,
+                ):
+                    score *= min(1.0, similarity)
+                    if score > scores.get(reference, 0.0):
+                        scores[reference] = score
+            rv.append(_scores_to_matches(scores))
+        return rv
@@ -0,0 +1,194 @@
+"""Combine the matches from several matchers."""
+
+from __future__ import annotations
+
+import weakref
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from typing import Any, Generic, Literal, TypeAlias
+
+from typing_extensions import Self
+
+from .base import Match, Matcher
+from ..model import R
+
+__all__ = [
+    "Aggregation",
+    "EnsembleMatcher",
+]
+
+
+#: A function that combines the scores for the same reference from several matchers
+Aggregation: TypeAlias = Literal["max", "sum", "mean"] | Callable[[list[float]], float]
+
+_AGGREGATIONS: dict[str, Callable[[list[float]], float]] = {
+    "max": max,
+    "sum": sum,
+    "mean": lambda scores: sum(scores) / len(scores),
+}
+
+
+class EnsembleMatcher(Matcher[R], Generic[R]):
+    """A matcher that combines the matches from several matchers.
+
+    Matchers are queried in priority order, and matches for the same reference are
+    merged by aggregating their scores. If ``early_exit_score`` is given, the remaining
+    matchers are skipped as soon as a match with at least that score is found.
+
+    .. code-block:: python
+
+        import ssslm
+        from ssslm.ner import EnsembleMatcher, FuzzyMatcher
+
+        curated = ssslm.make_grounder("curated.ssslm.tsv", implementation="dict")
+        ontology = ssslm.make_grounder("ontology.ssslm.tsv")
+        fuzzy = FuzzyMatcher.from_literal_mappings(
+            ssslm.read_literal_mappings("ontology.ssslm.tsv")
+        )
+
+        matcher = EnsembleMatcher([curated, ontology, fuzzy], early_exit_score=0.9)
+        match = matcher.get_best_match("purkinje cell")
+    """
+
+    def __init__(
+        self,
+        matchers: Sequence[Matcher[R]],
+        *,
+        aggregation: Aggregation = "max",
+        weights: Sequence[float] | None = None,
+        early_exit_score: float | None = None,
+        concurrent: bool = False,
+        executor: Executor | None = None,
+    ) -> None:
+        """Instantiate the matcher around several matchers.
+
+        :param matchers: The matchers, in priority order
+        :param aggregation: How to combine the scores for the same reference from
+            several matchers. Either ``max``, ``sum``, ``mean``, or a function that
+            takes a list of scores and returns a score.
+        :param weights: If given, a weight for each matcher that its scores are
+            multiplied by
+        :param early_exit_score: If given, stops querying matchers once one returns a
+            match with at least this score (after weighting)
+        :param concurrent: Should matchers be queried concurrently in a thread pool? If
+            true and ``early_exit_score`` is given, returns as soon as any matcher
+            returns a sufficient match, without waiting on slower matchers. Note that
+            the results then depend on which matchers finish first.
+        :param executor: The executor for querying matchers concurrently. If not given,
+            a thread pool with one worker per matcher is created, which is shut down by
+            :meth:`close`. Ignored if ``concurrent`` is false.
+        """
+        if not matchers:
+            raise ValueError("at least one matcher is required")
+        if weights is not None and len(weights) != len(matchers):
+            raise ValueError("there must be the same number of weights as matchers")
+        self.matchers = list(matchers)
+        self.weights = list(weights) if weights is not None else [1.0] * len(self.matchers)
+        self._aggregate = (
+            _AGGREGATIONS[aggregation] if isinstance(aggregation, str) else aggregation
+        )
+        self.early_exit_score = early_exit_score
+        self.concurrent = concurrent
+        self._finalizer: weakref.finalize[..., Any] | None = None
+        if concurrent and executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=len(self.matchers), thread_name_prefix="ssslm-ensemble"
+            )
+            # the thread pool is also shut down if the matcher is garbage collected
+            # without being closed
+            self._finalizer = weakref.finalize(self, executor.shutdown, wait=False)
+        self._executor = executor if concurrent else None
+
+    def close(self) -> None:
+        """Shut down the thread pool, if it was created by this matcher.
+
+        An executor passed to the constructor isn't shut down, since it's owned by the
+        caller.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def not_empty(self) -> bool:
+        """Return if any of the matchers are not empty."""
+        return any(matcher.not_empty() for matcher in self.matchers)
+
+    def _is_sufficient(self, matches: list[Match[R]], weight: float) -> bool:
+        return (
+            self.early_exit_score is not None
+            and bool(matches)
+            and matches[0].score * weight >= self.early_exit_score
+        )
+
+    def _merge(self, results: Iterable[tuple[float, list[Match[R]]]]) -> list[Match[R]]:
+        """Merge matches from several matchers, paired with the matchers' weights."""
+        scores: dict[R, list[float]] = {}
+        for weight, matches in results:
+            for match in matches:
+                scores.setdefault(match.reference, []).append(match.score * weight)
+        return sorted(
+            (
+                Match(reference=reference, score=self._aggregate(reference_scores))
+                for reference, reference_scores in scores.items()
+            ),
+            key=lambda match: (-match.score, match.curie),
+        )
+
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:
+        """Get matches from the matchers, merged by reference."""
+        if self._executor is not None:
+            return self._get_matches_concurrent(self._executor, text, **kwargs)
+        results = []
+        for matcher, weight in zip(self.matchers, self.weights, strict=True):
+            matches = matcher.get_matches(text, **kwargs)
+            results.append((weight, matches))
+            if self._is_sufficient(matches, weight):
+                break
+        return self._merge(results)
+
+    def _get_matches_concurrent(
+        self, executor: Executor, text: str, **kwargs: Any
+    ) -> list[Match[R]]:
+        futures = {
+            executor.submit(matcher.get_matches, text, **kwargs): weight
+            for matcher, weight in zip(self.matchers, self.weights, strict=True)
+        }
+        results = []
+        for future in as_completed(futures):
+            weight = futures[future]
+            matches = future.result()
+            results.append((weight, matches))
+            if self._is_sufficient(matches, weight):
+                # don't wait for the slower matchers
+                for other in futures:
+                    other.cancel()
+                break
+        return self._merge(results)
+
+    def get_matches_batch(self, texts: Iterable[str], **kwargs: Any) -> list[list[Match[R]]]:
+        """Get matches for several texts, using each matcher's batch method.
+
+        Each matcher is only queried with the texts that didn't already get a
+        sufficient match from a matcher with higher priority.
+        """
+        if self._executor is not None:
+            return [self.get_matches(text, **kwargs) for text in texts]
+        texts = list(texts)
+        results: list[list[tuple[float, list[Match[R]]]]] = [[] for _ in texts]
+        remaining = list(range(len(texts)))
+        for matcher, weight in zip(self.matchers, self.weights, strict=True):
+            if not remaining:
+                break
+            batch = matcher.get_matches_batch([texts[i] for i in remaining], **kwargs)
+            next_remaining = []
+            for i, matches in zip(remaining, batch, strict=True):
+                results[i].append((weight, matches))
+                if not self._is_sufficient(matches, weight):
+                    next_remaining.append(i)
+            remaining = next_remaining
+        return [self._merge(text_results) for text_results in results]
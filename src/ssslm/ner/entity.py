@@ -0,0 +1,434 @@
+"""Grounders that recognize entities with a NER model, then ground them."""
+
+from __future__ import annotations
+
+import re
+import threading
+from abc import abstractmethod
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Generic, Literal, NamedTuple
+
+import pystow
+from typing_extensions import Self
+
+from .base import Annotation, Grounder, Match, Matcher, WrappedMatcher
+from ..model import R
+
+if TYPE_CHECKING:
+    import gliner
+    import spacy
+    import spacy.tokens
+
+__all__ = [
+    "GLINER_DEFAULT",
+    "SPACY_DISABLE_DEFAULT",
+    "DeduplicationInfo",
+    "GLiNERGrounder",
+    "SpacyGrounder",
+]
+
+
+class DeduplicationInfo(NamedTuple):
+    """Statistics about grounding entity texts found by an annotator."""
+
+    #: The number of entities found
+    entities: int
+    #: The number of entity texts passed to the matcher, after deduplication
+    matched: int
+
+
+class _EntityGrounder(Grounder[R], WrappedMatcher[R], Generic[R]):
+    """A grounder that finds entities with a model and grounds them with a matcher.
+
+    Entity texts are deduplicated before being passed to the matcher, either per
+    document or across all documents in a batch, since the same entity is often
+    mentioned many times.
+    """
+
+    def __init__(
+        self, *, matcher: Matcher[R], deduplicate: Literal["document", "batch"] = "batch"
+    ) -> None:
+        super().__init__(matcher=matcher)
+        self.deduplicate = deduplicate
+        self._entities = 0
+        self._matched = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def with_matcher(self, matcher: Matcher[R]) -> Self:
+        """Get a new grounder with the same model and settings, but a different matcher."""
+
+    def deduplication_info(self) -> DeduplicationInfo:
+        """Get statistics about the deduplication of entity texts."""
+        with self._lock:
+            return DeduplicationInfo(self._entities, self._matched)
+
+    def deduplication_clear(self) -> None:
+        """Reset the statistics about the deduplication of entity texts."""
+        with self._lock:
+            self._entities = self._matched = 0
+
+    def _get_entity_matches(self, texts: list[str], **kwargs: Any) -> dict[str, list[Match[R]]]:
+        """Ground each unique entity text once."""
+        unique_texts = list(dict.fromkeys(texts))
+        with self._lock:
+            self._entities += len(texts)
+            self._matched += len(unique_texts)
+        return dict(zip(unique_texts, self.get_matches_batch(unique_texts, **kwargs), strict=True))
+
+    def _get_batch_entity_matches(
+        self, batch_texts: list[list[str]], **kwargs: Any
+    ) -> list[dict[str, list[Match[R]]]]:
+        """Ground the entity texts for each document, deduplicating based on the settings."""
+        if self.deduplicate == "batch":
+            matches = self._get_entity_matches(
+                [text for texts in batch_texts for text in texts], **kwargs
+            )
+            return [matches] * len(batch_texts)
+        return [self._get_entity_matches(texts, **kwargs) for texts in batch_texts]
+
+
+#: Components in SpaCy pipelines, e.g., from :mod:`scispacy`, that aren't needed for
+#: entity extraction and are skipped by default in :class:`SpacyGrounder`
+SPACY_DISABLE_DEFAULT = ("tagger", "attribute_ruler", "lemmatizer", "parser")
+
+
+class SpacyGrounder(_EntityGrounder[R], Generic[R]):
+    """An annotator that works via spacy.
+
+    .. warning::
+
+        SpaCy is very difficult to get working on modern versions of Python, due to its
+        dependence on NumPy's pre-2.0 release. You're on your own, good luck!
+    """
+
+    spacy_language_model: spacy.Language
+
+    def __init__(
+        self,
+        matcher: Matcher[R],
+        spacy_model: str | spacy.Language,
+        *,
+        batch_size: int | None = None,
+        n_process: int = 1,
+        disable: Iterable[str] | None = None,
+        deduplicate: Literal["document", "batch"] = "batch",
+    ) -> None:
+        """Create a grounder based on a pre-defined matcher and a SpaCy NER model.
+
+        :param matcher: A pre-defined matcher
+        :param spacy_model: The name of a SpaCy model. See
+            https://allenai.github.io/scispacy/ for a list of biomedical and clincal NER
+            models from :mod:`scispacy`.
+        :param batch_size: The number of texts to buffer in :meth:`annotate_batch`.
+            If not given, uses SpaCy's default.
+        :param n_process: The number of processes to use in :meth:`annotate_batch`
+        :param disable: The names of pipeline components to skip. Defaults to
+            :data:`SPACY_DISABLE_DEFAULT`, which are components not needed for entity
+            extraction. Pass an empty list to run the full pipeline.
+        :param deduplicate: Whether entity texts are grounded once per ``document`` or
+            once per ``batch`` in :meth:`annotate_batch`. See
+            :meth:`deduplication_info` for statistics.
+
+        In the following example, a SpaCy grounder is instantiated using an underlying
+        Gilda matcher, which incorporates the disease branch of Medical Subject Headings
+        (MeSH). You'll need to install a SciSpaCy model first with ``pip install
+        https://s3-us-west-2.amazonaws.com/ai2-s2-scispacy/releases/v0.5.4/en_core_sci_sm-0.5.4.tar.gz``.
+
+        .. code-block:: python
+
+            import spacy
+            from ssslm import GildaMatcher, SpacyGrounder
+
+            spacy_model = spacy.load("en_core_sci_sm")
+
+            matcher = GildaMatcher.default()
+            grounder = SpacyGrounder(
+                matcher=matcher,
+                spacy_model=spacy_model,
+            )
+            annotations = grounder.annotate(
+                "The APOE e4 mutation is correlated with risk for Alzheimer's disease."
+            )
+        """
+        super().__init__(matcher=matcher, deduplicate=deduplicate)
+
+        if isinstance(spacy_model, str):
+            import spacy
+
+            self.spacy_language_model = spacy.load(spacy_model)
+        else:
+            self.spacy_language_model = spacy_model
+
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.disable = list(SPACY_DISABLE_DEFAULT if disable is None else disable)
+
+    # docstr-coverage:excused `inherited`
+    def with_matcher(self, matcher: Matcher[R]) -> Self:  # noqa:D102
+        return type(self)(
+            matcher,
+            self.spacy_language_model,
+            batch_size=self.batch_size,
+            n_process=self.n_process,
+            disable=self.disable,
+            deduplicate=self.deduplicate,
+        )
+
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:
+        """Annotate the text using a combination of the spacy annotator, and the wrapped matcher."""
+        document: spacy.tokens.Doc = self.spacy_language_model(text, disable=self.disable)
+        matches = self._get_entity_matches([entity.text for entity in document.ents], **kwargs)
+        return [
+            Annotation(text=text, match=match, start=entity.start_char, end=entity.end_char)
+            for entity in document.ents
+            for match in matches[entity.text]
+        ]
+
+    def annotate_batch(self, texts: Iterable[str], **kwargs: Any) -> list[list[Annotation[R]]]:
+        """Annotate several texts with :meth:`spacy.Language.pipe` and batch grounding."""
+        texts = list(texts)
+        documents: list[spacy.tokens.Doc] = list(
+            self.spacy_language_model.pipe(
+                texts, batch_size=self.batch_size, n_process=self.n_process, disable=self.disable
+            )
+        )
+        batch_matches = self._get_batch_entity_matches(
+            [[entity.text for entity in document.ents] for document in documents], **kwargs
+        )
+        return [
+            [
+                Annotation(text=text, match=match, start=entity.start_char, end=entity.end_char)
+                for entity in document.ents
+                for match in matches[entity.text]
+            ]
+            for text, document, matches in zip(texts, documents, batch_matches, strict=True)
+        ]
+
+
+#: The default model used for GLiNER. See
+#: `here <https://huggingface.co/models?library=gliner>`_
+#: for a list of available alternatives.
+GLINER_DEFAULT = "urchade/gliner_medium-v2.1"
+
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def _get_windows(text: str, size: int, overlap: int) -> list[tuple[int, str]]:
+    """Split a text into windows of words that overlap.
+
+    :param text: The text to split
+    :param size: The maximum number of words in each window
+    :param overlap: The number of words shared by consecutive windows
+
+    :returns: A list of pairs of the character offset of each window in the text and
+        the text of the window
+    """
+    words = [match.span() for match in _WORD_RE.finditer(text)]
+    if len(words) <= size:
+        return [(0, text)]
+    rv = []
+    step = max(1, size - overlap)
+    for i in range(0, len(words), step):
+        start, end = words[i][0], words[min(i + size, len(words)) - 1][1]
+        rv.append((start, text[start:end]))
+        if i + size >= len(words):
+            break
+    return rv
+
+
+def _merge_window_entities(entities: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Merge entities predicted in overlapping windows of the same document.
+
+    :param entities: Entities whose start and end have already been shifted to document
+        offsets
+
+    :returns: Entities sorted by position, keeping the highest scoring entity for each
+        span. Overlapping entities with different spans are all kept.
+    """
+    best: dict[tuple[int, int], dict[str, Any]] = {}
+    for entity in entities:
+        key = entity["start"], entity["end"]
+        if key not in best or best[key].get("score", 0.0) < entity.get("score", 0.0):
+            best[key] = entity
+    return [entity for _, entity in sorted(best.items(), key=lambda pair: pair[0])]
+
+
+@contextmanager
+def _torch_threads(threads: int | None) -> Iterator[None]:
+    """Set the number of threads used by :mod:`torch`, restoring the previous number after."""
+    if threads is None:
+        yield
+        return
+
+    import torch
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+class GLiNERGrounder(_EntityGrounder[R], Generic[R]):
+    """An annotator that works via :mod:`gliner`.
+
+    Texts longer than the model's maximum sequence length are split into overlapping
+    windows of words, which are predicted in batches. Entities are mapped back to
+    positions in the original text, and duplicates from overlapping windows are
+    merged.
+    """
+
+    model: gliner.GLiNER
+
+    def __init__(
+        self,
+        matcher: Matcher[R],
+        *,
+        model: str | gliner.GLiNER | None = None,
+        labels: list[str],
+        threshold: float | None = None,
+        window_size: int = 256,
+        window_overlap: int = 32,
+        batch_size: int = 8,
+        threads: int | None = None,
+        deduplicate: Literal["document", "batch"] = "batch",
+    ) -> None:
+        """Create a grounder based on a pre-defined matcher and a :mod:`gliner` NER model.
+
+        :param matcher: A pre-defined matcher
+        :param model: The name of a :mod:`gliner` model. See `here
+            <https://huggingface.co/models?library=gliner>`_ for a list of models. If
+            not given, defaults to :data:`GLINER_DEFAULT`.
+        :param labels: The labels for entity types.
+
+            .. warning::
+
+                These aren't specifically defined anywhere in the GLiNER docs, so you'll
+                have to experiment with them
+
+        :param threshold: The score threshold for predictions. Defaults to 0.5 if not
+            given.
+        :param window_size: The maximum number of words passed to the model at a time.
+            The default leaves room for sub-word tokenization within GLiNER's default
+            maximum length of 384 tokens.
+        :param window_overlap: The number of words shared by consecutive windows, so
+            entities on the border of a window aren't missed
+        :param batch_size: The number of windows passed to the model at a time
+        :param threads: The number of threads used by :mod:`torch` on CPU during
+            prediction. If not given, uses PyTorch's current setting. Since this setting
+            is global to the process, it's changed only while predicting and restored
+            afterwards, but it also applies to other threads using :mod:`torch` in the
+            meantime.
+        :param deduplicate: Whether entity texts are grounded once per ``document`` or
+            once per ``batch`` in :meth:`annotate_batch`. See
+            :meth:`deduplication_info` for statistics.
+
+        In the following example, a GLiNER grounder is instantiated using an underlying
+        Gilda matcher, which incorporates the disease branch of Medical Subject Headings
+        (MeSH).
+
+        .. code-block:: python
+
+            import spacy
+            from ssslm import GildaMatcher, GLiNERGrounder
+
+            matcher = GildaMatcher.default()
+            grounder = GLiNERGrounder(
+                matcher=matcher,
+                model="urchade/gliner_medium-v2.1",
+                labels=["disease", "protein", "gene"],
+            )
+            annotations = grounder.annotate(
+                "The APOE e4 mutation is correlated with risk for Alzheimer's disease."
+            )
+        """
+        super().__init__(matcher=matcher, deduplicate=deduplicate)
+
+        if window_overlap >= window_size:
+            raise ValueError("window overlap must be smaller than the window size")
+
+        if model is None:
+            model = GLINER_DEFAULT
+        if isinstance(model, str):
+            from gliner import GLiNER
+
+            cache_dir = pystow.module("gliner").base
+            self.model = GLiNER.from_pretrained(model, cache_dir=cache_dir)
+        else:
+            self.model = model
+
+        self.labels = labels
+        self.threshold = threshold or 0.5
+        self.window_size = window_size
+        self.window_overlap = window_overlap
+        self.batch_size = batch_size
+        self.threads = threads
+
+    # docstr-coverage:excused `inherited`
+    def with_matcher(self, matcher: Matcher[R]) -> Self:  # noqa:D102
+        return type(self)(
+            matcher,
+            model=self.model,
+            labels=self.labels,
+            threshold=self.threshold,
+            window_size=self.window_size,
+            window_overlap=self.window_overlap,
+            batch_size=self.batch_size,
+            threads=self.threads,
+            deduplicate=self.deduplicate,
+        )
+
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:
+        """Annotate the text the GLiNER annotator and the wrapped matcher."""
+        return self.annotate_batch([text], **kwargs)[0]
+
+    def _predict_entities(self, texts: list[str]) -> list[list[dict[str, Any]]]:
+        """Predict entities in each text, using windows for long texts."""
+        windows = [
+            (i, offset, window_text)
+            for i, text in enumerate(texts)
+            for offset, window_text in _get_windows(text, self.window_size, self.window_overlap)
+        ]
+        window_entities: list[list[dict[str, Any]]] = []
+        with _torch_threads(self.threads):
+            for batch_start in range(0, len(windows), self.batch_size):
+                window_entities.extend(
+                    self.model.batch_predict_entities(
+                        [
+                            window_text
+                            for _, _, window_text in windows[
+                                batch_start : batch_start + self.batch_size
+                            ]
+                        ],
+                        self.labels,
+                        threshold=self.threshold,
+                    )
+                )
+        document_entities: list[list[dict[str, Any]]] = [[] for _ in texts]
+        for (i, offset, _), entities in zip(windows, window_entities, strict=True):
+            for entity in entities:
+                document_entities[i].append(
+                    {**entity, "start": entity["start"] + offset, "end": entity["end"] + offset}
+                )
+        return [_merge_window_entities(entities) for entities in document_entities]
+
+    def annotate_batch(self, texts: Iterable[str], **kwargs: Any) -> list[list[Annotation[R]]]:
+        """Annotate several texts with GLiNER's batch prediction and batch grounding."""
+        texts = list(texts)
+        batch_entities = self._predict_entities(texts)
+        batch_matches = self._get_batch_entity_matches(
+            [[entity["text"] for entity in entities] for entities in batch_entities], **kwargs
+        )
+        # TODO this also has an entity['score'] that could be used
+        return [
+            [
+                Annotation(text=text, match=match, start=entity["start"], end=entity["end"])
+                for entity in entities
+                for match in matches[entity["text"]]
+            ]
+            for text, entities, matches in zip(texts, batch_entities, batch_matches, strict=True)
+        ]
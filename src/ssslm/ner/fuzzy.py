@@ -0,0 +1,170 @@
+"""A typo-tolerant matcher based on a symmetric deletion index."""
+
+from __future__ import annotations
+
+from typing import Generic
+
+from curies import NamableReference
+
+from .base import Match, Matcher
+from .dictionary import DictMatcher, _DictEntry, _normalize, _scores_to_matches
+from ..model import R
+
+__all__ = [
+    "FuzzyMatcher",
+]
+
+
+def _get_deletes(text: str, max_distance: int) -> set[str]:
+    """Get all strings reachable by deleting up to the given number of characters."""
+    rv = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        frontier = {s[:i] + s[i + 1 :] for s in frontier for i in range(len(s))}
+        rv.update(frontier)
+    return rv
+
+
+def _get_edit_distance(a: str, b: str, max_distance: int) -> int | None:
+    """Get the optimal string alignment distance between two strings.
+
+    :param a: The first string
+    :param b: The second string
+    :param max_distance: The maximum distance of interest
+
+    :returns: The number of insertions, deletions, substitutions, and transpositions of
+        adjacent characters needed to turn the first string into the second, or None if
+        this is more than the maximum distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous_previous: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        # a transposition in the next row builds on the previous row, so stopping early
+        # requires both rows to exceed the maximum distance
+        if min(previous) > max_distance and min(current) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+class FuzzyMatcher(DictMatcher[R], Generic[R]):
+    """A typo-tolerant matcher based on a symmetric deletion index.
+
+    Like in `SymSpell <https://github.com/wolfgarbe/SymSpell>`_, all strings reachable
+    by deleting up to ``max_distance`` characters from each normalized text are
+    precomputed. At query time, the same deletions are generated for the query and
+    looked up, so candidates are found without comparing against every text. Candidates
+    are then verified by their edit distance, and scored by scaling the score from
+    :class:`DictMatcher` by the similarity between the query and the candidate.
+
+    This can be used as a fallback for another (exact) matcher, which is queried first:
+
+    .. code-block:: python
+
+        import ssslm
+        from ssslm.ner import FuzzyMatcher
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/phenotype/phenotype.ssslm.tsv.gz"
+        literal_mappings = ssslm.read_literal_mappings(url)
+
+        grounder = ssslm.make_grounder(literal_mappings)
+        matcher = FuzzyMatcher.from_literal_mappings(literal_mappings, matcher=grounder)
+
+        match = matcher.get_best_match("alzhiemer's disease")
+    """
+
+    def __init__(
+        self,
+        index: dict[str, list[_DictEntry]],
+        *,
+        max_distance: int = 2,
+        prefix_length: int | None = 7,
+        matcher: Matcher[R] | None = None,
+    ) -> None:
+        """Initialize the matcher with a pre-built index from normalized text to entries.
+
+        :param index: A dictionary from normalized texts to entries
+        :param max_distance: The maximum edit distance for a fuzzy match
+        :param prefix_length: The number of leading characters of each text used to
+            generate deletions. As in SymSpell, this bounds the size of the deletion
+            index for long texts. Set to None to use whole texts.
+        :param matcher: A matcher to query first. If it returns any matches, those are
+            returned directly, and fuzzy matching is only used as a fallback.
+        """
+        super().__init__(index)
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._matcher = matcher
+        self._deletes: dict[str, list[str]] = {}
+        self._update_keys(list(self._index), [])
+
+    def _update_keys(self, added: list[str], removed: list[str]) -> None:
+        """Add and remove texts from the deletion index."""
+        for key in added:
+            for delete in _get_deletes(key[: self.prefix_length], self.max_distance):
+                self._deletes.setdefault(delete, []).append(key)
+        for key in removed:
+            for delete in _get_deletes(key[: self.prefix_length], self.max_distance):
+                candidates = self._deletes[delete]
+                candidates.remove(key)
+                if not candidates:
+                    del self._deletes[delete]
+
+    def not_empty(self) -> bool:
+        """Return if this matcher or its fallback has lookups indexed in it."""
+        return super().not_empty() or (self._matcher is not None and self._matcher.not_empty())
+
+    def get_matches(  # type:ignore[override]
+        self,
+        text: str,
+        context: str | None = None,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+    ) -> list[Match[R]]:
+        """Get exact matches if available, or fall back to fuzzy matches.
+
+        :param text: The text to ground
+        :param context: Passed to the wrapped matcher, if available
+        :param organisms: NCBITaxon identifiers. If given, drops matches whose literal
+            mappings are specific to a different taxon
+        :param namespaces: Prefixes. If given, only keeps matches with these prefixes
+
+        :returns: A list of matches, sorted by descending score
+        """
+        if self._matcher is not None:
+            matches = self._matcher.get_matches(
+                text, context=context, organisms=organisms, namespaces=namespaces
+            )
+            if matches:
+                return matches
+
+        key = _normalize(text)
+        matches = self._lookup(key, text.strip(), organisms=organisms, namespaces=namespaces)
+        if matches or not key:
+            return matches
+
+        candidates = {
+            candidate
+            for delete in _get_deletes(key[: self.prefix_length], self.max_distance)
+            for candidate in self._deletes.get(delete, [])
+        }
+        scores: dict[NamableReference, float] = {}
+        for candidate in candidates:
+            distance = _get_edit_distance(key, candidate, self.max_distance)
+            if distance is None:
+                continue
+            similarity = 1.0 - distance / max(len(key), len(candidate))
+            for match in self._lookup(candidate, None, organisms=organisms, namespaces=namespaces):
+                score = match.score * similarity
+                if score > scores.get(match.reference, 0.0):
+                    scores[match.reference] = score
+        return _scores_to_matches(scores)
@@ -0,0 +1,550 @@
+"""Matchers and grounders based on :mod:`gilda`."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeAlias, cast, overload
+
+import pystow
+from curies import NamableReference
+from typing_extensions import Self
+
+from .base import Annotation, AnnotationTable, Grounder, Match, Matcher
+from ..model import GildaErrorPolicy, LiteralMapping, R, literal_mappings_to_gilda
+
+if TYPE_CHECKING:
+    import gilda
+
+__all__ = [
+    "GildaGrounder",
+    "GildaMatcher",
+]
+
+
+#: A key for partitioning Gilda terms, with the prefix, source prefix, and organism
+_GildaPartition: TypeAlias = tuple[str, str | None, str | None]
+
+
+def _get_gilda_partition(term: gilda.Term) -> _GildaPartition:
+    return term.db, term.source_db, term.organism
+
+
+def _in_gilda_scope(
+    partition: _GildaPartition, namespaces: list[str] | None, organisms: list[str] | None
+) -> bool:
+    """Check if Gilda can return terms in a partition for the namespaces and organisms."""
+    prefix, source_prefix, organism = partition
+    return (not namespaces or prefix in namespaces or source_prefix in namespaces) and (
+        # gilda keeps terms without an organism when filtering by organism
+        not organisms or organism is None or organism in organisms
+    )
+
+
+class _ScopedGildaEntries(Mapping[str, list["gilda.Term"]]):
+    """A view of a Gilda grounder's entries that can be restricted to some partitions of terms.
+
+    Gilda only looks up entries with ``entries.get``, so setting :attr:`scope` restricts
+    grounding and annotation to the terms in some partitions, using the same Gilda
+    grounder. Normalized texts without terms in the scope are skipped without looking
+    them up in the underlying entries, which can be a SQLite database.
+    """
+
+    def __init__(self, entries: Mapping[str, list[gilda.Term]]) -> None:
+        """Initialize the view and count the normalized texts in each partition."""
+        self.entries = entries
+        self.partitions: dict[_GildaPartition, Counter[str]] = {}
+        for terms in entries.values():
+            self.update([], terms)
+        self.scope: ContextVar[frozenset[_GildaPartition] | None] = ContextVar(
+            "scope", default=None
+        )
+
+    def update(self, old_terms: list[gilda.Term], new_terms: list[gilda.Term]) -> None:
+        """Update the partitions with the terms that changed in an entry."""
+        # terms don't implement equality, so they're compared by identity
+        old_ids = {id(term) for term in old_terms}
+        new_ids = {id(term) for term in new_terms}
+        for term in old_terms:
+            if id(term) not in new_ids:
+                partition = _get_gilda_partition(term)
+                counter = self.partitions[partition]
+                counter[term.norm_text] -= 1
+                if not counter[term.norm_text]:
+                    del counter[term.norm_text]
+                    if not counter:
+                        del self.partitions[partition]
+        for term in new_terms:
+            if id(term) not in old_ids:
+                self.partitions.setdefault(_get_gilda_partition(term), Counter())[
+                    term.norm_text
+                ] += 1
+
+    def __getitem__(self, key: str) -> list[gilda.Term]:
+        return self.entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the terms for a normalized text that are in the current scope."""
+        scope = self.scope.get()
+        if scope is None:
+            return self.entries.get(key, default)
+        if not any(key in self.partitions[partition] for partition in scope):
+            return default
+        return [term for term in self.entries.get(key, []) if _get_gilda_partition(term) in scope]
+
+
+#: The key for grouping duplicate terms in :func:`gilda.term.filter_out_duplicates`,
+#: with the prefix, identifier, source prefix, source identifier, and text
+_GildaTermKey: TypeAlias = tuple[str, str, str, str, str]
+
+
+#: The priority of each term status in :func:`gilda.term.filter_out_duplicates`
+_GILDA_STATUS_PRIORITIES = {"curated": 1, "name": 2, "synonym": 3, "former_name": 4}
+
+
+def _get_gilda_term_key(term: gilda.Term) -> _GildaTermKey:
+    """Get the key for grouping duplicate terms in :func:`gilda.term.filter_out_duplicates`.
+
+    This is the same as Gilda's private ``_term_key``, which isn't part of its public API.
+    """
+    return term.db, term.id, term.source_db or "", term.source_id or "", term.text
+
+
+def _get_gilda_priority_key(term: gilda.Term) -> tuple[int, int]:
+    """Get the key for choosing between duplicate terms in :func:`gilda.term.filter_out_duplicates`.
+
+    This is the same as Gilda's private ``_priority_key``, which isn't part of its public
+    API. Terms are prioritized by their status, then terms from primary resources are
+    preferred.
+    """
+    return (
+        _GILDA_STATUS_PRIORITIES[term.status],
+        0 if term.db.casefold() == term.source.casefold() else 1,
+    )
+
+
+def _group_duplicate_gilda_terms(
+    terms: Iterable[gilda.Term],
+) -> dict[_GildaTermKey, list[gilda.Term]]:
+    """Group terms that :func:`gilda.term.filter_out_duplicates` chooses between."""
+    rv: dict[_GildaTermKey, list[gilda.Term]] = {}
+    for term in terms:
+        rv.setdefault(_get_gilda_term_key(term), []).append(term)
+    return {key: group for key, group in rv.items() if len(group) > 1}
+
+
+def _get_gilda_sort_key(term: gilda.Term) -> tuple[str, str, str, str, str]:
+    """Get the order of terms after :func:`gilda.term.filter_out_duplicates`."""
+    return term.text, term.db, term.id, term.source_db or "", term.source_id or ""
+
+
+def _get_gilda_prefix_key(norm_text: str) -> tuple[str, int]:
+    """Get the first word and number of words, like in :attr:`gilda.Grounder.prefix_index`."""
+    parts = norm_text.split()
+    return parts[0], len(parts)
+
+
+class GildaMatcher(Matcher[R], Generic[R]):
+    """A matcher that uses gilda as a backend."""
+
+    _reference_cls: type[R]
+
+    def __init__(
+        self,
+        grounder: gilda.Grounder,
+        *,
+        reference_cls: type[R] | None = None,
+        sub_indexes: bool = False,
+        filter_duplicates: bool = True,
+    ) -> None:
+        """Initialize a grounder wrapping a :class:`gilda.Grounder`.
+
+        :param grounder: The Gilda grounder
+        :param reference_cls: The reference class for matches
+        :param sub_indexes: Should the normalized texts of terms be indexed by namespace
+            and organism, so queries that pass ``namespaces`` or ``organisms`` only look
+            up and score the relevant terms? This gives the same results. The Gilda
+            grounder's entries are wrapped in a view, which gives the same results as
+            the original entries when no namespaces or organisms are passed.
+        :param filter_duplicates: Should terms added with :meth:`add_literal_mappings`
+            be deduplicated like in :meth:`from_literal_mappings`?
+        """
+        self._grounder = grounder
+        if reference_cls is None:
+            self._reference_cls = cast(type[R], NamableReference)
+        else:
+            self._reference_cls = reference_cls
+        # references are immutable, so they can be constructed once per term
+        self._references: dict[tuple[str, str], R] = {}
+        self._scoped_entries: _ScopedGildaEntries | None = None
+        if sub_indexes:
+            if not isinstance(grounder.entries, _ScopedGildaEntries):
+                grounder.entries = _ScopedGildaEntries(grounder.entries)
+            self._scoped_entries = grounder.entries
+        self._filter_duplicates = filter_duplicates
+        # all terms with the same key, for keys where duplicates were filtered, so the
+        # next term can be brought back when the chosen one is removed
+        self._duplicate_terms: dict[_GildaTermKey, list[gilda.Term]] = {}
+        # the number of normalized texts per first word and number of words, which is
+        # only needed when removing texts, so it's built lazily
+        self._prefix_counts: Counter[tuple[str, int]] | None = None
+
+    @property
+    def _entries(self) -> dict[str, list[gilda.Term]]:
+        """Get the Gilda grounder's entries, without the view for sub-indexes."""
+        if self._scoped_entries is not None:
+            return cast(dict[str, list["gilda.Term"]], self._scoped_entries.entries)
+        return cast(dict[str, list["gilda.Term"]], self._grounder.entries)
+
+    @contextmanager
+    def _scope(self, namespaces: list[str] | None, organisms: list[str] | None) -> Iterator[None]:
+        """Restrict Gilda lookups to the terms relevant for the namespaces and organisms."""
+        if self._scoped_entries is None or (not namespaces and not organisms):
+            yield
+            return
+        partitions = frozenset(
+            partition
+            for partition in self._scoped_entries.partitions
+            if _in_gilda_scope(partition, namespaces, organisms)
+        )
+        token = self._scoped_entries.scope.set(partitions)
+        try:
+            yield
+        finally:
+            self._scoped_entries.scope.reset(token)
+
+    def not_empty(self) -> bool:
+        """Return if this matcher has lookups indexed in it."""
+        return bool(self._grounder.entries)
+
+    @classmethod
+    def default(cls) -> Self:
+        """Get the default/builtin grounder."""
+        import gilda.api
+
+        grounder = gilda.api.grounder.get_grounder()  # type:ignore[no-untyped-call]
+        return cls(grounder=grounder)
+
+    @classmethod
+    def from_literal_mappings(
+        cls,
+        literal_mappings: Iterable[LiteralMapping[R]],
+        *,
+        prefix_priority: list[str] | None = None,
+        grounder_cls: type[gilda.Grounder] | None = None,
+        filter_duplicates: bool = True,
+        on_error: GildaErrorPolicy = "ignore",
+        **kwargs: Any,
+    ) -> Self:
+        """Initialize a grounder wrapping a :class:`gilda.Grounder`.
+
+        :param literal_mappings: The literal mappings to populate the grounder
+        :param prefix_priority: The priority list of prefixes to break ties. Maps to
+            ``namespace_priority`` in :meth:`gilda.Grounder.__init__`
+        :param grounder_cls: A custom subclass of :class:`gilda.Grounder`, if given.
+        :param filter_duplicates: Should duplicates be filtered using
+            :func:`gilda.term.filter_out_duplicates`? Defaults to true.
+        :param on_error: The policy for what to do on error converting to Gilda
+        :param kwargs: Keyword arguments passed to the constructor, e.g.,
+            ``sub_indexes=True`` to build per-namespace and per-organism sub-indexes
+        """
+        if grounder_cls is None:
+            import gilda
+
+            grounder_cls = gilda.Grounder
+
+        from more_itertools import peekable
+
+        peekable_literal_mappings = peekable(literal_mappings)
+        try:
+            reference_cls = peekable_literal_mappings.peek().reference.__class__
+        except StopIteration:
+            terms = []
+            reference_cls = None
+        else:
+            # this should be able to infer a peekable is an iterable... ignore for now
+            terms = literal_mappings_to_gilda(peekable_literal_mappings, on_error=on_error)
+        duplicate_terms = {}
+        if terms and filter_duplicates:
+            from gilda.term import filter_out_duplicates
+
+            duplicate_terms = _group_duplicate_gilda_terms(terms)
+            # suppress logging counting of terms
+            logging.getLogger("gilda.term").setLevel(logging.WARNING)
+            terms = filter_out_duplicates(terms)  # type:ignore[no-untyped-call]
+        grounder = grounder_cls(terms, namespace_priority=prefix_priority)
+        rv = cls(
+            grounder, reference_cls=reference_cls, filter_duplicates=filter_duplicates, **kwargs
+        )
+        rv._duplicate_terms = duplicate_terms
+        return rv
+
+    def add_literal_mappings(
+        self,
+        literal_mappings: Iterable[LiteralMapping[R]],
+        *,
+        on_error: GildaErrorPolicy = "ignore",
+    ) -> None:
+        """Add literal mappings to the Gilda grounder's entries in place.
+
+        :param literal_mappings: The literal mappings to add
+        :param on_error: The policy for what to do on error converting to Gilda
+
+        Terms are deduplicated and sorted like in :meth:`from_literal_mappings`, and the
+        Gilda grounder's prefix index used for annotation is updated, so the results are
+        the same as if the grounder were built from all literal mappings.
+        """
+        entries = self._entries
+        before: dict[str, list[gilda.Term]] = {}
+        for term in literal_mappings_to_gilda(literal_mappings, on_error=on_error):
+            bucket = entries.setdefault(term.norm_text, [])
+            if term.norm_text not in before:
+                before[term.norm_text] = list(bucket)
+            if not self._filter_duplicates:
+                bucket.append(term)
+                continue
+            key = _get_gilda_term_key(term)
+            position = next(
+                (i for i, other in enumerate(bucket) if _get_gilda_term_key(other) == key), None
+            )
+            if position is None:
+                bucket.append(term)
+                continue
+            group = self._duplicate_terms.get(key)
+            if group is None:
+                group = self._duplicate_terms[key] = [bucket[position]]
+            group.append(term)
+            # this picks the first of the highest priority terms, like a stable sort
+            bucket[position] = min(group, key=_get_gilda_priority_key)
+        if self._filter_duplicates:
+            for norm_text in before:
+                entries[norm_text].sort(key=_get_gilda_sort_key)
+        self._update_entries(before)
+
+    def remove_literal_mappings(
+        self,
+        literal_mappings: Iterable[LiteralMapping[R]],
+        *,
+        on_error: GildaErrorPolicy = "ignore",
+    ) -> None:
+        """Remove literal mappings from the Gilda grounder's entries in place.
+
+        :param literal_mappings: The literal mappings to remove. Ones that aren't in the
+            index are skipped.
+        :param on_error: The policy for what to do on error converting to Gilda
+
+        If a removed term was chosen over duplicates in :meth:`from_literal_mappings` or
+        :meth:`add_literal_mappings`, the next duplicate takes its place.
+        """
+        entries = self._entries
+        if self._prefix_counts is None:
+            self._prefix_counts = Counter(_get_gilda_prefix_key(norm_text) for norm_text in entries)
+        before: dict[str, list[gilda.Term]] = {}
+        for term in literal_mappings_to_gilda(literal_mappings, on_error=on_error):
+            bucket = entries.get(term.norm_text)
+            if not bucket:
+                continue
+            if term.norm_text not in before:
+                before[term.norm_text] = list(bucket)
+            row = term.to_list()
+            key = _get_gilda_term_key(term)
+            group = self._duplicate_terms.get(key) if self._filter_duplicates else None
+            if group is None:
+                position = next(
+                    (i for i, other in enumerate(bucket) if other.to_list() == row), None
+                )
+                if position is not None:
+                    del bucket[position]
+                continue
+            index = next((i for i, other in enumerate(group) if other.to_list() == row), None)
+            if index is None:
+                continue
+            del group[index]
+            if len(group) == 1:
+                del self._duplicate_terms[key]
+            # the replacement has the same key, so the order of the bucket doesn't change
+            position = next(
+                i for i, other in enumerate(bucket) if _get_gilda_term_key(other) == key
+            )
+            bucket[position] = min(group, key=_get_gilda_priority_key)
+        self._update_entries(before)
+
+    def _update_entries(self, before: dict[str, list[gilda.Term]]) -> None:
+        """Update the prefix index, sub-indexes, and caches for changed entries.
+
+        :param before: A dictionary from normalized texts whose entries changed to a
+            copy of their entries before the change
+        """
+        entries = self._entries
+        for norm_text, old_terms in before.items():
+            new_terms = entries[norm_text]
+            if new_terms and not old_terms:
+                self._update_prefix_index(norm_text, 1)
+            elif old_terms and not new_terms:
+                del entries[norm_text]
+                self._update_prefix_index(norm_text, -1)
+            if self._scoped_entries is not None:
+                self._scoped_entries.update(old_terms, new_terms)
+        self._references.clear()
+
+    def _update_prefix_index(self, norm_text: str, delta: int) -> None:
+        """Update the Gilda grounder's prefix index for an added or removed normalized text."""
+        prefix_index = self._grounder.prefix_index
+        word, length = prefix_key = _get_gilda_prefix_key(norm_text)
+        if delta > 0:
+            prefix_index.setdefault(word, set()).add(length)
+        if self._prefix_counts is None:
+            return
+        self._prefix_counts[prefix_key] += delta
+        if not self._prefix_counts[prefix_key]:
+            del self._prefix_counts[prefix_key]
+            prefix_index[word].discard(length)
+            if not prefix_index[word]:
+                del prefix_index[word]
+
+    def _get_reference(self, term: gilda.Term) -> R:
+        """Get a reference for a Gilda term."""
+        key = term.db, term.id
+        reference = self._references.get(key)
+        if reference is None:
+            reference = self._references[key] = self._reference_cls(
+                prefix=term.db, identifier=term.id, name=term.entry_name
+            )
+        return reference
+
+    def _convert_gilda_match(self, scored_match: gilda.ScoredMatch) -> Match[R]:
+        """Wrap a Gilda scored match."""
+        return Match(reference=self._get_reference(scored_match.term), score=scored_match.score)
+
+    def get_matches(  # type:ignore[override]
+        self,
+        text: str,
+        context: str | None = None,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+        *,
+        limit: int | None = None,
+        min_score: float | None = None,
+    ) -> list[Match[R]]:
+        """Get matches in the SSSLM format using :meth:`gilda.Grounder.ground`.
+
+        :param text: The text to ground
+        :param context: Optional context for disambiguation
+        :param organisms: NCBITaxon identifiers, used to prioritize matches
+        :param namespaces: Prefixes. If given, only keeps matches with these prefixes
+        :param limit: If given, the maximum number of matches to return
+        :param min_score: If given, drops matches whose scores are lower
+
+        :returns: A list of matches, sorted by descending score
+
+        Since Gilda returns matches sorted by descending score, the limit and minimum
+        score are applied before converting Gilda's matches.
+        """
+        with self._scope(namespaces, organisms):
+            scored_matches = self._grounder.ground(  # type:ignore[no-untyped-call]
+                text, context=context, organisms=organisms, namespaces=namespaces
+            )
+        if min_score is not None:
+            scored_matches = itertools.takewhile(
+                lambda scored_match: scored_match.score >= min_score, scored_matches
+            )
+        if limit is not None:
+            scored_matches = itertools.islice(scored_matches, limit)
+        return [self._convert_gilda_match(scored_match) for scored_match in scored_matches]
+
+    # docstr-coverage:excused `overload`
+    @overload
+    def get_best_match(
+        self, text: str, *, strict: Literal[False] = ..., **kwargs: Any
+    ) -> Match[R] | None: ...
+
+    # docstr-coverage:excused `overload`
+    @overload
+    def get_best_match(
+        self, text: str, *, strict: Literal[True] = ..., **kwargs: Any
+    ) -> Match[R]: ...
+
+    def get_best_match(self, text: str, *, strict: bool = False, **kwargs: Any) -> Match[R] | None:
+        """Get the best match in the SSSLM format, only converting the top Gilda match."""
+        kwargs.setdefault("limit", 1)
+        matches = self.get_matches(text, **kwargs)
+        if matches:
+            return matches[0]
+        elif strict:
+            raise ValueError
+        else:
+            return None
+
+    def get_best_match_batch(self, texts: Iterable[str], **kwargs: Any) -> list[Match[R] | None]:
+        """Get the best match for several texts, only converting the top Gilda matches."""
+        kwargs.setdefault("limit", 1)
+        return super().get_best_match_batch(texts, **kwargs)
+
+    def get_matches_batch(self, texts: Iterable[str], **kwargs: Any) -> list[list[Match[R]]]:
+        """Get matches in the SSSLM format for several texts, grounding repeated texts once."""
+        cache: dict[str, list[Match[R]]] = {}
+        rv = []
+        for text in texts:
+            matches = cache.get(text)
+            if matches is None:
+                matches = cache[text] = self.get_matches(text, **kwargs)
+            rv.append(list(matches))
+        return rv
+
+
+class GildaGrounder(Grounder[R], GildaMatcher[R], Generic[R]):
+    """A grounder and annotator that uses gilda as a backend."""
+
+    def __init__(
+        self, grounder: gilda.Grounder, *, reference_cls: type[R] | None = None, **kwargs: Any
+    ) -> None:
+        """Initialize a grounder wrapping a :class:`gilda.Grounder`."""
+        super().__init__(grounder, reference_cls=reference_cls, **kwargs)
+
+        pystow.ensure_nltk("stopwords")  # very important - do this before importing gilda.ner
+
+        import gilda.ner
+
+        self._annotate = gilda.ner.annotate
+
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:
+        """Annotate the text."""
+        with self._scope(kwargs.get("namespaces"), kwargs.get("organisms")):
+            annotations = self._annotate(text, grounder=self._grounder, **kwargs)
+        return [
+            Annotation(
+                text=text,
+                match=self._convert_gilda_match(match),
+                start=annotation.start,
+                end=annotation.end,
+            )
+            for annotation in annotations
+            for match in annotation.matches
+        ]
+
+    def annotate_batch_raw(self, texts: Iterable[str], **kwargs: Any) -> AnnotationTable[R]:
+        """Annotate several texts, returning a compact table."""
+        rv: AnnotationTable[R] = AnnotationTable()
+        for document, text in enumerate(texts):
+            with self._scope(kwargs.get("namespaces"), kwargs.get("organisms")):
+                annotations = self._annotate(text, grounder=self._grounder, **kwargs)
+            for annotation in annotations:
+                for scored_match in annotation.matches:
+                    rv.add(
+                        document,
+                        annotation.start,
+                        annotation.end,
+                        self._get_reference(scored_match.term),
+                        scored_match.score,
+                    )
+        return rv
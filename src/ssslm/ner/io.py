@@ -0,0 +1,436 @@
+"""Read and write annotations."""
+
+from __future__ import annotations
+
+import io
+import itertools
+import json
+from collections import deque
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, TextIO, TypeAlias, cast, overload
+
+from curies import NamableReference
+from pystow.utils import safe_open, safe_open_dict_reader, safe_open_writer
+
+from .base import Annotation, Match
+from ..model import R
+
+if TYPE_CHECKING:
+    import pyarrow
+
+__all__ = [
+    "ANNOTATION_COLUMNS",
+    "CORPUS_ANNOTATION_COLUMNS",
+    "AnnotationFormat",
+    "iter_annotations",
+    "iter_corpus_annotations",
+    "read_annotations",
+    "read_corpus_annotations",
+    "write_annotations",
+]
+
+
+#: The formats for reading and writing annotations
+AnnotationFormat: TypeAlias = Literal["tsv", "jsonl", "parquet"]
+
+#: The columns in files written with :func:`write_annotations`
+ANNOTATION_COLUMNS = ("curie", "name", "score", "start", "end", "text")
+
+#: The columns in files written with :func:`write_corpus_annotations`
+CORPUS_ANNOTATION_COLUMNS = ("document_id", *ANNOTATION_COLUMNS)
+
+
+def _get_annotation_format(
+    path: str | Path | TextIO, annotation_format: AnnotationFormat | None
+) -> AnnotationFormat:
+    """Get the annotation format, guessing from the file extension if not given."""
+    if annotation_format is None:
+        annotation_format = _guess_annotation_format(path)
+    if annotation_format == "parquet" and isinstance(path, io.TextIOBase):
+        raise ValueError("Parquet is a binary format, so it needs a path, not a text file")
+    return annotation_format
+
+
+def _guess_annotation_format(path: str | Path | TextIO) -> AnnotationFormat:
+    if not isinstance(path, str | Path):
+        return "tsv"
+    suffixes = Path(path).suffixes
+    if suffixes[-2:] == [".parquet", ".gz"]:
+        raise ValueError(
+            f"Parquet files are compressed internally, so they can't be gzipped: {path}"
+        )
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes = suffixes[:-1]
+    if suffixes and suffixes[-1] == ".jsonl":
+        return "jsonl"
+    if suffixes and suffixes[-1] == ".parquet":
+        return "parquet"
+    return "tsv"
+
+
+# docstr-coverage:excused `overload`
+@overload
+def read_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: type[R] = ...,
+    annotation_format: AnnotationFormat | None = ...,
+    trusted: bool = ...,
+) -> list[Annotation[R]]: ...
+
+
+# docstr-coverage:excused `overload`
+@overload
+def read_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: None = ...,
+    annotation_format: AnnotationFormat | None = ...,
+    trusted: bool = ...,
+) -> list[Annotation[NamableReference]]: ...
+
+
+def read_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: type[R] | None = None,
+    annotation_format: AnnotationFormat | None = None,
+    trusted: bool = False,
+) -> list[Annotation[R]] | list[Annotation[NamableReference]]:
+    """Read annotations from a file, see :func:`iter_annotations`."""
+    if reference_cls is None:
+        return list(iter_annotations(path, annotation_format=annotation_format, trusted=trusted))
+    return list(
+        iter_annotations(
+            path,
+            reference_cls=reference_cls,
+            annotation_format=annotation_format,
+            trusted=trusted,
+        )
+    )
+
+
+# docstr-coverage:excused `overload`
+@overload
+def iter_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: type[R] = ...,
+    annotation_format: AnnotationFormat | None = ...,
+    trusted: bool = ...,
+) -> Iterable[Annotation[R]]: ...
+
+
+# docstr-coverage:excused `overload`
+@overload
+def iter_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: None = ...,
+    annotation_format: AnnotationFormat | None = ...,
+    trusted: bool = ...,
+) -> Iterable[Annotation[NamableReference]]: ...
+
+
+def iter_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: type[R] | None = None,
+    annotation_format: AnnotationFormat | None = None,
+    trusted: bool = False,
+) -> Iterable[Annotation[R]] | Iterable[Annotation[NamableReference]]:
+    """Iterate over annotations in a file, without loading the whole file.
+
+    :param path: The path to a file written by :func:`write_annotations`
+    :param reference_cls: The class for references. Defaults to
+        :class:`curies.NamableReference`.
+    :param annotation_format: The format of the file. If not given, guesses from the
+        file extension (``.jsonl`` or ``.parquet``, optionally followed by ``.gz`` for
+        JSONL), and otherwise uses TSV.
+    :param trusted: If true, skips validating annotations, and constructs one reference
+        per CURIE and name. This is much faster, but should only be used for files written by
+        :func:`write_annotations`.
+
+    :yields: Annotations
+    """
+    records = _iter_records(path, annotation_format)
+    if reference_cls is None:
+        return _records_to_annotations(records, NamableReference, trusted=trusted)
+    return _records_to_annotations(records, reference_cls, trusted=trusted)
+
+
+# docstr-coverage:excused `overload`
+@overload
+def read_corpus_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: type[R] = ...,
+    annotation_format: AnnotationFormat | None = ...,
+    trusted: bool = ...,
+) -> dict[str, list[Annotation[R]]]: ...
+
+
+# docstr-coverage:excused `overload`
+@overload
+def read_corpus_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: None = ...,
+    annotation_format: AnnotationFormat | None = ...,
+    trusted: bool = ...,
+) -> dict[str, list[Annotation[NamableReference]]]: ...
+
+
+def read_corpus_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: type[R] | None = None,
+    annotation_format: AnnotationFormat | None = None,
+    trusted: bool = False,
+) -> dict[str, list[Annotation[R]]] | dict[str, list[Annotation[NamableReference]]]:
+    """Read annotations from a file, grouped by document, see :func:`iter_corpus_annotations`.
+
+    :returns: A dictionary from document identifiers to their annotations. Documents
+        without annotations aren't included.
+    """
+    rv: dict[str, list[Any]] = {}
+    for document_id, annotation in iter_corpus_annotations(
+        path, reference_cls=reference_cls, annotation_format=annotation_format, trusted=trusted
+    ):
+        rv.setdefault(document_id, []).append(annotation)
+    return rv
+
+
+# docstr-coverage:excused `overload`
+@overload
+def iter_corpus_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: type[R] = ...,
+    annotation_format: AnnotationFormat | None = ...,
+    trusted: bool = ...,
+) -> Iterable[tuple[str, Annotation[R]]]: ...
+
+
+# docstr-coverage:excused `overload`
+@overload
+def iter_corpus_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: None = ...,
+    annotation_format: AnnotationFormat | None = ...,
+    trusted: bool = ...,
+) -> Iterable[tuple[str, Annotation[NamableReference]]]: ...
+
+
+def iter_corpus_annotations(
+    path: str | Path | TextIO,
+    *,
+    reference_cls: type[R] | None = None,
+    annotation_format: AnnotationFormat | None = None,
+    trusted: bool = False,
+) -> Iterable[tuple[str, Annotation[R]]] | Iterable[tuple[str, Annotation[NamableReference]]]:
+    """Iterate over annotations in a file, with the identifiers of their documents.
+
+    :param path: The path to a file written by :func:`write_corpus_annotations`
+    :param reference_cls: The class for references. Defaults to
+        :class:`curies.NamableReference`.
+    :param annotation_format: The format of the file, see :func:`iter_annotations`
+    :param trusted: If true, skips validating annotations, see :func:`iter_annotations`
+
+    :yields: Pairs of document identifiers and annotations
+    """
+    # each record gives one annotation, so the identifiers are taken in the same order
+    document_ids: deque[str] = deque()
+
+    def _records() -> Iterable[dict[str, Any]]:
+        for record in _iter_records(path, annotation_format):
+            document_ids.append(str(record.pop("document_id")))
+            yield record
+
+    for annotation in _records_to_annotations(
+        _records(), NamableReference if reference_cls is None else reference_cls, trusted=trusted
+    ):
+        yield document_ids.popleft(), annotation
+
+
+def _iter_records(
+    path: str | Path | TextIO, annotation_format: AnnotationFormat | None
+) -> Iterable[dict[str, Any]]:
+    annotation_format = _get_annotation_format(path, annotation_format)
+    if annotation_format == "tsv":
+        return _iter_tsv_records(path)
+    elif annotation_format == "jsonl":
+        return _iter_jsonl_records(path)
+    elif annotation_format == "parquet":
+        return _iter_parquet_records(path)
+    else:
+        raise ValueError(f"unknown annotation format: {annotation_format}")
+
+
+def _records_to_annotations(
+    records: Iterable[dict[str, Any]], reference_cls: type[R], *, trusted: bool
+) -> Iterable[Annotation[R]]:
+    if not trusted:
+        for record in records:
+            record["match"] = Match(
+                reference=reference_cls.from_curie(
+                    record.pop("curie"), name=record.pop("name") or None
+                ),
+                score=record.pop("score"),
+            )
+            yield Annotation.model_validate(
+                {k: v for k, v in record.items() if k and v is not None and v != ""}
+            )
+        return
+
+    references: dict[tuple[str, str | None], R] = {}
+    for record in records:
+        key = record["curie"], record["name"] or None
+        reference = references.get(key)
+        if reference is None:
+            prefix, identifier = key[0].split(":", 1)
+            reference = references[key] = cast(
+                R, reference_cls.model_construct(prefix=prefix, identifier=identifier, name=key[1])
+            )
+        yield Annotation.model_construct(
+            text=record["text"],
+            start=int(record["start"]),
+            end=int(record["end"]),
+            match=Match.model_construct(reference=reference, score=float(record["score"])),
+        )
+
+
+def _iter_tsv_records(path: str | Path | TextIO) -> Iterable[dict[str, Any]]:
+    with safe_open_dict_reader(path) as reader:
+        yield from reader
+
+
+def _iter_jsonl_records(path: str | Path | TextIO) -> Iterable[dict[str, Any]]:
+    with safe_open(path, operation="read", representation="text") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_parquet_records(path: str | Path | TextIO) -> Iterable[dict[str, Any]]:
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches():
+        # converting columns is faster than converting rows with to_pylist()
+        columns = [_parquet_column_to_list(column) for column in batch.columns]
+        for row in zip(*columns, strict=True):
+            yield dict(zip(batch.schema.names, row, strict=True))
+
+
+def _parquet_column_to_list(column: pyarrow.Array) -> list[Any]:
+    import pyarrow as pa
+
+    if not pa.types.is_dictionary(column.type):
+        return cast(list[Any], column.to_pylist())
+    # decode each value in the dictionary once, so rows share the same string objects
+    dictionary = column.dictionary.to_pylist()
+    return [None if i is None else dictionary[i] for i in column.indices.to_pylist()]
+
+
+def _annotation_to_row(annotation: Annotation[R]) -> tuple[str, str, float, int, int, str]:
+    return (
+        annotation.curie,
+        annotation.name or "",
+        annotation.match.score,
+        annotation.start,
+        annotation.end,
+        annotation.text,
+    )
+
+
+def write_annotations(
+    annotations: Iterable[Annotation[R]],
+    path: str | Path | TextIO,
+    *,
+    annotation_format: AnnotationFormat | None = None,
+    batch_size: int = 100_000,
+) -> None:
+    """Write annotations to a file, streaming.
+
+    :param annotations: An iterable of annotations, which is consumed lazily
+    :param path: The path to write to
+    :param annotation_format: The format of the file. If not given, guesses from the
+        file extension (``.jsonl`` or ``.parquet``, optionally followed by ``.gz`` for
+        JSONL), and otherwise uses TSV.
+    :param batch_size: The number of annotations in each row group, for Parquet
+
+    Parquet files are written with :mod:`pyarrow`. The CURIE, name, and text columns
+    are dictionary-encoded, since the same values appear in many rows.
+    """
+    _write_rows(
+        (_annotation_to_row(annotation) for annotation in annotations),
+        ANNOTATION_COLUMNS,
+        path,
+        annotation_format=annotation_format,
+        batch_size=batch_size,
+    )
+
+
+def _write_rows(
+    rows: Iterable[tuple[Any, ...]],
+    columns: tuple[str, ...],
+    path: str | Path | TextIO,
+    *,
+    annotation_format: AnnotationFormat | None,
+    batch_size: int,
+) -> None:
+    annotation_format = _get_annotation_format(path, annotation_format)
+    if annotation_format == "tsv":
+        with safe_open_writer(path) as writer:
+            writer.writerow(columns)
+            writer.writerows(rows)
+    elif annotation_format == "jsonl":
+        with safe_open(path, operation="write", representation="text") as file:
+            for row in rows:
+                file.write(json.dumps(dict(zip(columns, row, strict=True))) + "\n")
+    elif annotation_format == "parquet":
+        _write_parquet(rows, columns, path, batch_size=batch_size)
+    else:
+        raise ValueError(f"unknown annotation format: {annotation_format}")
+
+
+def _get_parquet_type(column: str) -> pyarrow.DataType:
+    import pyarrow as pa
+
+    if column == "score":
+        return pa.float64()
+    if column in {"start", "end"}:
+        return pa.int64()
+    if column == "document_id":
+        return pa.string()
+    # the same values appear in many rows
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def _write_parquet(
+    rows: Iterable[tuple[Any, ...]],
+    columns: tuple[str, ...],
+    path: str | Path | TextIO,
+    *,
+    batch_size: int,
+) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, _get_parquet_type(column)) for column in columns])
+    rows = iter(rows)
+    with pq.ParquetWriter(path, schema) as writer:
+        while batch := list(itertools.islice(rows, batch_size)):
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        pa.array(column, type=field.type)
+                        if not pa.types.is_dictionary(field.type)
+                        else pa.array(column, type=pa.string()).dictionary_encode()
+                        for field, column in zip(schema, zip(*batch, strict=True), strict=True)
+                    ],
+                    schema=schema,
+                )
+            )
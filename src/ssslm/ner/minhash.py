@@ -0,0 +1,353 @@
+"""An approximate matcher based on MinHash-LSH of character n-grams."""
+
+from __future__ import annotations
+
+import hashlib
+import zlib
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Generic
+
+from curies import NamableReference
+
+from .base import Match
+from .dictionary import _BatchFirstMatcher, _DictEntry, _normalize, _scores_to_matches
+from ..model import R
+
+if TYPE_CHECKING:
+    import numpy
+
+__all__ = [
+    "MinHashMatcher",
+]
+
+
+def _get_shingles(key: str, n: int) -> set[str]:
+    """Get the character n-grams of a normalized text, padded with spaces."""
+    padded = f" {key} "
+    return {padded[i : i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def _get_minhash_signatures(
+    shingles: list[set[str]], multipliers: numpy.ndarray, increments: numpy.ndarray
+) -> numpy.ndarray:
+    """Get a MinHash signature for each set of character n-grams.
+
+    Each n-gram is hashed with CRC32, then permuted with a multiply-add-shift hash for
+    each of the signature's positions. The n-grams of all sets are hashed at once, then
+    the minimum for each set is found with :func:`numpy.minimum.reduceat`.
+    """
+    import numpy as np
+
+    lengths = np.fromiter((len(key_shingles) for key_shingles in shingles), dtype=np.int64)
+    offsets = np.zeros(len(shingles), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    hashes = np.fromiter(
+        (
+            zlib.crc32(shingle.encode("utf-8"))
+            for key_shingles in shingles
+            for shingle in key_shingles
+        ),
+        dtype=np.uint64,
+        count=int(lengths.sum()),
+    )
+    # this relies on unsigned integer overflow wrapping around
+    values = (hashes[:, None] * multipliers + increments) >> np.uint64(32)
+    return np.minimum.reduceat(values, offsets, axis=0).astype(np.uint32)
+
+
+def _get_key_minhash_signatures(
+    keys: list[str], n: int, multipliers: numpy.ndarray, increments: numpy.ndarray
+) -> numpy.ndarray:
+    """Get a MinHash signature for the character n-grams of each normalized text."""
+    return _get_minhash_signatures([_get_shingles(key, n) for key in keys], multipliers, increments)
+
+
+#: The number of texts whose MinHash signatures are computed at once
+_MINHASH_CHUNK_SIZE = 4096
+
+
+class MinHashMatcher(_BatchFirstMatcher[R], Generic[R]):
+    """An approximate matcher based on locality-sensitive hashing (LSH) of MinHash signatures.
+
+    Each normalized text is represented by the set of its character n-grams, which is
+    summarized by a MinHash signature of ``bands * rows`` hashes. Signatures are split
+    into bands, and texts whose signatures agree on all rows of any band are candidates
+    for a query. This finds texts whose n-grams have a Jaccard similarity above roughly
+    :math:`(1 / bands)^{1 / rows}` without comparing against every text. Candidates are
+    then re-ranked by their exact Jaccard similarity, and scored by scaling the score
+    from :class:`DictMatcher` by the similarity.
+
+    Band hashes are kept in sorted NumPy arrays, so a batch of queries is looked up with
+    :func:`numpy.searchsorted`. This requires :mod:`numpy`, which can be installed with
+    ``pip install ssslm[minhash]``.
+
+    Computing signatures for a large lexicon is the most expensive part of building the
+    index, so it can be done in several processes with ``workers``, and the index can be
+    stored with ``path`` and loaded the next time the matcher is built from the same
+    literal mappings.
+
+    .. code-block:: python
+
+        import ssslm
+        from ssslm.ner import MinHashMatcher
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        literal_mappings = ssslm.read_literal_mappings(url)
+        matcher = MinHashMatcher.from_literal_mappings(
+            literal_mappings, workers=4, path="anatomy.minhash.npz"
+        )
+
+        matches = matcher.get_matches_batch(["purkinje cells", "hippocampal neuron"])
+    """
+
+    def __init__(
+        self,
+        index: dict[str, list[_DictEntry]],
+        *,
+        n: int = 3,
+        bands: int = 16,
+        rows: int = 4,
+        top_k: int = 10,
+        min_similarity: float = 0.5,
+        seed: int = 0,
+        workers: int | None = None,
+        path: str | Path | None = None,
+    ) -> None:
+        """Initialize the matcher with a pre-built index from normalized text to entries.
+
+        :param index: A dictionary from normalized texts to entries
+        :param n: The length of character n-grams
+        :param bands: The number of bands in the LSH index. More bands find more
+            candidates with lower similarity.
+        :param rows: The number of rows in each band. More rows find fewer candidates
+            with lower similarity.
+        :param top_k: The maximum number of candidate texts to consider for each query
+        :param min_similarity: The minimum Jaccard similarity between the n-grams of a
+            query and a candidate text
+        :param seed: The seed for generating the hash functions for signatures
+        :param workers: The number of processes for computing signatures. If None or 1,
+            computes them in the current process.
+        :param path: The path to an ``.npz`` file for storing the index. If it exists,
+            the index is loaded from it instead of being computed, otherwise the index
+            is computed and saved to it.
+
+        :raises ValueError: If the index stored at ``path`` was built from different
+            texts or with different parameters
+        """
+        import numpy as np
+
+        super().__init__(index)
+        self.n = n
+        self.bands = bands
+        self.rows = rows
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.seed = seed
+        self._keys = list(self._index)
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(0, 2**64, size=bands * rows, dtype=np.uint64) | 1
+        self._increments = rng.integers(0, 2**64, size=bands * rows, dtype=np.uint64)
+        self._band_multipliers = rng.integers(0, 2**64, size=rows, dtype=np.uint64) | 1
+
+        if path is not None and Path(path).is_file():
+            self._load(path)
+        else:
+            signatures = self._get_signatures(self._keys, workers=workers)
+            band_hashes = self._get_band_hashes(signatures).T
+            self._sort_bands(band_hashes, np.arange(len(self._keys)))
+            if path is not None:
+                self.save(path)
+
+    def _sort_bands(self, band_hashes: numpy.ndarray, band_order: numpy.ndarray) -> None:
+        """Sort the hashes in each band, along with the positions of their texts."""
+        import numpy as np
+
+        order = np.argsort(band_hashes, axis=1, kind="stable")
+        self._band_hashes = np.take_along_axis(band_hashes, order, axis=1)
+        band_order = np.take_along_axis(
+            np.broadcast_to(band_order, band_hashes.shape), order, axis=1
+        )
+        # positions are stored compactly, since there are one per text per band
+        self._band_order = band_order.astype(np.uint32 if len(self._keys) < 2**32 else np.uint64)
+
+    def _update_keys(self, added: list[str], removed: list[str]) -> None:
+        """Update the band hashes, only computing signatures for added texts.
+
+        The index stored at ``path`` isn't changed, so it can't be loaded for the
+        updated texts. Use :meth:`save` to store the updated index.
+        """
+        import numpy as np
+
+        if removed:
+            removed_keys = set(removed)
+            keep = np.fromiter(
+                (key not in removed_keys for key in self._keys), dtype=bool, count=len(self._keys)
+            )
+            # each band has one hash per text, so the same number are kept in each band
+            mask = keep[self._band_order]
+            self._band_hashes = self._band_hashes[mask].reshape(self.bands, -1)
+            positions = np.cumsum(keep) - 1
+            self._band_order = (
+                positions[self._band_order[mask]]
+                .reshape(self.bands, -1)
+                .astype(self._band_order.dtype)
+            )
+            self._keys = [key for key in self._keys if key not in removed_keys]
+        if added:
+            start = len(self._keys)
+            self._keys = self._keys + added
+            self._sort_bands(
+                np.concatenate(
+                    [self._band_hashes, self._get_band_hashes(self._get_signatures(added)).T],
+                    axis=1,
+                ),
+                np.concatenate(
+                    [
+                        self._band_order,
+                        np.broadcast_to(
+                            np.arange(start, len(self._keys)), (self.bands, len(added))
+                        ),
+                    ],
+                    axis=1,
+                ),
+            )
+
+    def _get_signatures(self, keys: list[str], *, workers: int | None = None) -> numpy.ndarray:
+        """Get MinHash signatures for normalized texts, optionally in several processes."""
+        import numpy as np
+
+        chunks = [
+            keys[i : i + _MINHASH_CHUNK_SIZE] for i in range(0, len(keys), _MINHASH_CHUNK_SIZE)
+        ]
+        func = partial(
+            _get_key_minhash_signatures,
+            n=self.n,
+            multipliers=self._multipliers,
+            increments=self._increments,
+        )
+        if workers is None or workers <= 1 or len(chunks) <= 1:
+            results = [func(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(func, chunks))
+        if not results:
+            return np.zeros((0, self.bands * self.rows), dtype=np.uint32)
+        return np.concatenate(results)
+
+    def _get_band_hashes(self, signatures: numpy.ndarray) -> numpy.ndarray:
+        """Combine the rows of each band of each signature into a single hash."""
+        import numpy as np
+
+        rv = np.zeros((len(signatures), self.bands), dtype=np.uint64)
+        for row, multiplier in enumerate(self._band_multipliers):
+            # this relies on unsigned integer overflow wrapping around
+            rv = rv * multiplier + signatures[:, row :: self.rows]
+        return rv
+
+    def _get_digest(self) -> str:
+        """Get a digest of the texts and parameters that the index is built from."""
+        digest = hashlib.blake2b(f"{self.n} {self.bands} {self.rows} {self.seed}\n".encode())
+        for key in self._keys:
+            digest.update(key.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def save(self, path: str | Path) -> None:
+        """Save the index to an ``.npz`` file, which can be loaded by passing ``path``."""
+        import numpy as np
+
+        with Path(path).expanduser().resolve().open("wb") as file:
+            np.savez(
+                file,
+                digest=np.array(self._get_digest()),
+                band_hashes=self._band_hashes,
+                band_order=self._band_order,
+            )
+
+    def _load(self, path: str | Path) -> None:
+        import numpy as np
+
+        with np.load(Path(path).expanduser().resolve()) as data:
+            if str(data["digest"]) != self._get_digest():
+                raise ValueError(
+                    f"the index in {path} was built from different texts or parameters"
+                )
+            self._band_hashes = data["band_hashes"]
+            self._band_order = data["band_order"]
+
+    def get_matches_batch(
+        self,
+        texts: Iterable[str],
+        *,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[list[Match[R]]]:
+        """Get matches for several texts, looking up candidates for all texts at once.
+
+        :param texts: The texts to ground
+        :param organisms: NCBITaxon identifiers. If given, drops matches whose literal
+            mappings are specific to a different taxon
+        :param namespaces: Prefixes. If given, only keeps matches with these prefixes
+        :param kwargs: Unused, accepted for compatibility with other matchers
+
+        :returns: A list of matches for each text, sorted by descending score
+        """
+        import numpy as np
+
+        texts = list(texts)
+        if not texts:
+            return []
+        keys = [_normalize(text) for text in texts]
+        shingles = [_get_shingles(key, self.n) for key in keys]
+        signatures = np.concatenate(
+            [
+                _get_minhash_signatures(
+                    shingles[i : i + _MINHASH_CHUNK_SIZE], self._multipliers, self._increments
+                )
+                for i in range(0, len(shingles), _MINHASH_CHUNK_SIZE)
+            ]
+        )
+        band_hashes = self._get_band_hashes(signatures)
+
+        candidates: list[set[int]] = [set() for _ in texts]
+        for band in range(self.bands):
+            starts = np.searchsorted(self._band_hashes[band], band_hashes[:, band])
+            ends = np.searchsorted(self._band_hashes[band], band_hashes[:, band], side="right")
+            (hits,) = np.nonzero(ends > starts)
+            for i, start, end in zip(
+                hits.tolist(), starts[hits].tolist(), ends[hits].tolist(), strict=True
+            ):
+                candidates[i].update(self._band_order[band, start:end].tolist())
+
+        rv: list[list[Match[R]]] = []
+        for key, text, query_shingles, query_candidates in zip(
+            keys, texts, shingles, candidates, strict=True
+        ):
+            similarities = []
+            for candidate in query_candidates:
+                candidate_shingles = _get_shingles(self._keys[candidate], self.n)
+                intersection = len(query_shingles & candidate_shingles)
+                similarity = intersection / (
+                    len(query_shingles) + len(candidate_shingles) - intersection
+                )
+                if similarity >= self.min_similarity:
+                    similarities.append((similarity, self._keys[candidate]))
+            similarities.sort(reverse=True)
+
+            scores: dict[NamableReference, float] = {}
+            for similarity, candidate_key in similarities[: self.top_k]:
+                for reference, score in self._lookup_scores(
+                    candidate_key,
+                    text.strip() if candidate_key == key else None,
+                    organisms=organisms,
+                    namespaces=namespaces,
+                ):
+                    score *= similarity
+                    if score > scores.get(reference, 0.0):
+                        scores[reference] = score
+            rv.append(_scores_to_matches(scores))
+        return rv
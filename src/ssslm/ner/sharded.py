@@ -0,0 +1,315 @@
+"""Ground with literal mappings partitioned across worker processes."""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import os
+import tempfile
+import weakref
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Generic, Literal, NamedTuple, TypeAlias, cast
+
+from curies import NamableReference
+from pystow.utils import safe_open_writer
+from typing_extensions import Self
+
+from .api import Implementation, make_grounder
+from .base import Annotation, Grounder, Match
+from .dictionary import _normalize, _scores_to_matches
+from ..model import HEADER, LiteralMapping, R, read_literal_mappings
+
+__all__ = [
+    "ShardPartition",
+    "ShardedGrounder",
+]
+
+
+#: The grounder for the shard hosted in each :class:`ShardedGrounder` worker process
+_SHARD_GROUNDER: Grounder[Any] | None = None
+
+
+def _init_shard_worker(
+    path: Path,
+    reference_cls: type[Any] | None,
+    implementation: Implementation | None,
+    grounder_kwargs: dict[str, Any],
+) -> None:
+    global _SHARD_GROUNDER
+    literal_mappings = read_literal_mappings(path, reference_cls=reference_cls)
+    _SHARD_GROUNDER = make_grounder(
+        literal_mappings, implementation=implementation, **grounder_kwargs
+    )
+
+
+def _call_shard(method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    if _SHARD_GROUNDER is None:
+        raise RuntimeError("shard worker was not initialized")
+    return getattr(_SHARD_GROUNDER, method)(*args, **kwargs)
+
+
+#: How :class:`ShardedGrounder` partitions literal mappings
+ShardPartition: TypeAlias = Literal["prefix", "text"]
+
+
+def _get_shard_normalizer(implementation: Implementation | None) -> Callable[[str], str]:
+    """Get the text normalization that the given implementation uses for lookup."""
+    if implementation is None or implementation == "gilda":
+        from gilda.process import normalize
+
+        return cast(Callable[[str], str], normalize)
+    return _normalize
+
+
+def _iter_shard_assignments(
+    literal_mappings: Iterable[LiteralMapping[R]],
+    shards: int,
+    partition: ShardPartition,
+    *,
+    normalize: Callable[[str], str],
+) -> Iterable[tuple[int, LiteralMapping[R]]]:
+    """Assign each literal mapping to a shard, in a single pass."""
+    if partition == "text":
+        for literal_mapping in literal_mappings:
+            key = normalize(literal_mapping.text).encode("utf-8")
+            digest = hashlib.blake2b(key, digest_size=8).digest()
+            yield int.from_bytes(digest, "big") % shards, literal_mapping
+    elif partition == "prefix":
+        sizes = [0] * shards
+        assignments: dict[str, int] = {}
+        for literal_mapping in literal_mappings:
+            prefix = literal_mapping.reference.prefix
+            if prefix not in assignments:
+                # greedily assign each new prefix to the smallest shard to balance them
+                assignments[prefix] = min(range(shards), key=sizes.__getitem__)
+            shard = assignments[prefix]
+            sizes[shard] += 1
+            yield shard, literal_mapping
+    else:
+        raise ValueError(f"Unsupported partition: {partition}")
+
+
+def _partition_literal_mappings(
+    literal_mappings: Iterable[LiteralMapping[R]],
+    shards: int,
+    partition: ShardPartition,
+    *,
+    normalize: Callable[[str], str],
+) -> list[list[LiteralMapping[R]]]:
+    rv: list[list[LiteralMapping[R]]] = [[] for _ in range(shards)]
+    for shard, literal_mapping in _iter_shard_assignments(
+        literal_mappings, shards, partition, normalize=normalize
+    ):
+        rv[shard].append(literal_mapping)
+    return rv
+
+
+class _ShardFile(NamedTuple):
+    """A file with the literal mappings for one shard."""
+
+    path: Path
+    prefixes: set[str]
+
+
+def _write_shards(
+    literal_mappings: Iterable[LiteralMapping[R]],
+    directory: Path,
+    shards: int,
+    partition: ShardPartition,
+    *,
+    normalize: Callable[[str], str],
+) -> list[_ShardFile]:
+    """Write each shard's literal mappings to its own file, skipping empty shards."""
+    files: dict[int, _ShardFile] = {}
+    with ExitStack() as stack:
+        writers: dict[int, Any] = {}
+        for shard, literal_mapping in _iter_shard_assignments(
+            literal_mappings, shards, partition, normalize=normalize
+        ):
+            if shard not in writers:
+                path = directory.joinpath(f"shard-{shard}.ssslm.tsv")
+                files[shard] = _ShardFile(path, set())
+                writers[shard] = stack.enter_context(safe_open_writer(path))
+                writers[shard].writerow(HEADER)
+            writers[shard].writerow(literal_mapping._as_row_for_writer())
+            files[shard].prefixes.add(literal_mapping.reference.prefix)
+    return [files[shard] for shard in sorted(files)]
+
+
+class ShardedGrounder(Grounder[R], Generic[R]):
+    """A grounder that partitions literal mappings into shards, each in its own process.
+
+    Queries and annotations are sent to all shards and their results are merged, so a
+    large lexicon can use several cores and be spread over several processes' memory.
+
+    .. code-block:: python
+
+        import ssslm
+        from ssslm.ner import ShardedGrounder
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        with ShardedGrounder(ssslm.read_literal_mappings(url), shards=4) as grounder:
+            match = grounder.get_best_match("purkinje cell")
+
+    Note that each shard annotates independently, so grounders that only keep the
+    longest match at each position, like :class:`DictGrounder`, might return overlapping
+    annotations from different shards.
+    """
+
+    def __init__(
+        self,
+        literal_mappings: Iterable[LiteralMapping[R]],
+        *,
+        shards: int | None = None,
+        partition: ShardPartition = "prefix",
+        implementation: Implementation | None = None,
+        reference_cls: type[R] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Partition the literal mappings and start a worker process for each shard.
+
+        :param literal_mappings: The literal mappings to ground against
+        :param shards: The number of shards. Defaults to the number of CPUs.
+        :param partition: How to assign literal mappings to shards. If ``prefix``, all
+            literal mappings for the same prefix go in the same shard, which means that
+            queries restricted with ``namespaces`` are only sent to the relevant shards.
+            If ``text``, literal mappings are assigned by a hash of their text, after
+            the same normalization that the implementation uses for lookup, which gives
+            more evenly sized shards.
+        :param implementation: The implementation used for each shard, see
+            :func:`make_grounder`
+        :param reference_cls: The class used to parse references when each shard loads
+            its literal mappings, see :func:`ssslm.read_literal_mappings`
+        :param kwargs: Keyword arguments passed to :func:`make_grounder` for each shard
+
+        Each shard's literal mappings are written to a temporary file that only its
+        worker process reads, and the workers are started and their grounders built
+        before this returns, so the first query doesn't pay for loading.
+        """
+        if shards is None:
+            shards = os.cpu_count() or 1
+        if shards < 1:
+            raise ValueError("there must be at least one shard")
+        self.partition = partition
+        self._executors: list[ProcessPoolExecutor] = []
+        # the worker processes are also shut down if the grounder is garbage collected
+        # without being closed
+        self._finalizer = weakref.finalize(self, _shutdown_executors, self._executors)
+        with tempfile.TemporaryDirectory() as directory:
+            shard_files = _write_shards(
+                literal_mappings,
+                Path(directory),
+                shards,
+                partition,
+                normalize=_get_shard_normalizer(implementation),
+            )
+            self._prefixes = [shard_file.prefixes for shard_file in shard_files]
+            self._executors.extend(
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    initializer=_init_shard_worker,
+                    initargs=(shard_file.path, reference_cls, implementation, kwargs),
+                )
+                for shard_file in shard_files
+            )
+            # warm up the workers, which runs their initializers, before the files are
+            # deleted. This also raises any errors from building the shards' grounders.
+            futures = [
+                executor.submit(_call_shard, "not_empty", (), {}) for executor in self._executors
+            ]
+            for future in futures:
+                future.result()
+
+    def close(self) -> None:
+        """Shut down the shards' worker processes."""
+        self._finalizer()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _scatter(self, method: str, *args: Any, **kwargs: Any) -> list[Any]:
+        """Call a method on all relevant shards and return their results."""
+        namespaces = kwargs.get("namespaces")
+        futures = [
+            executor.submit(_call_shard, method, args, kwargs)
+            for executor, prefixes in zip(self._executors, self._prefixes, strict=True)
+            if self.partition != "prefix"
+            or namespaces is None
+            or not prefixes.isdisjoint(namespaces)
+        ]
+        return [future.result() for future in futures]
+
+    def not_empty(self) -> bool:
+        """Return if there are any shards."""
+        return bool(self._executors)
+
+    # docstr-coverage:excused `inherited`
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:  # noqa:D102
+        return _merge_shard_matches(self._scatter("get_matches", text, **kwargs))
+
+    # docstr-coverage:excused `inherited`
+    def get_matches_batch(  # noqa:D102
+        self, texts: Iterable[str], **kwargs: Any
+    ) -> list[list[Match[R]]]:
+        texts = list(texts)
+        results = self._scatter("get_matches_batch", texts, **kwargs)
+        return (
+            [_merge_shard_matches(text_results) for text_results in zip(*results, strict=True)]
+            if results
+            else [[] for _ in texts]
+        )
+
+    # docstr-coverage:excused `inherited`
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:  # noqa:D102
+        return _merge_shard_annotations(self._scatter("annotate", text, **kwargs))
+
+    # docstr-coverage:excused `inherited`
+    def annotate_batch(  # noqa:D102
+        self, texts: Iterable[str], **kwargs: Any
+    ) -> list[list[Annotation[R]]]:
+        texts = list(texts)
+        results = self._scatter("annotate_batch", texts, **kwargs)
+        return (
+            [_merge_shard_annotations(text_results) for text_results in zip(*results, strict=True)]
+            if results
+            else [[] for _ in texts]
+        )
+
+
+def _shutdown_executors(executors: list[ProcessPoolExecutor]) -> None:
+    for executor in executors:
+        executor.shutdown()
+
+
+def _merge_shard_matches(results: Iterable[list[Match[R]]]) -> list[Match[R]]:
+    """Merge matches from several shards, keeping the best score for each reference."""
+    scores: dict[NamableReference, float] = {}
+    for match in itertools.chain.from_iterable(results):
+        if match.score > scores.get(match.reference, 0.0):
+            scores[match.reference] = match.score
+    return _scores_to_matches(scores)
+
+
+def _merge_shard_annotations(results: Iterable[list[Annotation[R]]]) -> list[Annotation[R]]:
+    """Merge annotations from several shards, keeping the best score for each span and reference."""
+    best: dict[tuple[int, int, str], Annotation[R]] = {}
+    for annotation in itertools.chain.from_iterable(results):
+        key = annotation.start, annotation.end, annotation.curie
+        if key not in best or annotation.score > best[key].score:
+            best[key] = annotation
+    # sort like a single grounder would, i.e., longest spans first and ties by CURIE
+    return sorted(
+        best.values(),
+        key=lambda annotation: (
+            annotation.start,
+            -annotation.end,
+            -annotation.score,
+            annotation.curie,
+        ),
+    )
@@ -0,0 +1,176 @@
+"""An approximate matcher based on character n-gram TF-IDF vectors."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Generic
+
+from curies import NamableReference
+
+from .base import Match
+from .dictionary import _BatchFirstMatcher, _DictEntry, _normalize, _scores_to_matches
+from ..model import R
+
+if TYPE_CHECKING:
+    import scipy.sparse
+
+__all__ = [
+    "TfidfMatcher",
+]
+
+
+class TfidfMatcher(_BatchFirstMatcher[R], Generic[R]):
+    """An approximate matcher based on character n-gram TF-IDF vectors.
+
+    All normalized texts are vectorized into sparse TF-IDF vectors of their character
+    n-grams, which are L2-normalized such that a sparse matrix product gives cosine
+    similarities. A batch of queries is vectorized the same way and scored against all
+    texts with a single sparse matrix product, then the top candidates are selected for
+    each query. Matches are scored by scaling the score from :class:`DictMatcher` by the
+    cosine similarity.
+
+    Since IDF weights depend on all texts, adding or removing literal mappings in place
+    re-vectorizes all texts, which costs about as much as building a new matcher.
+
+    This requires :mod:`numpy` and :mod:`scipy`, which can be installed with ``pip
+    install ssslm[tfidf]``.
+
+    .. code-block:: python
+
+        import ssslm
+        from ssslm.ner import TfidfMatcher
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        literal_mappings = ssslm.read_literal_mappings(url)
+        matcher = TfidfMatcher.from_literal_mappings(literal_mappings)
+
+        matches = matcher.get_matches_batch(["purkinje cells", "hippocampal neuron"])
+    """
+
+    def __init__(
+        self,
+        index: dict[str, list[_DictEntry]],
+        *,
+        n: int = 3,
+        top_k: int = 10,
+        min_similarity: float = 0.5,
+    ) -> None:
+        """Initialize the matcher with a pre-built index from normalized text to entries.
+
+        :param index: A dictionary from normalized texts to entries
+        :param n: The length of character n-grams
+        :param top_k: The maximum number of candidate texts to consider for each query
+        :param min_similarity: The minimum cosine similarity between a query and a
+            candidate text
+        """
+        super().__init__(index)
+        self.n = n
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self._build(list(self._index))
+
+    def _build(self, keys: list[str]) -> None:
+        """Vectorize normalized texts and store them in a sparse matrix."""
+        import numpy as np
+
+        self._keys = keys
+        self._vocabulary: dict[str, int] = {}
+        rows = [self._count_ngrams(key, grow=True) for key in self._keys]
+        document_frequencies = np.zeros(len(self._vocabulary))
+        for row in rows:
+            for column in row:
+                document_frequencies[column] += 1
+        # use the same smoothing as scikit-learn's TfidfVectorizer
+        self._idf = np.log((1 + len(rows)) / (1 + document_frequencies)) + 1
+        self._matrix = self._vectorize(rows).T.tocsr()
+
+    def _update_keys(self, added: list[str], removed: list[str]) -> None:
+        """Re-vectorize all texts, since adding or removing texts changes the IDF weights."""
+        if added or removed:
+            removed_keys = set(removed)
+            self._build([key for key in self._keys if key not in removed_keys] + added)
+
+    def _count_ngrams(self, key: str, *, grow: bool = False) -> dict[int, int]:
+        """Count the character n-grams in a normalized text, padded with spaces."""
+        padded = f" {key} "
+        rv: dict[int, int] = {}
+        for i in range(max(1, len(padded) - self.n + 1)):
+            ngram = padded[i : i + self.n]
+            column = self._vocabulary.get(ngram)
+            if column is None:
+                if not grow:
+                    continue
+                column = self._vocabulary[ngram] = len(self._vocabulary)
+            rv[column] = rv.get(column, 0) + 1
+        return rv
+
+    def _vectorize(self, rows: list[dict[int, int]]) -> scipy.sparse.csr_matrix:
+        """Get a matrix of L2-normalized TF-IDF vectors from n-gram counts."""
+        import numpy as np
+        import scipy.sparse
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        indices = np.fromiter(
+            (column for row in rows for column in row), dtype=np.int64, count=indptr[-1]
+        )
+        data = np.fromiter(
+            (count for row in rows for count in row.values()), dtype=np.float64, count=indptr[-1]
+        )
+        data *= self._idf[indices]
+        matrix = scipy.sparse.csr_matrix(
+            (data, indices, indptr), shape=(len(rows), len(self._vocabulary))
+        )
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return scipy.sparse.csr_matrix(scipy.sparse.diags(1.0 / norms) @ matrix)
+
+    def get_matches_batch(
+        self,
+        texts: Iterable[str],
+        *,
+        organisms: list[str] | None = None,
+        namespaces: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[list[Match[R]]]:
+        """Get matches for several texts with a single sparse matrix product.
+
+        :param texts: The texts to ground
+        :param organisms: NCBITaxon identifiers. If given, drops matches whose literal
+            mappings are specific to a different taxon
+        :param namespaces: Prefixes. If given, only keeps matches with these prefixes
+        :param kwargs: Unused, accepted for compatibility with other matchers
+
+        :returns: A list of matches for each text, sorted by descending score
+        """
+        import numpy as np
+
+        texts = list(texts)
+        keys = [_normalize(text) for text in texts]
+        similarities = (
+            self._vectorize([self._count_ngrams(key) for key in keys]) @ self._matrix
+        ).tocsr()
+        rv: list[list[Match[R]]] = []
+        for i, (key, text) in enumerate(zip(keys, texts, strict=True)):
+            start, end = similarities.indptr[i], similarities.indptr[i + 1]
+            row_similarities = similarities.data[start:end]
+            row_columns = similarities.indices[start:end]
+            if len(row_similarities) > self.top_k:
+                top = np.argpartition(-row_similarities, self.top_k - 1)[: self.top_k]
+                row_similarities, row_columns = row_similarities[top], row_columns[top]
+            scores: dict[NamableReference, float] = {}
+            for similarity, column in zip(row_similarities, row_columns, strict=True):
+                if similarity < self.min_similarity:
+                    continue
+                candidate = self._keys[column]
+                for match in self._lookup(
+                    candidate,
+                    text.strip() if candidate == key else None,
+                    organisms=organisms,
+                    namespaces=namespaces,
+                ):
+                    score = match.score * min(1.0, float(similarity))
+                    if score > scores.get(match.reference, 0.0):
+                        scores[match.reference] = score
+            rv.append(_scores_to_matches(scores))
+        return rv
@@ -0,0 +1,537 @@
+"""Wrappers that cache, filter, or chunk other matchers and grounders."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Generic, TypeAlias, cast
+
+from .base import (
+    Annotation,
+    CacheInfo,
+    Grounder,
+    Match,
+    Matcher,
+    WrappedMatcher,
+    _Cache,
+    _overrides,
+    _run_async,
+)
+from .dictionary import _normalize
+from .entity import _EntityGrounder
+from ..model import LiteralMapping, R
+
+__all__ = [
+    "CachedGrounder",
+    "CachedMatcher",
+    "ChunkedGrounder",
+    "FilteredGrounder",
+    "FilteredMatcher",
+]
+
+
+def _freeze(value: Any) -> Any:
+    """Make a keyword argument value hashable, recursively."""
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(element) for element in value)
+    if isinstance(value, set | frozenset):
+        return frozenset(_freeze(element) for element in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+#: A key in the cache of a :class:`CachedMatcher` or :class:`CachedGrounder`
+_CacheKey: TypeAlias = tuple[str, tuple[tuple[str, Any], ...]]
+
+
+def _get_cache_key(text: str, kwargs: dict[str, Any]) -> _CacheKey | None:
+    """Get a cache key for a text and keyword arguments, or None if they can't be hashed."""
+    # skip arguments that are None, so they are the same as not passing them
+    key = text, tuple(sorted((k, _freeze(v)) for k, v in kwargs.items() if v is not None))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class CachedMatcher(WrappedMatcher[R], Generic[R]):
+    """A matcher that caches the results of another matcher.
+
+    Results are cached based on the text and keyword arguments, such as the context,
+    organisms, and namespaces, in a thread-safe least recently used (LRU) cache with
+    optional expiration.
+
+    .. code-block:: python
+
+        import ssslm
+        from ssslm.ner import CachedMatcher
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        matcher = CachedMatcher(matcher=ssslm.make_grounder(url), max_size=100_000)
+
+        match = matcher.get_best_match("purkinje cell")
+        match = matcher.get_best_match("purkinje cell")  # this one is cached
+        print(matcher.cache_info())
+    """
+
+    def __init__(
+        self, *, matcher: Matcher[R], max_size: int | None = 1024, ttl: float | None = None
+    ) -> None:
+        """Instantiate the matcher around another matcher.
+
+        :param matcher: The matcher whose results are cached
+        :param max_size: The maximum number of entries in the cache. If None, the cache
+            is unbounded.
+        :param ttl: The number of seconds after which entries expire. If None, entries
+            don't expire.
+        """
+        super().__init__(matcher=matcher)
+        self._matches_cache = _Cache(max_size=max_size, ttl=ttl)
+
+    def cache_info(self) -> CacheInfo:
+        """Get statistics about the matches cache."""
+        return self._matches_cache.info()
+
+    def cache_clear(self) -> None:
+        """Clear the cache and its statistics."""
+        self._matches_cache.clear()
+
+    def add_literal_mappings(self, literal_mappings: Iterable[LiteralMapping[R]]) -> None:
+        """Add literal mappings to the wrapped matcher, then clear the cache."""
+        super().add_literal_mappings(literal_mappings)
+        self.cache_clear()
+
+    def remove_literal_mappings(self, literal_mappings: Iterable[LiteralMapping[R]]) -> None:
+        """Remove literal mappings from the wrapped matcher, then clear the cache."""
+        super().remove_literal_mappings(literal_mappings)
+        self.cache_clear()
+
+    # docstr-coverage:excused `inherited`
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:  # noqa:D102
+        key = _get_cache_key(text, kwargs)
+        if key is None:
+            return self._matcher.get_matches(text, **kwargs)
+        matches: list[Match[R]] | None = self._matches_cache.get(key)
+        if matches is None:
+            matches = self._matcher.get_matches(text, **kwargs)
+            self._matches_cache.put(key, matches)
+        return list(matches)
+
+    # docstr-coverage:excused `inherited`
+    async def aget_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:  # noqa:D102
+        if _overrides(self, CachedMatcher, "get_matches"):
+            return await _run_async(self.get_matches, text, **kwargs)
+        key = _get_cache_key(text, kwargs)
+        if key is None:
+            return await self._matcher.aget_matches(text, **kwargs)
+        matches: list[Match[R]] | None = self._matches_cache.get(key)
+        if matches is None:
+            matches = await self._matcher.aget_matches(text, **kwargs)
+            self._matches_cache.put(key, matches)
+        return list(matches)
+
+    # docstr-coverage:excused `inherited`
+    def get_matches_batch(  # noqa:D102
+        self, texts: Iterable[str], **kwargs: Any
+    ) -> list[list[Match[R]]]:
+        texts = list(texts)
+        if texts and _get_cache_key(texts[0], kwargs) is None:
+            return self._matcher.get_matches_batch(texts, **kwargs)
+        keys = cast(list[_CacheKey], [_get_cache_key(text, kwargs) for text in texts])
+        rv: list[list[Match[R]] | None] = [self._matches_cache.get(key) for key in keys]
+        missing = [i for i, matches in enumerate(rv) if matches is None]
+        if missing:
+            new = self._matcher.get_matches_batch([texts[i] for i in missing], **kwargs)
+            for i, matches in zip(missing, new, strict=True):
+                self._matches_cache.put(keys[i], matches)
+                rv[i] = matches
+        return [list(matches) for matches in rv if matches is not None]
+
+
+class CachedGrounder(Grounder[R], CachedMatcher[R], Generic[R]):
+    """A grounder that caches the results of another grounder.
+
+    In addition to caching matches like :class:`CachedMatcher`, this caches
+    annotations based on a hash of the document and the keyword arguments.
+    """
+
+    _matcher: Grounder[R]
+
+    def __init__(
+        self, *, grounder: Grounder[R], max_size: int | None = 1024, ttl: float | None = None
+    ) -> None:
+        """Instantiate the grounder around another grounder.
+
+        :param grounder: The grounder whose results are cached
+        :param max_size: The maximum number of entries in each cache. If None, the
+            caches are unbounded.
+        :param ttl: The number of seconds after which entries expire. If None, entries
+            don't expire.
+        """
+        super().__init__(matcher=grounder, max_size=max_size, ttl=ttl)
+        self._annotations_cache = _Cache(max_size=max_size, ttl=ttl)
+
+    def annotation_cache_info(self) -> CacheInfo:
+        """Get statistics about the annotations cache."""
+        return self._annotations_cache.info()
+
+    def cache_clear(self) -> None:
+        """Clear the caches and their statistics."""
+        super().cache_clear()
+        self._annotations_cache.clear()
+
+    @staticmethod
+    def _get_annotation_cache_key(text: str, kwargs: dict[str, Any]) -> _CacheKey | None:
+        return _get_cache_key(hashlib.blake2b(text.encode()).hexdigest(), kwargs)
+
+    # docstr-coverage:excused `inherited`
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:  # noqa:D102
+        key = self._get_annotation_cache_key(text, kwargs)
+        if key is None:
+            return self._matcher.annotate(text, **kwargs)
+        annotations: list[Annotation[R]] | None = self._annotations_cache.get(key)
+        if annotations is None:
+            annotations = self._matcher.annotate(text, **kwargs)
+            self._annotations_cache.put(key, annotations)
+        return list(annotations)
+
+    # docstr-coverage:excused `inherited`
+    async def aannotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:  # noqa:D102
+        if _overrides(self, CachedGrounder, "annotate"):
+            return await _run_async(self.annotate, text, **kwargs)
+        key = self._get_annotation_cache_key(text, kwargs)
+        if key is None:
+            return await self._matcher.aannotate(text, **kwargs)
+        annotations: list[Annotation[R]] | None = self._annotations_cache.get(key)
+        if annotations is None:
+            annotations = await self._matcher.aannotate(text, **kwargs)
+            self._annotations_cache.put(key, annotations)
+        return list(annotations)
+
+    # docstr-coverage:excused `inherited`
+    def annotate_batch(  # noqa:D102
+        self, texts: Iterable[str], **kwargs: Any
+    ) -> list[list[Annotation[R]]]:
+        texts = list(texts)
+        if texts and self._get_annotation_cache_key(texts[0], kwargs) is None:
+            return self._matcher.annotate_batch(texts, **kwargs)
+        keys = cast(
+            list[_CacheKey], [self._get_annotation_cache_key(text, kwargs) for text in texts]
+        )
+        rv: list[list[Annotation[R]] | None] = [self._annotations_cache.get(key) for key in keys]
+        missing = [i for i, annotations in enumerate(rv) if annotations is None]
+        if missing:
+            new = self._matcher.annotate_batch([texts[i] for i in missing], **kwargs)
+            for i, annotations in zip(missing, new, strict=True):
+                self._annotations_cache.put(keys[i], annotations)
+                rv[i] = annotations
+        return [list(annotations) for annotations in rv if annotations is not None]
+
+
+class FilteredMatcher(WrappedMatcher[R], Generic[R]):
+    """A matcher that drops known false positives from another matcher's results.
+
+    Negatives are literal mappings that are known to be wrong, e.g., from
+    :meth:`ssslm.curation.Repository.get_negative_synonyms`, and drop matches for the
+    same reference on the same normalized text. Stop words are texts that are known not
+    to be named entities, e.g., from :meth:`ssslm.curation.Repository.load_stop_words`,
+    and drop all matches. Both are stored in sets of normalized text, so checking them
+    takes constant time, and stop words are checked before querying the wrapped matcher.
+    """
+
+    def __init__(
+        self,
+        *,
+        matcher: Matcher[R],
+        negatives: Iterable[LiteralMapping[R]] = (),
+        stop_words: Iterable[str] = (),
+    ) -> None:
+        """Instantiate the matcher around another matcher.
+
+        :param matcher: The matcher whose results are filtered
+        :param negatives: Literal mappings that are known to be incorrect
+        :param stop_words: Texts that are known not to be named entities
+        """
+        super().__init__(matcher=matcher)
+        self._negatives = {
+            (_normalize(literal_mapping.text), literal_mapping.reference.curie)
+            for literal_mapping in negatives
+        }
+        self._stop_words = {_normalize(stop_word) for stop_word in stop_words}
+
+    def _filter_matches(self, key: str, matches: list[Match[R]]) -> list[Match[R]]:
+        if not self._negatives:
+            return matches
+        return [match for match in matches if (key, match.curie) not in self._negatives]
+
+    # docstr-coverage:excused `inherited`
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:  # noqa:D102
+        key = _normalize(text)
+        if key in self._stop_words:
+            return []
+        return self._filter_matches(key, self._matcher.get_matches(text, **kwargs))
+
+    # docstr-coverage:excused `inherited`
+    async def aget_matches(self, text: str, **kwargs: Any) -> list[Match[R]]:  # noqa:D102
+        if _overrides(self, FilteredMatcher, "get_matches"):
+            return await _run_async(self.get_matches, text, **kwargs)
+        key = _normalize(text)
+        if key in self._stop_words:
+            return []
+        return self._filter_matches(key, await self._matcher.aget_matches(text, **kwargs))
+
+    # docstr-coverage:excused `inherited`
+    def get_matches_batch(  # noqa:D102
+        self, texts: Iterable[str], **kwargs: Any
+    ) -> list[list[Match[R]]]:
+        texts = list(texts)
+        keys = [_normalize(text) for text in texts]
+        rv: list[list[Match[R]]] = [[] for _ in texts]
+        remaining = [i for i, key in enumerate(keys) if key not in self._stop_words]
+        if remaining:
+            batch = self._matcher.get_matches_batch([texts[i] for i in remaining], **kwargs)
+            for i, matches in zip(remaining, batch, strict=True):
+                rv[i] = self._filter_matches(keys[i], matches)
+        return rv
+
+
+class FilteredGrounder(Grounder[R], FilteredMatcher[R], Generic[R]):
+    """A grounder that drops known false positives from another grounder's results.
+
+    In addition to filtering matches like :class:`FilteredMatcher`, this drops
+    annotations whose text is a stop word or a negative for the annotation's reference.
+
+    Grounders that find entities with a model, like :class:`SpacyGrounder` and
+    :class:`GLiNERGrounder`, ground each entity with a matcher. For these, a new grounder
+    with the same model is made with ``with_matcher()``, whose matcher is wrapped in a
+    :class:`FilteredMatcher`, so entities that are stop words are never grounded.
+    """
+
+    _matcher: Grounder[R]
+
+    def __init__(
+        self,
+        *,
+        grounder: Grounder[R],
+        negatives: Iterable[LiteralMapping[R]] = (),
+        stop_words: Iterable[str] = (),
+    ) -> None:
+        """Instantiate the grounder around another grounder.
+
+        :param grounder: The grounder whose results are filtered
+        :param negatives: Literal mappings that are known to be incorrect
+        :param stop_words: Texts that are known not to be named entities
+        """
+        negatives, stop_words = list(negatives), list(stop_words)
+        super().__init__(matcher=grounder, negatives=negatives, stop_words=stop_words)
+        if isinstance(grounder, _EntityGrounder):
+            # a new grounder is made, so the one passed in isn't changed
+            self._matcher = grounder.with_matcher(
+                FilteredMatcher(
+                    matcher=grounder._matcher, negatives=negatives, stop_words=stop_words
+                )
+            )
+
+    def _filter_annotations(self, annotations: list[Annotation[R]]) -> list[Annotation[R]]:
+        if not self._negatives and not self._stop_words:
+            return annotations
+        rv = []
+        for annotation in annotations:
+            key = _normalize(annotation.substr)
+            if key not in self._stop_words and (key, annotation.curie) not in self._negatives:
+                rv.append(annotation)
+        return rv
+
+    # docstr-coverage:excused `inherited`
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:  # noqa:D102
+        return self._filter_annotations(self._matcher.annotate(text, **kwargs))
+
+    # docstr-coverage:excused `inherited`
+    async def aannotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:  # noqa:D102
+        if _overrides(self, FilteredGrounder, "annotate"):
+            return await _run_async(self.annotate, text, **kwargs)
+        return self._filter_annotations(await self._matcher.aannotate(text, **kwargs))
+
+    # docstr-coverage:excused `inherited`
+    def annotate_batch(  # noqa:D102
+        self, texts: Iterable[str], **kwargs: Any
+    ) -> list[list[Annotation[R]]]:
+        return [
+            self._filter_annotations(annotations)
+            for annotations in self._matcher.annotate_batch(texts, **kwargs)
+        ]
+
+
+#: Matches the whitespace between paragraphs and after the end of sentences
+_SEGMENT_BOUNDARY_RE = re.compile(r"\n\s*\n|(?<=[.!?])\s+")
+
+
+def _is_word_boundary(text: str, position: int) -> bool:
+    """Check if a text can be cut at a position without splitting a word."""
+    return text[position].isspace() or text[position - 1].isspace()
+
+
+def _get_chunk_end(text: str, start: int, size: int, overlap: int) -> int:
+    """Get the end of a chunk, preferring the end of a paragraph or sentence, then whitespace.
+
+    The chunk is long enough that the next chunk starts after this one, and outside of
+    a word if possible. Ends of paragraphs or sentences are only used in the second half
+    of the chunk, so that chunks aren't much shorter than ``size``.
+    """
+    low, high = start + overlap + 1, start + size
+    # the next chunk can start outside of a word if this chunk ends after the first
+    # word boundary plus the overlap
+    first = next(
+        (i for i in range(start + 1, high - overlap + 1) if _is_word_boundary(text, i)), None
+    )
+    if first is not None and first + overlap > low:
+        boundaries = [(first + overlap, high), (low, first + overlap - 1)]
+    else:
+        boundaries = [(low, high)]
+    last = None
+    for match in _SEGMENT_BOUNDARY_RE.finditer(
+        text, max(boundaries[0][0], start + size // 2), high + 1
+    ):
+        last = match.start()
+    if last is not None:
+        return last
+    for lower, upper in boundaries:
+        for end in range(upper, lower - 1, -1):
+            if _is_word_boundary(text, end):
+                return end
+    # a single word is longer than the chunk, so it has to be split
+    return high
+
+
+def _get_chunk_start(text: str, low: int, high: int) -> int:
+    """Get the last position in ``(low, high]`` that isn't inside a word, or ``high``."""
+    for start in range(high, low, -1):
+        if _is_word_boundary(text, start):
+            return start
+    return high
+
+
+def _get_chunks(text: str, size: int, overlap: int) -> list[tuple[int, int]]:
+    """Split a text into chunks that overlap.
+
+    :param text: The text to split
+    :param size: The maximum number of characters in each chunk
+    :param overlap: The minimum number of characters at the end of a chunk that are
+        repeated at the start of the next chunk
+
+    :returns: A list of the start and end positions of each chunk in the text
+
+    Chunks end at the end of a paragraph or sentence if possible, otherwise on
+    whitespace, and start at the start of a word. Words are only split if they're
+    longer than a chunk.
+    """
+    rv = []
+    start = 0
+    while len(text) - start > size:
+        end = _get_chunk_end(text, start, size, overlap)
+        rv.append((start, end))
+        start = _get_chunk_start(text, start, end - overlap)
+    rv.append((start, len(text)))
+    return rv
+
+
+def _merge_chunk_annotations(
+    text: str, chunks: list[tuple[int, int]], results: list[list[Annotation[R]]]
+) -> list[Annotation[R]]:
+    """Merge annotations from overlapping chunks of the same document.
+
+    :param text: The document
+    :param chunks: The start and end positions of each chunk in the document
+    :param results: The annotations for each chunk, with positions in the chunk
+
+    :returns: Annotations with positions in the document. Each chunk contributes the
+        annotations that start between the middles of its overlaps with the previous
+        and next chunks, so annotations that are at most half as long as the overlap
+        are always taken from a chunk that contains them with context on both sides.
+    """
+    rv: list[Annotation[R]] = []
+    for i, ((start, end), chunk_annotations) in enumerate(zip(chunks, results, strict=True)):
+        lower = (start + chunks[i - 1][1]) // 2 if i > 0 else 0
+        upper = (chunks[i + 1][0] + end) // 2 if i + 1 < len(chunks) else len(text)
+        rv.extend(
+            Annotation(
+                text=text,
+                start=start + annotation.start,
+                end=start + annotation.end,
+                match=annotation.match,
+            )
+            for annotation in chunk_annotations
+            if lower <= start + annotation.start < upper
+        )
+    return rv
+
+
+class ChunkedGrounder(Grounder[R], WrappedMatcher[R], Generic[R]):
+    """A grounder that annotates long documents in chunks with another grounder.
+
+    Documents are split into overlapping chunks on the boundaries of paragraphs,
+    sentences, or words, which are annotated separately, so memory usage and latency
+    are bounded by the chunk size instead of the document size. Annotations are mapped
+    back to positions in the original document, and each annotation in an overlap is
+    taken from only one of the chunks.
+
+    .. code-block:: python
+
+        import ssslm
+        from ssslm.ner import ChunkedGrounder
+
+        url = "https://github.com/biopragmatics/biolexica/raw/main/lexica/anatomy/anatomy.ssslm.tsv.gz"
+        grounder = ChunkedGrounder(grounder=ssslm.make_grounder(url), chunk_size=5_000)
+
+        with open("book.txt") as file:
+            annotations = grounder.annotate(file.read())
+    """
+
+    _matcher: Grounder[R]
+
+    def __init__(
+        self,
+        *,
+        grounder: Grounder[R],
+        chunk_size: int = 10_000,
+        overlap: int = 200,
+        executor: Executor | int | None = None,
+    ) -> None:
+        """Instantiate the grounder around another grounder.
+
+        :param grounder: The grounder used to annotate each chunk
+        :param chunk_size: The maximum number of characters in each chunk
+        :param overlap: The minimum number of characters at the end of each chunk that
+            are repeated at the start of the next one. Entities that are at most half
+            as long are annotated the same way as when annotating the whole document.
+        :param executor: An executor, or a number of workers for a thread pool, used to
+            annotate chunks in parallel. If None, chunks are annotated with the
+            grounder's :meth:`Annotator.annotate_batch`.
+        """
+        if overlap >= chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        super().__init__(matcher=grounder)
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.executor = executor
+
+    def _annotate_chunks(self, texts: list[str], **kwargs: Any) -> list[list[Annotation[R]]]:
+        if self.executor is None or len(texts) < 2:
+            return self._matcher.annotate_batch(texts, **kwargs)
+        if isinstance(self.executor, int):
+            with ThreadPoolExecutor(max_workers=self.executor) as pool:
+                return list(pool.map(partial(self._matcher.annotate, **kwargs), texts))
+        return list(self.executor.map(partial(self._matcher.annotate, **kwargs), texts))
+
+    # docstr-coverage:excused `inherited`
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[R]]:  # noqa:D102
+        chunks = _get_chunks(text, self.chunk_size, self.overlap)
+        if len(chunks) <= 1:
+            return self._matcher.annotate(text, **kwargs)
+        results = self._annotate_chunks([text[start:end] for start, end in chunks], **kwargs)
+        return _merge_chunk_annotations(text, chunks, results)
@@ -41,12 +41,12 @@ def _get_grounder(request: Request) -> Grounder:
 
 
 @api_router.get("/ground/{text}", response_model=list[Match])
-def ground(
+async def ground(
     grounder: Annotated[Grounder, Depends(_get_grounder)],
     text: str = fastapi.Path(..., description="Text to be grounded."),
 ) -> list[Match]:
     """Ground text."""
-    return grounder.get_matches(text)
+    return await grounder.aget_matches(text)
 
 
 class AnnotationRequest(BaseModel):
@@ -56,9 +56,9 @@ class AnnotationRequest(BaseModel):
 
 
 @api_router.post("/annotate/", response_model=list[Annotation])
-def annotate(
+async def annotate(
     grounder: Annotated[Grounder, Depends(_get_grounder)],
     annotation_request: AnnotationRequest,
 ) -> list[Annotation]:
     """Annotate text."""
-    return grounder.annotate(annotation_request.text)
+    return await grounder.aannotate(annotation_request.text)
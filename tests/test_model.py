@@ -6,13 +6,22 @@ import typing
 import unittest
 from pathlib import Path
 
+import pytest
 import responses
 from curies import NamableReference, Reference
 from curies import vocabulary as v
-from pydantic import model_validator
+from pydantic import TypeAdapter, ValidationError, model_validator
+from pydantic_extra_types.language_code import LanguageAlpha2
 
 import ssslm
-from ssslm.model import DEFAULT_PREDICATE, PANDAS_AVAILABLE, LiteralMapping, Writer
+from ssslm.model import (
+    DEFAULT_PREDICATE,
+    PANDAS_AVAILABLE,
+    LanguageCode,
+    LiteralMapping,
+    Writer,
+    _get_language_codes,
+)
 from tests.cases import REQUIRES_GILDA
 
 TR_1 = NamableReference.from_curie("test:1", "test")
@@ -364,6 +373,64 @@ class TestModel(unittest.TestCase):
                 self.assertEqual([m1, m2], ssslm.read_literal_mappings(path))
 
 
+class TestLanguage(unittest.TestCase):
+    """Test validating language codes."""
+
+    def test_validate(self) -> None:
+        """Test validating language codes."""
+        lm1 = LiteralMapping(reference=TR_1, text="test", language="de")
+        self.assertEqual("de", lm1.language)
+        if not isinstance(lm1.language, LanguageCode):
+            self.fail(msg="language was not parsed")
+        self.assertEqual("German", lm1.language.name)
+
+        # case is normalized, and the same object is re-used
+        lm2 = LiteralMapping(reference=TR_1, text="test", language="DE")
+        self.assertIs(lm1.language, lm2.language)
+
+        with self.assertRaises(ValidationError):
+            LiteralMapping(reference=TR_1, text="test", language="xx")
+        with self.assertRaises(ValidationError):
+            LiteralMapping(reference=TR_1, text="test", language="deu")
+
+    def test_consistent(self) -> None:
+        """Test the precomputed codes are consistent with the pycountry-based validator."""
+        adapter = TypeAdapter(LanguageAlpha2)
+        for code in _get_language_codes():
+            self.assertEqual(adapter.validate_python(code), code)
+
+    @pytest.mark.slow
+    def test_multilingual_load(self) -> None:
+        """Test loading a multilingual lexicon, and that languages are validated like pycountry."""
+        codes = sorted(_get_language_codes())
+        literal_mappings = [
+            LiteralMapping(
+                reference=NamableReference(prefix="test", identifier=str(i), name=f"test {i}"),
+                text=f"test {i}",
+                language=codes[i % len(codes)],
+            )
+            for i in range(50_000)
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath("test.ssslm.tsv")
+            ssslm.write_literal_mappings(literal_mappings, path, writer="csv")
+            self.assertEqual(literal_mappings, ssslm.read_literal_mappings(path))
+
+        baseline_adapter = TypeAdapter(LanguageAlpha2)
+        adapter = TypeAdapter(LanguageCode)
+        for value in codes:
+            self.assertEqual(
+                str(baseline_adapter.validate_python(value)), adapter.validate_python(value)
+            )
+        self.assertEqual("en", adapter.validate_python("EN"))
+        for value in ["xx", "eng", ""]:
+            with self.subTest(value=value):
+                with self.assertRaises(ValidationError):
+                    baseline_adapter.validate_python(value)
+                with self.assertRaises(ValidationError):
+                    adapter.validate_python(value)
+
+
 def _iter_writers() -> typing.Iterable[Writer]:
     for writer in typing.get_args(Writer):
         if writer == "pandas" and not PANDAS_AVAILABLE:
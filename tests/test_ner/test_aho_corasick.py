@@ -0,0 +1,88 @@
+"""Tests for the Aho-Corasick grounder."""
+
+import unittest
+
+from curies import NamedReference
+
+from ssslm import LiteralMapping, make_grounder
+from ssslm.ner import AhoCorasickGrounder, _Automaton, _normalize_with_offsets
+from tests import cases
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+R1 = NamedReference(prefix="p1", identifier="1", name="one")
+R2 = NamedReference(prefix="p2", identifier="2", name="two")
+
+
+class TestAutomaton(unittest.TestCase):
+    """Test the Aho-Corasick automaton."""
+
+    def test_matches(self) -> None:
+        """Test finding all matches, including overlapping ones."""
+        automaton = _Automaton(["he", "she", "his", "hers"])
+        text = "ushers"
+        self.assertEqual(
+            {"she", "he", "hers"},
+            {text[start:end] for start, end in automaton.iter_matches(text)},
+        )
+
+    def test_normalize_with_offsets(self) -> None:
+        """Test normalizing while keeping track of offsets."""
+        text = "A  B\n\tÇ"
+        normalized_text, offsets = _normalize_with_offsets(text)
+        self.assertEqual("a b ç", normalized_text)
+        self.assertEqual([0, 1, 3, 4, 6], offsets)
+
+
+class AhoCorasickTestCase(cases.BaseNERTestCase):
+    """Test the Aho-Corasick grounder."""
+
+    def test_annotate(self) -> None:
+        """Test annotation."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="aho-corasick")
+        self.assertIsInstance(grounder, AhoCorasickGrounder)
+        self.assert_ner_alzheimer(grounder)
+
+        text = "ALZHEIMER'S   disease and Alzheimer's disease"
+        annotations = grounder.annotate(text)
+        self.assertEqual(
+            [(0, 21), (26, 45)], [(annotation.start, annotation.end) for annotation in annotations]
+        )
+        self.assertEqual({ALZHEIMER_REFERENCE}, {a.reference for a in annotations})
+        self.assertEqual("ALZHEIMER'S   disease", annotations[0].substr)
+
+    def test_word_boundaries(self) -> None:
+        """Test that occurrences inside of words are skipped."""
+        grounder = AhoCorasickGrounder.from_literal_mappings(
+            [LiteralMapping(reference=R1, text="cat")]
+        )
+        self.assertEqual([], grounder.annotate("concatenate cats"))
+        self.assertEqual([(4, 7)], [(a.start, a.end) for a in grounder.annotate("the cat.")])
+
+    def test_overlapping(self) -> None:
+        """Test handling overlapping occurrences."""
+        literal_mappings = [
+            LiteralMapping(reference=R1, text="lung"),
+            LiteralMapping(reference=R2, text="lung cancer"),
+        ]
+        text = "lung cancer"
+
+        grounder = AhoCorasickGrounder.from_literal_mappings(literal_mappings)
+        self.assertEqual([R2], [a.reference for a in grounder.annotate(text)])
+
+        grounder = AhoCorasickGrounder.from_literal_mappings(literal_mappings, overlapping=True)
+        self.assertEqual(
+            [(R2, 0, 11), (R1, 0, 4)],
+            [(a.reference, a.start, a.end) for a in grounder.annotate(text)],
+        )
+
+    def test_namespaces(self) -> None:
+        """Test filtering annotations by namespace."""
+        grounder = AhoCorasickGrounder.from_literal_mappings(
+            [
+                LiteralMapping(reference=R1, text="lung"),
+                LiteralMapping(reference=R2, text="lung cancer"),
+            ]
+        )
+        # since the longest match gets filtered, fall back to the shorter one
+        annotations = grounder.annotate("lung cancer", namespaces=["p1"])
+        self.assertEqual([(R1, 0, 4)], [(a.reference, a.start, a.end) for a in annotations])
@@ -0,0 +1,117 @@
+"""Tests for async grounding."""
+
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from ssslm import make_grounder
+from ssslm.ner import (
+    Annotation,
+    CachedGrounder,
+    CachedMatcher,
+    Match,
+    WrappedMatcher,
+    get_async_executor,
+    set_async_executor,
+)
+from tests import cases
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+
+class AsyncMatcher(cases.MockMatcher):
+    """A mock matcher with a native coroutine."""
+
+    def __init__(self) -> None:
+        """Initialize the counter."""
+        self.calls = 0
+
+    async def aget_matches(self, text: str, **kwargs: Any) -> list[Match]:
+        """Get matches with a native coroutine."""
+        self.calls += 1
+        await asyncio.sleep(0)
+        return []
+
+
+class ReversedMatcher(WrappedMatcher[Any]):
+    """A wrapper that changes the text before passing it to the wrapped matcher."""
+
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match]:
+        """Get matches for the reversed text."""
+        return super().get_matches(text[::-1], **kwargs)
+
+
+class TestAsync(unittest.TestCase):
+    """Tests for async grounding."""
+
+    def tearDown(self) -> None:
+        """Reset the executor."""
+        set_async_executor(None)
+
+    def test_default(self) -> None:
+        """Test the default implementations run in the executor."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+
+        async def _main() -> tuple[Any, ...]:
+            return await asyncio.gather(
+                grounder.aget_matches("alzheimer disease"),
+                grounder.aget_best_match("alzheimer disease"),
+                grounder.aget_best_match("nope"),
+                grounder.aannotate(cases.TEXT),
+            )
+
+        matches, best, missing, annotations = asyncio.run(_main())
+        self.assertEqual(grounder.get_matches("alzheimer disease"), matches)
+        self.assertEqual(ALZHEIMER_REFERENCE, best.reference)
+        self.assertIsNone(missing)
+        self.assertEqual(grounder.annotate(cases.TEXT), annotations)
+        with self.assertRaises(ValueError):
+            asyncio.run(grounder.aget_best_match("nope", strict=True))
+
+    def test_executor(self) -> None:
+        """Test configuring the executor."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        set_async_executor(executor)
+        self.assertIs(executor, get_async_executor())
+        set_async_executor(2)
+        owned = get_async_executor()
+        self.assertIsInstance(owned, ThreadPoolExecutor)
+        match = asyncio.run(cases.MockMatcher().aget_best_match("test"))
+        self.assertIsNotNone(match)
+
+        # executors passed in belong to the caller, so they aren't shut down
+        executor.submit(int).result()
+        executor.shutdown()
+
+        # executors created from an integer are shut down when replaced
+        set_async_executor(None)
+        with self.assertRaises(RuntimeError):
+            owned.submit(int)
+
+    def test_native(self) -> None:
+        """Test native coroutines are used through wrappers and caches."""
+        inner = AsyncMatcher()
+        self.assertIsNone(asyncio.run(WrappedMatcher(matcher=inner).aget_best_match("test")))
+        self.assertEqual(1, inner.calls)
+
+        matcher = CachedMatcher(matcher=inner)
+        asyncio.run(matcher.aget_matches("test"))
+        asyncio.run(matcher.aget_matches("test"))
+        self.assertEqual(2, inner.calls)
+        self.assertEqual(1, matcher.cache_info().hits)
+
+    def test_overridden(self) -> None:
+        """Test that wrappers whose sync methods are overridden don't skip them."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+        matcher = ReversedMatcher(matcher=grounder)
+        matches = asyncio.run(matcher.aget_matches("esaesid remiehzla"))
+        self.assertEqual([ALZHEIMER_REFERENCE], [match.reference for match in matches])
+
+        class EmptyGrounder(CachedGrounder[Any]):
+            def annotate(self, text: str, **kwargs: Any) -> list[Annotation]:
+                return []
+
+        self.assertEqual([], asyncio.run(EmptyGrounder(grounder=grounder).aannotate(cases.TEXT)))
+        self.assertNotEqual(
+            [], asyncio.run(CachedGrounder(grounder=grounder).aannotate(cases.TEXT))
+        )
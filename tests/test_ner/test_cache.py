@@ -0,0 +1,127 @@
+"""Tests for caching matchers and grounders."""
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from pydantic import ValidationError
+
+from ssslm import make_grounder
+from ssslm.ner import CachedGrounder, CachedMatcher, Match
+from tests import cases
+from tests.cases import LM_1, LM_2, LM_3
+
+
+class CountingMatcher(cases.MockMatcher):
+    """A mock matcher that counts calls."""
+
+    def __init__(self) -> None:
+        """Initialize the counter."""
+        self.calls = 0
+
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match]:
+        """Count the call and return a match."""
+        self.calls += 1
+        return super().get_matches(text, **kwargs)
+
+
+class TestCache(unittest.TestCase):
+    """Tests for caching matchers and grounders."""
+
+    def test_matcher(self) -> None:
+        """Test caching matches."""
+        inner = CountingMatcher()
+        matcher = CachedMatcher(matcher=inner, max_size=2)
+        self.assertTrue(matcher.not_empty())
+
+        matches = matcher.get_matches("a")
+        matches.clear()  # make sure modifying the results doesn't modify the cache
+        self.assertEqual(1, len(matcher.get_matches("a")))
+        self.assertEqual(1, inner.calls)
+
+        # keyword arguments are part of the key, and lists are made hashable
+        matcher.get_matches("a", namespaces=["mesh"])
+        matcher.get_matches("a", namespaces=["mesh"])
+        self.assertEqual(2, inner.calls)
+        self.assertEqual((2, 2, 0, 2, 2), tuple(matcher.cache_info()))
+
+        # this evicts the least recently used entry
+        matcher.get_matches("b")
+        self.assertEqual(1, matcher.cache_info().evictions)
+        matcher.get_matches("a")
+        self.assertEqual(4, inner.calls)
+
+        matcher.cache_clear()
+        self.assertEqual((0, 0, 0, 2, 0), tuple(matcher.cache_info()))
+
+    def test_immutable(self) -> None:
+        """Test that cached matches can't be changed."""
+        matcher = CachedMatcher(matcher=CountingMatcher())
+        with self.assertRaises(ValidationError):
+            matcher.get_matches("a")[0].score = 0.0  # type:ignore[misc]
+        self.assertEqual(1.0, matcher.get_matches("a")[0].score)
+
+    def test_unhashable(self) -> None:
+        """Test keyword arguments that are dictionaries or can't be hashed."""
+        inner = CountingMatcher()
+        matcher = CachedMatcher(matcher=inner)
+        for _ in range(2):
+            matcher.get_matches("a", extra={"b": [1, 2], "a": {3}})
+        matcher.get_matches("a", extra={"a": {3}, "b": (1, 2)})
+        self.assertEqual(1, inner.calls)
+
+        # values that can't be frozen aren't cached
+        for _ in range(2):
+            self.assertEqual(1, len(matcher.get_matches("a", extra=bytearray(b"b"))))
+            self.assertEqual(
+                [1], [len(m) for m in matcher.get_matches_batch(["a"], extra=[bytearray()])]
+            )
+        self.assertEqual(5, inner.calls)
+
+    def test_ttl(self) -> None:
+        """Test cache expiration."""
+        inner = CountingMatcher()
+        matcher = CachedMatcher(matcher=inner, ttl=0.01)
+        matcher.get_matches("a")
+        time.sleep(0.02)
+        matcher.get_matches("a")
+        self.assertEqual(2, inner.calls)
+        self.assertEqual(1, matcher.cache_info().evictions)
+
+    def test_batch(self) -> None:
+        """Test caching batches."""
+        inner = CountingMatcher()
+        matcher = CachedMatcher(matcher=inner)
+        matcher.get_matches("a")
+        self.assertEqual(
+            [1, 1, 1], [len(matches) for matches in matcher.get_matches_batch(["a", "b", "c"])]
+        )
+        self.assertEqual(3, inner.calls)
+        self.assertEqual(1, matcher.cache_info().hits)
+
+    def test_threads(self) -> None:
+        """Test using the cache from several threads."""
+        matcher = CachedMatcher(matcher=CountingMatcher(), max_size=10)
+        texts = [str(i % 20) for i in range(1_000)]
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(matcher.get_matches, texts))
+        self.assertTrue(all(len(matches) == 1 for matches in results))
+        info = matcher.cache_info()
+        self.assertEqual(1_000, info.hits + info.misses)
+        self.assertEqual(10, info.current_size)
+
+    def test_grounder(self) -> None:
+        """Test caching annotations."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict", cache_size=10)
+        if not isinstance(grounder, CachedGrounder):
+            self.fail(msg="grounder was not cached")
+
+        text = cases.TEXT
+        annotations = grounder.annotate(text)
+        self.assertEqual(annotations, grounder.annotate(text))
+        self.assertEqual([annotations, []], grounder.annotate_batch([text, "nothing to see here"]))
+        self.assertEqual((2, 2, 0, 10, 2), tuple(grounder.annotation_cache_info()))
+
+        grounder.cache_clear()
+        self.assertEqual(0, grounder.annotation_cache_info().current_size)
@@ -0,0 +1,143 @@
+"""Tests for annotating long documents in chunks."""
+
+import random
+import unittest
+from typing import Any
+
+from curies import NamedReference
+
+import ssslm
+from ssslm import LiteralMapping
+from ssslm.ner import Annotation, ChunkedGrounder, WrappedMatcher, _get_chunks
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+OTHER_REFERENCE = NamedReference(prefix="DOID", identifier="10652", name="Alzheimer's disease")
+SENTENCE = "The APOE e4 mutation is correlated with risk for Alzheimer disease."
+
+
+class LengthCheckingGrounder(ssslm.Grounder[Any], WrappedMatcher[Any]):
+    """A grounder that records the length of each text it annotates."""
+
+    _matcher: ssslm.Grounder[Any]
+
+    def __init__(self, grounder: ssslm.Grounder[Any]) -> None:
+        """Initialize the grounder."""
+        super().__init__(matcher=grounder)
+        self.lengths: list[int] = []
+
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation[Any]]:
+        """Record the length of the text and annotate it."""
+        self.lengths.append(len(text))
+        return self._matcher.annotate(text, **kwargs)
+
+
+class TestChunked(unittest.TestCase):
+    """Tests for annotating long documents in chunks."""
+
+    def setUp(self) -> None:
+        """Set up the test case with a grounder."""
+        self.inner = LengthCheckingGrounder(
+            ssslm.make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+        )
+
+    def test_chunks(self) -> None:
+        """Test splitting text into chunks on sentence, paragraph, and word boundaries."""
+        text = "One two. Three four.\n\nFive six seven eight nine."
+        self.assertEqual([(0, len(text))], _get_chunks(text, 100, 10))
+        self.assertEqual(
+            ["One two.", " Three four.", "\n\nFive six ", "seven eight ", "nine."],
+            [text[start:end] for start, end in _get_chunks(text, 15, 0)],
+        )
+        # at least the overlap is repeated at the start of the next chunk
+        self.assertEqual(
+            [
+                "One two. Three four.",
+                "Three four.\n\nFive ",
+                "four.\n\nFive six ",
+                "Five six seven eight",
+                "seven eight nine.",
+            ],
+            [text[start:end] for start, end in _get_chunks(text, 20, 8)],
+        )
+        text = "One two. Three four. Five six."
+        self.assertEqual(
+            ["One two. Three four.", "Three four. Five six."],
+            [text[start:end] for start, end in _get_chunks(text, 25, 11)],
+        )
+        # words that are longer than a chunk are split
+        self.assertEqual(
+            ["abcd", "cdef", "efgh", "ghij"],
+            ["abcdefghij"[s:e] for s, e in _get_chunks("abcdefghij", 4, 2)],
+        )
+
+    def test_annotate(self) -> None:
+        """Test annotations are the same as annotating the whole text."""
+        text = " ".join([SENTENCE] * 20)
+        expected = self.inner.annotate(text)
+        self.assertEqual(20, len(expected))
+        self.inner.lengths.clear()
+
+        for executor in [None, 2]:
+            with self.subTest(executor=executor):
+                grounder = ChunkedGrounder(
+                    grounder=self.inner, chunk_size=200, overlap=100, executor=executor
+                )
+                self.assertEqual(expected, grounder.annotate(text))
+                self.assertTrue(all(length <= 200 for length in self.inner.lengths))
+                self.assertLess(1, len(self.inner.lengths))
+                self.inner.lengths.clear()
+
+        grounder = ChunkedGrounder(grounder=self.inner)
+        self.assertEqual(expected, grounder.annotate(text))
+        self.assertEqual([len(text)], self.inner.lengths)
+
+        with self.assertRaises(ValueError):
+            ChunkedGrounder(grounder=self.inner, chunk_size=10, overlap=10)
+
+    def test_border(self) -> None:
+        """Test that annotations cut off at the border of a chunk are dropped."""
+        text = "x " * 20 + "Alzheimer disease"
+        inner = ssslm.make_grounder(
+            [LM_1, LiteralMapping(reference=OTHER_REFERENCE, text="Alzheimer")],
+            implementation="dict",
+        )
+        self.assertEqual(
+            ["Alzheimer"], [a.substr for a in inner.annotate("x x x x x x x x x x Alzheimer")]
+        )
+        # the first chunk ends in the middle of the entity
+        self.assertEqual([(0, 50), (10, 57)], _get_chunks(text, 50, 40))
+        annotations = ChunkedGrounder(grounder=inner, chunk_size=50, overlap=40).annotate(text)
+        self.assertEqual(
+            [(40, 57, ALZHEIMER_REFERENCE)],
+            [(a.start, a.end, a.reference) for a in annotations],
+        )
+        self.assertEqual("Alzheimer disease", annotations[0].substr)
+
+    def test_random(self) -> None:
+        """Test that annotating random texts in chunks is the same as annotating them whole."""
+        rng = random.Random(0)  # noqa:S311
+        words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+        # entities contain other entities, but don't partially overlap
+        entities = ["alpha", "beta", "alpha beta", "gamma delta", "epsilon zeta eta"]
+        inner = ssslm.make_grounder(
+            [
+                LiteralMapping(
+                    reference=NamedReference(prefix="X", identifier=str(i), name=entity),
+                    text=entity,
+                )
+                for i, entity in enumerate(entities)
+            ],
+            implementation="dict",
+        )
+        longest = max(len(entity) for entity in entities)
+        for _ in range(500):
+            parts = []
+            for _ in range(rng.randint(1, 60)):
+                parts.append(rng.choice(words) if rng.random() < 0.95 else "q" * rng.randint(1, 30))
+                parts.append(rng.choices([" ", ". ", "\n\n", "  "], weights=[20, 3, 1, 1])[0])
+            text = "".join(parts)
+            overlap = rng.randint(2 * longest, 60)
+            chunk_size = rng.randint(overlap + 1, 120)
+            with self.subTest(text=text, chunk_size=chunk_size, overlap=overlap):
+                grounder = ChunkedGrounder(grounder=inner, chunk_size=chunk_size, overlap=overlap)
+                self.assertEqual(inner.annotate(text), grounder.annotate(text))
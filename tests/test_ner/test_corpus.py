@@ -0,0 +1,120 @@
+"""Tests for annotating corpora."""
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+from curies import NamedReference
+
+import ssslm
+from ssslm import LiteralMapping
+from ssslm.ner import corpus
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+DOCUMENTS = [
+    (f"doc{i}", "Alzheimer's disease is a disease." if i % 3 else "Nothing to see here.")
+    for i in range(50)
+]
+
+
+class TestCorpus(unittest.TestCase):
+    """Tests for annotating corpora."""
+
+    def assert_results(self, results: list[tuple[str, list[ssslm.Annotation]]]) -> None:
+        """Check the results are in order and annotated."""
+        self.assertEqual([doc_id for doc_id, _ in DOCUMENTS], [doc_id for doc_id, _ in results])
+        for i, (_, annotations) in enumerate(results):
+            if i % 3:
+                self.assertEqual([ALZHEIMER_REFERENCE], [a.reference for a in annotations])
+            else:
+                self.assertEqual([], annotations)
+
+    def test_serial(self) -> None:
+        """Test annotating a corpus in the current process."""
+        results = ssslm.annotate_corpus(
+            [LM_1, LM_2, LM_3],
+            DOCUMENTS,
+            workers=1,
+            chunksize=7,
+            grounder_kwargs={"implementation": "dict"},
+        )
+        self.assert_results(list(results))
+
+    def test_interleaved(self) -> None:
+        """Test that generators annotating in the current process don't share a grounder."""
+        heart = NamedReference(prefix="UBERON", identifier="0000948", name="heart")
+        documents = [("doc1", "Alzheimer's disease and the heart"), ("doc2", "The heart")]
+        first = iter(
+            ssslm.annotate_corpus(
+                [LM_1, LM_2, LM_3],
+                documents,
+                workers=1,
+                chunksize=1,
+                grounder_kwargs={"implementation": "dict"},
+            )
+        )
+        second = iter(
+            ssslm.annotate_corpus(
+                [LiteralMapping(reference=heart, text="heart")],
+                documents,
+                workers=1,
+                chunksize=1,
+                grounder_kwargs={"implementation": "dict"},
+            )
+        )
+        results = [next(first), next(second), next(first), next(second)]
+        self.assertEqual(
+            [
+                ("doc1", [ALZHEIMER_REFERENCE]),
+                ("doc1", [heart]),
+                ("doc2", []),
+                ("doc2", [heart]),
+            ],
+            [(doc_id, [a.reference for a in annotations]) for doc_id, annotations in results],
+        )
+        # the grounder isn't kept in the module after annotating
+        self.assertIsNone(corpus._CORPUS_GROUNDER)
+
+    def test_parallel(self) -> None:
+        """Test annotating a corpus in several processes."""
+        results = ssslm.annotate_corpus(
+            [LM_1, LM_2, LM_3],
+            iter(DOCUMENTS),
+            workers=2,
+            chunksize=4,
+            max_pending=2,
+            grounder_kwargs={"implementation": "dict"},
+        )
+        self.assert_results(list(results))
+
+    def test_write(self) -> None:
+        """Test writing annotations for a corpus, with the identifiers of their documents."""
+        expected = {
+            doc_id: [ALZHEIMER_REFERENCE] for i, (doc_id, _) in enumerate(DOCUMENTS) if i % 3
+        }
+        names = ["annotations.tsv", "annotations.jsonl"]
+        if importlib.util.find_spec("pyarrow"):
+            names.append("annotations.parquet")
+        for name in names:
+            with self.subTest(name=name), tempfile.TemporaryDirectory() as directory:
+                path = Path(directory).joinpath(name)
+                ssslm.write_corpus_annotations(
+                    [LM_1, LM_2, LM_3],
+                    DOCUMENTS,
+                    path,
+                    workers=2,
+                    grounder_kwargs={"implementation": "dict"},
+                )
+                for trusted in [False, True]:
+                    annotations = ssslm.read_corpus_annotations(path, trusted=trusted)
+                    self.assertEqual(
+                        expected,
+                        {
+                            doc_id: [a.reference for a in doc_annotations]
+                            for doc_id, doc_annotations in annotations.items()
+                        },
+                    )
+                    self.assertEqual("Alzheimer's disease", annotations["doc1"][0].substr)
+                # the annotations can also be read without their documents
+                self.assertEqual(len(expected), len(ssslm.read_annotations(path)))
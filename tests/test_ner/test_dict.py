@@ -0,0 +1,107 @@
+"""Tests for the dictionary-based grounder."""
+
+from curies import NamedReference, Reference
+from curies import vocabulary as v
+
+from ssslm import LiteralMapping, make_grounder
+from ssslm.ner import NORMALIZED_MATCH_FACTOR, DictGrounder, DictMatcher
+from tests import cases
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+R1 = NamedReference(prefix="p1", identifier="1", name="one")
+R2 = NamedReference(prefix="p2", identifier="2", name="two")
+R3 = NamedReference(prefix="p3", identifier="3", name="three")
+
+
+class DictTestCase(cases.BaseNERTestCase):
+    """Test the dictionary-based grounder."""
+
+    def test_empty(self) -> None:
+        """Test an empty matcher."""
+        matcher = DictMatcher.from_literal_mappings([])
+        self.assertTrue(matcher.empty())
+        self.assertEqual([], matcher.get_matches("test"))
+
+    def test_normalized(self) -> None:
+        """Test case and whitespace normalization."""
+        matcher = DictMatcher.from_literal_mappings(
+            [LiteralMapping(reference=R1, text="Test Term", predicate=v.has_label)]
+        )
+        self.assertTrue(matcher.not_empty())
+
+        match = matcher.get_best_match("Test Term", strict=True)
+        self.assertEqual(R1, match.reference)
+        self.assertEqual(1.0, match.score)
+
+        for text in ["test term", " TEST   term\n"]:
+            with self.subTest(text=text):
+                match = matcher.get_best_match(text, strict=True)
+                self.assertEqual(R1, match.reference)
+                self.assertEqual(NORMALIZED_MATCH_FACTOR, match.score)
+
+        self.assertIsNone(matcher.get_best_match("test"))
+
+    def test_predicate_scores(self) -> None:
+        """Test labels are prioritized over exact synonyms, which are prioritized over others."""
+        matcher = DictMatcher.from_literal_mappings(
+            [
+                LiteralMapping(reference=R3, text="test"),
+                LiteralMapping(reference=R2, text="test", predicate=v.has_exact_synonym),
+                LiteralMapping(reference=R1, text="test", predicate=v.has_label),
+                # a lower-scoring duplicate shouldn't add another match
+                LiteralMapping(reference=R1, text="TEST"),
+            ]
+        )
+        matches = matcher.get_matches("test")
+        self.assertEqual([R1, R2, R3], [match.reference for match in matches])
+        self.assertEqual([1.0, 0.9, 0.8], [match.score for match in matches])
+
+    def test_filters(self) -> None:
+        """Test filtering by namespace and organism."""
+        matcher = DictMatcher.from_literal_mappings(
+            [
+                LiteralMapping(
+                    reference=R1, text="test", taxon=Reference.from_curie("NCBITaxon:9606")
+                ),
+                LiteralMapping(
+                    reference=R2, text="test", taxon=Reference.from_curie("NCBITaxon:10090")
+                ),
+                LiteralMapping(reference=R3, text="test"),
+            ]
+        )
+        self.assertEqual(
+            [R2], [m.reference for m in matcher.get_matches("test", namespaces=["p2"])]
+        )
+        self.assertEqual(
+            [R1, R3], [m.reference for m in matcher.get_matches("test", organisms=["9606"])]
+        )
+
+    def test_annotate(self) -> None:
+        """Test annotation."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+        self.assertIsInstance(grounder, DictGrounder)
+        self.assert_ner_alzheimer(grounder)
+
+        text = "Alzheimer's disease and alzheimer  disease"
+        annotations = grounder.annotate(text)
+        self.assertEqual(
+            [(0, 19), (24, 42)], [(annotation.start, annotation.end) for annotation in annotations]
+        )
+        self.assertEqual({ALZHEIMER_REFERENCE}, {a.reference for a in annotations})
+        self.assertEqual(0.8, annotations[0].score)
+        self.assertEqual("Alzheimer's disease", annotations[0].substr)
+
+    def test_batch(self) -> None:
+        """Test the default batch implementations."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+        texts = ["alzheimer disease", "nope", "Alzheimer's disease"]
+        self.assertEqual(
+            [grounder.get_matches(text) for text in texts], grounder.get_matches_batch(texts)
+        )
+        self.assertEqual(
+            [grounder.get_best_match(text) for text in texts],
+            grounder.get_best_match_batch(texts),
+        )
+        self.assertEqual(
+            [grounder.annotate(text) for text in texts], grounder.annotate_batch(texts)
+        )
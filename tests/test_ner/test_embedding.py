@@ -0,0 +1,186 @@
+"""Tests for the embedding matcher."""
+
+from __future__ import annotations
+
+import importlib.util
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from curies import NamedReference
+from curies import vocabulary as v
+
+from ssslm import LiteralMapping
+from ssslm.ner import DictMatcher, EmbeddingMatcher
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+if TYPE_CHECKING:
+    import numpy
+
+R1 = NamedReference(prefix="p1", identifier="1", name="one")
+R2 = NamedReference(prefix="p2", identifier="2", name="two")
+
+
+def hashing_encoder(texts: list[str]) -> numpy.ndarray:
+    """Embed texts by hashing their character trigrams, which is deterministic."""
+    import numpy as np
+
+    rv = np.zeros((len(texts), 256), dtype=np.float32)
+    for i, text in enumerate(texts):
+        padded = f" {text} "
+        for j in range(len(padded) - 2):
+            rv[i, zlib.crc32(padded[j : j + 3].encode()) % 256] += 1.0
+    return rv
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), reason="ssslm[embedding] is required")
+class TestEmbedding(unittest.TestCase):
+    """Tests for the embedding matcher."""
+
+    def setUp(self) -> None:
+        """Set up the test case with a matcher."""
+        self.literal_mappings = [
+            LM_1,
+            LM_2,
+            LM_3,
+            LiteralMapping(reference=R1, text="Parkinson disease", predicate=v.has_label),
+            LiteralMapping(reference=R2, text="purkinje cell", predicate=v.has_label),
+        ]
+        self.matcher = EmbeddingMatcher.from_literal_mappings(
+            self.literal_mappings, encoder=hashing_encoder
+        )
+
+    def test_exact(self) -> None:
+        """Test that exact matches get the same score as the dictionary matcher."""
+        dict_matcher = DictMatcher.from_literal_mappings(self.literal_mappings)
+        for text in ["Parkinson disease", "PURKINJE  cell", "Alzheimer's disease"]:
+            with self.subTest(text=text):
+                expected = dict_matcher.get_best_match(text, strict=True)
+                match = self.matcher.get_best_match(text, strict=True)
+                self.assertEqual(expected.reference, match.reference)
+                self.assertAlmostEqual(expected.score, match.score, places=5)
+
+    def test_approximate(self) -> None:
+        """Test approximate matching."""
+        match = self.matcher.get_best_match("alzheimers diseases", strict=True)
+        self.assertEqual(ALZHEIMER_REFERENCE, match.reference)
+        self.assertLess(match.score, 0.8)
+
+        self.assertEqual(R2, self.matcher.get_best_match("purkinje cells", strict=True).reference)
+        self.assertIsNone(self.matcher.get_best_match("hippocampus"))
+
+    def test_batch(self) -> None:
+        """Test batch matching is the same as matching one at a time."""
+        texts = ["alzheimers disease", "parkinsons", "purkinje cells", "hippocampus", ""]
+        self.assertEqual(
+            [self.matcher.get_matches(text) for text in texts],
+            self.matcher.get_matches_batch(texts),
+        )
+        self.assertEqual([], self.matcher.get_matches_batch([]))
+
+    def test_memory_map(self) -> None:
+        """Test storing vectors in a memory-mapped file."""
+        import numpy as np
+
+        texts = ["alzheimers disease", "purkinje cells", "hippocampus"]
+        expected = self.matcher.get_matches_batch(texts)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath("vectors.npy")
+            matcher = EmbeddingMatcher.from_literal_mappings(
+                self.literal_mappings, encoder=hashing_encoder, path=path, batch_size=2
+            )
+            self.assertIsInstance(matcher._vectors, np.memmap)
+            self.assertEqual(expected, matcher.get_matches_batch(texts))
+
+            # the stored vectors are used without encoding them again
+            def encode_queries(texts: list[str]) -> numpy.ndarray:
+                self.assertEqual(1, len(texts))
+                return hashing_encoder(texts)
+
+            matcher = EmbeddingMatcher.from_literal_mappings(
+                self.literal_mappings, encoder=encode_queries, path=path
+            )
+            self.assertEqual(expected[:1], matcher.get_matches_batch(texts[:1]))
+
+            self.assertTrue(path.with_name("vectors.index.npz").is_file())
+
+            # vectors from different texts, models, or data types aren't loaded
+            cases: list[dict[str, Any]] = [
+                {"literal_mappings": self.literal_mappings[1:]},
+                {"model_name": "other-model"},
+                {"dtype": "float16"},
+            ]
+            for kwargs in cases:
+                with self.subTest(kwargs=kwargs), self.assertRaises(ValueError):
+                    EmbeddingMatcher.from_literal_mappings(
+                        **{"literal_mappings": self.literal_mappings, **kwargs},
+                        encoder=hashing_encoder,
+                        path=path,
+                    )
+
+            path = Path(directory).joinpath("vectors16.npy")
+            matcher = EmbeddingMatcher.from_literal_mappings(
+                self.literal_mappings, encoder=hashing_encoder, path=path, dtype="float16"
+            )
+            self.assertEqual(np.float16, matcher._vectors.dtype)
+            self.assertEqual(
+                [[m.reference for m in matches] for matches in expected],
+                [[m.reference for m in matches] for matches in matcher.get_matches_batch(texts)],
+            )
+
+    def test_ivf(self) -> None:
+        """Test searching the nearest clusters."""
+        matcher = EmbeddingMatcher.from_literal_mappings(
+            self.literal_mappings, encoder=hashing_encoder, clusters=2, probes=2
+        )
+        texts = ["alzheimers disease", "parkinsons", "purkinje cells", "hippocampus"]
+        # searching all clusters is the same as searching all vectors
+        self.assertEqual(self.matcher.get_matches_batch(texts), matcher.get_matches_batch(texts))
+
+        matcher = EmbeddingMatcher.from_literal_mappings(
+            self.literal_mappings, encoder=hashing_encoder, clusters=2, probes=1
+        )
+        self.assertEqual(R2, matcher.get_best_match("purkinje cells", strict=True).reference)
+
+    def test_ivf_memory_map(self) -> None:
+        """Test that the IVF index is stored next to the vectors and loaded with them."""
+        import numpy as np
+
+        texts = ["alzheimers disease", "parkinsons", "purkinje cells", "hippocampus"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath("vectors.npy")
+            matcher = EmbeddingMatcher.from_literal_mappings(
+                self.literal_mappings,
+                encoder=hashing_encoder,
+                model_name="hashing",
+                path=path,
+                clusters=2,
+                probes=1,
+            )
+            loaded = EmbeddingMatcher.from_literal_mappings(
+                self.literal_mappings,
+                encoder=hashing_encoder,
+                model_name="hashing",
+                path=path,
+                clusters=2,
+                probes=1,
+            )
+            self.assertIsNotNone(matcher._centroids)
+            self.assertIsNotNone(loaded._centroids)
+            self.assertTrue(np.array_equal(matcher._centroids, loaded._centroids))  # type:ignore[arg-type]
+            self.assertTrue(np.array_equal(matcher._cluster_rows, loaded._cluster_rows))
+            self.assertEqual(matcher.get_matches_batch(texts), loaded.get_matches_batch(texts))
+
+            # a different number of clusters is rebuilt and stored again
+            loaded = EmbeddingMatcher.from_literal_mappings(
+                self.literal_mappings,
+                encoder=hashing_encoder,
+                model_name="hashing",
+                path=path,
+                clusters=3,
+            )
+            self.assertEqual(3, len(loaded._centroids))  # type:ignore[arg-type]
+            with np.load(path.with_name("vectors.index.npz")) as data:
+                self.assertEqual(3, len(data["centroids"]))
@@ -0,0 +1,156 @@
+"""Tests for ensemble matchers."""
+
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from curies import NamableReference
+
+from ssslm.ner import EnsembleMatcher, Match, Matcher
+from tests.cases import ALZHEIMER_REFERENCE
+
+OTHER_REFERENCE = NamableReference(prefix="MESH", identifier="D000001", name="Calcimycin")
+
+
+class StaticMatcher(Matcher[NamableReference]):
+    """A matcher that returns fixed matches and counts calls."""
+
+    def __init__(self, matches: list[Match[NamableReference]]) -> None:
+        """Initialize the matcher with the matches to return."""
+        self.matches = matches
+        self.calls = 0
+        self.batch_texts: list[list[str]] = []
+
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[NamableReference]]:
+        """Count the call and return the matches."""
+        self.calls += 1
+        return list(self.matches)
+
+    def get_matches_batch(self, texts: Any, **kwargs: Any) -> list[list[Match[NamableReference]]]:
+        """Record the batch and return the matches for each text."""
+        texts = list(texts)
+        self.batch_texts.append(texts)
+        return [self.get_matches(text) for text in texts]
+
+    def not_empty(self) -> bool:
+        """Return if there are matches."""
+        return bool(self.matches)
+
+
+class BlockingMatcher(StaticMatcher):
+    """A matcher that doesn't return until it's released."""
+
+    def __init__(self, matches: list[Match[NamableReference]]) -> None:
+        """Initialize the matcher with an event for releasing it."""
+        super().__init__(matches)
+        self.released = threading.Event()
+
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[NamableReference]]:
+        """Wait to be released, then return the matches."""
+        self.released.wait(timeout=10)
+        return super().get_matches(text, **kwargs)
+
+
+class TestEnsemble(unittest.TestCase):
+    """Tests for ensemble matchers."""
+
+    def test_merge(self) -> None:
+        """Test merging matches with different aggregations."""
+        first = StaticMatcher([Match(reference=ALZHEIMER_REFERENCE, score=0.6)])
+        second = StaticMatcher(
+            [
+                Match(reference=OTHER_REFERENCE, score=0.7),
+                Match(reference=ALZHEIMER_REFERENCE, score=0.4),
+            ]
+        )
+        matcher = EnsembleMatcher([first, second])
+        self.assertTrue(matcher.not_empty())
+        self.assertEqual(
+            [(OTHER_REFERENCE, 0.7), (ALZHEIMER_REFERENCE, 0.6)],
+            [(match.reference, match.score) for match in matcher.get_matches("x")],
+        )
+
+        matcher = EnsembleMatcher([first, second], aggregation="sum")
+        self.assertEqual(
+            [(ALZHEIMER_REFERENCE, 1.0), (OTHER_REFERENCE, 0.7)],
+            [(match.reference, match.score) for match in matcher.get_matches("x")],
+        )
+
+        matcher = EnsembleMatcher([first, second], aggregation="mean", weights=[1.0, 0.5])
+        self.assertEqual(
+            [(ALZHEIMER_REFERENCE, 0.4), (OTHER_REFERENCE, 0.35)],
+            [(match.reference, round(match.score, 6)) for match in matcher.get_matches("x")],
+        )
+
+        matcher = EnsembleMatcher([first, second], aggregation=min)
+        self.assertEqual(0.4, matcher.get_matches("x")[1].score)
+
+        with self.assertRaises(ValueError):
+            EnsembleMatcher([])
+        with self.assertRaises(ValueError):
+            EnsembleMatcher([first], weights=[1.0, 2.0])
+
+    def test_early_exit(self) -> None:
+        """Test skipping lower priority matchers."""
+        first = StaticMatcher([Match(reference=ALZHEIMER_REFERENCE, score=0.95)])
+        second = StaticMatcher([Match(reference=OTHER_REFERENCE, score=0.7)])
+        matcher = EnsembleMatcher([first, second], early_exit_score=0.9)
+        self.assertEqual([ALZHEIMER_REFERENCE], [m.reference for m in matcher.get_matches("x")])
+        self.assertEqual(0, second.calls)
+
+        # weights apply before checking the threshold
+        matcher = EnsembleMatcher([first, second], early_exit_score=0.9, weights=[0.5, 1.0])
+        self.assertEqual(2, len(matcher.get_matches("x")))
+        self.assertEqual(1, second.calls)
+
+    def test_batch(self) -> None:
+        """Test lower priority matchers only get texts without sufficient matches."""
+        first = StaticMatcher([Match(reference=ALZHEIMER_REFERENCE, score=0.95)])
+        second = StaticMatcher([Match(reference=OTHER_REFERENCE, score=0.7)])
+
+        class PartialMatcher(StaticMatcher):
+            def get_matches(self, text: str, **kwargs: Any) -> list[Match[NamableReference]]:
+                return super().get_matches(text) if text == "a" else []
+
+        partial = PartialMatcher(first.matches)
+        matcher = EnsembleMatcher([partial, second], early_exit_score=0.9)
+        results = matcher.get_matches_batch(["a", "b", "c"])
+        self.assertEqual([1, 1, 1], [len(matches) for matches in results])
+        self.assertEqual(ALZHEIMER_REFERENCE, results[0][0].reference)
+        self.assertEqual([["a", "b", "c"]], partial.batch_texts)
+        self.assertEqual([["b", "c"]], second.batch_texts)
+
+    def test_concurrent(self) -> None:
+        """Test returning early without waiting on slow matchers."""
+        slow = BlockingMatcher([Match(reference=OTHER_REFERENCE, score=1.0)])
+        fast = StaticMatcher([Match(reference=ALZHEIMER_REFERENCE, score=0.95)])
+        matcher = EnsembleMatcher([slow, fast], early_exit_score=0.9, concurrent=True)
+        try:
+            self.assertEqual([ALZHEIMER_REFERENCE], [m.reference for m in matcher.get_matches("x")])
+        finally:
+            slow.released.set()
+
+        # without early exit, all matchers are waited on
+        slow = BlockingMatcher([Match(reference=OTHER_REFERENCE, score=1.0)])
+        slow.released.set()
+        matcher = EnsembleMatcher([slow, fast], concurrent=True)
+        self.assertEqual(
+            [[OTHER_REFERENCE, ALZHEIMER_REFERENCE]],
+            [[m.reference for m in matches] for matches in matcher.get_matches_batch(["x"])],
+        )
+
+    def test_close(self) -> None:
+        """Test that only a thread pool created by the matcher is shut down."""
+        matchers = [StaticMatcher([Match(reference=ALZHEIMER_REFERENCE, score=1.0)])]
+        with EnsembleMatcher(matchers, concurrent=True) as matcher:
+            executor = matcher._executor
+            self.assertIsInstance(executor, ThreadPoolExecutor)
+            self.assertEqual(1, len(matcher.get_matches("x")))
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)  # type:ignore[union-attr]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with EnsembleMatcher(matchers, concurrent=True, executor=executor) as matcher:
+                self.assertEqual(1, len(matcher.get_matches("x")))
+            self.assertEqual(1, executor.submit(len, "x").result())
@@ -0,0 +1,174 @@
+"""Tests for filtering negatives and stop words."""
+
+import tempfile
+import unittest
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from curies import NamableReference, NamedReference
+
+import ssslm
+from ssslm import LiteralMapping
+from ssslm.curation import Repository
+from ssslm.ner import (
+    FilteredGrounder,
+    FilteredMatcher,
+    GLiNERGrounder,
+    Match,
+    Matcher,
+    WrappedMatcher,
+)
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+from tests.test_ner.test_gliner import MockGLiNER
+
+DOID_REFERENCE = NamedReference(prefix="DOID", identifier="10652", name="Alzheimer's disease")
+LITERAL_MAPPINGS = [
+    LM_1,
+    LM_2,
+    LM_3,
+    LiteralMapping(reference=DOID_REFERENCE, text="Alzheimer disease"),
+    LiteralMapping(reference=DOID_REFERENCE, text="Alzheimer's disease"),
+    LiteralMapping(reference=ALZHEIMER_REFERENCE, text="AD"),
+]
+NEGATIVES = [LiteralMapping(reference=DOID_REFERENCE, text="alzheimer  disease")]
+STOP_WORDS = ["ad"]
+
+
+class CountingMatcher(WrappedMatcher[NamableReference]):
+    """A matcher that records the texts it's queried with."""
+
+    def __init__(self, *, matcher: Matcher[NamableReference]) -> None:
+        """Initialize the matcher."""
+        super().__init__(matcher=matcher)
+        self.texts: list[str] = []
+
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match[NamableReference]]:
+        """Record the text and get matches."""
+        self.texts.append(text)
+        return super().get_matches(text, **kwargs)
+
+    def get_matches_batch(
+        self, texts: Iterable[str], **kwargs: Any
+    ) -> list[list[Match[NamableReference]]]:
+        """Record the texts and get matches."""
+        texts = list(texts)
+        self.texts.extend(texts)
+        return super().get_matches_batch(texts, **kwargs)
+
+
+class TestFilter(unittest.TestCase):
+    """Tests for filtering negatives and stop words."""
+
+    def test_matcher(self) -> None:
+        """Test filtering matches."""
+        inner = CountingMatcher(
+            matcher=ssslm.make_grounder(LITERAL_MAPPINGS, implementation="dict")
+        )
+        matcher = FilteredMatcher(matcher=inner, negatives=NEGATIVES, stop_words=STOP_WORDS)
+        self.assertEqual(
+            {ALZHEIMER_REFERENCE, DOID_REFERENCE},
+            {m.reference for m in inner.get_matches("Alzheimer disease")},
+        )
+        self.assertEqual(
+            [ALZHEIMER_REFERENCE], [m.reference for m in matcher.get_matches("Alzheimer disease")]
+        )
+        # the negative only applies to the same text
+        self.assertIn(
+            DOID_REFERENCE, {m.reference for m in matcher.get_matches("Alzheimer's disease")}
+        )
+
+        # stop words never reach the wrapped matcher
+        inner.texts.clear()
+        self.assertEqual([], matcher.get_matches(" AD "))
+        self.assertEqual([], inner.texts)
+
+        self.assertEqual(
+            [[], [ALZHEIMER_REFERENCE]],
+            [
+                [m.reference for m in matches]
+                for matches in matcher.get_matches_batch(["AD", "alzheimer disease"])
+            ],
+        )
+
+    def test_grounder(self) -> None:
+        """Test filtering annotations."""
+        inner = ssslm.make_grounder(LITERAL_MAPPINGS, implementation="dict")
+        grounder = FilteredGrounder(grounder=inner, negatives=NEGATIVES, stop_words=STOP_WORDS)
+        text = "AD is also known as Alzheimer disease."
+        self.assertEqual(3, len(inner.annotate(text)))
+        self.assertEqual(
+            [(20, 37, ALZHEIMER_REFERENCE)],
+            [(a.start, a.end, a.reference) for a in grounder.annotate(text)],
+        )
+        self.assertEqual(
+            [[(20, 37, ALZHEIMER_REFERENCE)], []],
+            [
+                [(a.start, a.end, a.reference) for a in annotations]
+                for annotations in grounder.annotate_batch([text, "AD"])
+            ],
+        )
+
+    def test_entity_grounder(self) -> None:
+        """Test that stop words found by an NER model are never grounded."""
+        inner = CountingMatcher(
+            matcher=ssslm.make_grounder(LITERAL_MAPPINGS, implementation="dict")
+        )
+        model = MockGLiNER(["AD", "Alzheimer disease"])
+        grounder = GLiNERGrounder(
+            matcher=inner,
+            model=model,  # type:ignore[arg-type,unused-ignore]
+            labels=["disease"],
+        )
+        filtered = FilteredGrounder(grounder=grounder, negatives=NEGATIVES, stop_words=STOP_WORDS)
+        text = "AD is also known as Alzheimer disease."
+        self.assertEqual(3, len(grounder.annotate(text)))
+        inner.texts.clear()
+        annotations = filtered.annotate(text)
+        self.assertEqual(
+            [(20, 37, ALZHEIMER_REFERENCE)], [(a.start, a.end, a.reference) for a in annotations]
+        )
+        self.assertEqual("Alzheimer disease", annotations[0].substr)
+        self.assertEqual(["Alzheimer disease"], inner.texts)
+        # the grounder that was passed in isn't changed or shared, except for its model
+        self.assertIs(inner, grounder._matcher)
+        entity_grounder = filtered._matcher
+        if not isinstance(entity_grounder, GLiNERGrounder):
+            raise self.failureException("the entity grounder wasn't wrapped")
+        self.assertIsNot(grounder, entity_grounder)
+        self.assertIs(model, entity_grounder.model)
+        self.assertIsNot(grounder._lock, entity_grounder._lock)
+        grounder.deduplication_clear()
+        filtered.annotate(text)
+        self.assertEqual((0, 0), tuple(grounder.deduplication_info()))
+
+        filtered = FilteredGrounder(grounder=grounder, stop_words=["alzheimer  disease"])
+        self.assertEqual(
+            [[(0, 2)], []],
+            [
+                [(a.start, a.end) for a in annotations]
+                for annotations in filtered.annotate_batch([text, "Alzheimer disease"])
+            ],
+        )
+
+    def test_repository(self) -> None:
+        """Test making a filtered grounder from a repository."""
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            ssslm.write_literal_mappings(LITERAL_MAPPINGS, root.joinpath("positives.tsv"))
+            ssslm.write_literal_mappings(NEGATIVES, root.joinpath("negatives.tsv"))
+            root.joinpath("stop_words.tsv").write_text("text\tcurator_orcid\nAD\t0000-0000\n")
+            repository: Repository[NamedReference] = Repository(
+                root.joinpath("positives.tsv"),
+                root.joinpath("negatives.tsv"),
+                root.joinpath("stop_words.tsv"),
+            )
+
+            grounder = repository.make_grounder(implementation="dict")
+            self.assertNotIsInstance(grounder, FilteredGrounder)
+            self.assertEqual(2, len(grounder.get_matches("alzheimer disease")))
+
+            grounder = repository.make_grounder(filtered=True, implementation="dict")
+            self.assertIsInstance(grounder, FilteredGrounder)
+            self.assertEqual(1, len(grounder.get_matches("alzheimer disease")))
+            self.assertEqual([], grounder.get_matches("AD"))
@@ -0,0 +1,99 @@
+"""Tests for the fuzzy matcher."""
+
+import unittest
+
+from curies import NamedReference
+from curies import vocabulary as v
+
+from ssslm import LiteralMapping
+from ssslm.ner import (
+    NORMALIZED_MATCH_FACTOR,
+    DictMatcher,
+    FuzzyMatcher,
+    _get_deletes,
+    _get_edit_distance,
+)
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+R1 = NamedReference(prefix="p1", identifier="1", name="one")
+R2 = NamedReference(prefix="p2", identifier="2", name="two")
+
+
+class TestFuzzy(unittest.TestCase):
+    """Tests for the fuzzy matcher."""
+
+    def test_deletes(self) -> None:
+        """Test generating deletions."""
+        self.assertEqual({"abc"}, _get_deletes("abc", 0))
+        self.assertEqual({"abc", "bc", "ac", "ab"}, _get_deletes("abc", 1))
+        self.assertEqual({"abc", "bc", "ac", "ab", "a", "b", "c"}, _get_deletes("abc", 2))
+
+    def test_edit_distance(self) -> None:
+        """Test calculating edit distances."""
+        for a, b, expected in [
+            ("kitten", "kitten", 0),
+            ("kitten", "sitten", 1),
+            ("kitten", "kiten", 1),
+            ("kitten", "ikttne", 2),
+            ("kitten", "sitting", None),
+            ("kitten", "kit", None),
+        ]:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(expected, _get_edit_distance(a, b, 2))
+
+        # transpositions count once, including at the maximum distance
+        for a, b, max_distance, expected in [
+            ("ab", "ba", 1, 1),
+            ("ab", "ba", 0, None),
+            ("abcd", "badc", 2, 2),
+            ("abcd", "badc", 1, None),
+            ("kitten", "iktten", 1, 1),
+            ("kitten", "iktetn", 2, 2),
+        ]:
+            with self.subTest(a=a, b=b, max_distance=max_distance):
+                self.assertEqual(expected, _get_edit_distance(a, b, max_distance))
+
+    def test_match(self) -> None:
+        """Test fuzzy matching."""
+        matcher = FuzzyMatcher.from_literal_mappings([LM_1, LM_2, LM_3])
+        self.assertTrue(matcher.not_empty())
+
+        # exact matches work the same as the dictionary matcher
+        self.assertEqual(
+            DictMatcher.from_literal_mappings([LM_1, LM_2, LM_3]).get_matches("Alzheimer disease"),
+            matcher.get_matches("Alzheimer disease"),
+        )
+
+        for text in ["alzheimers disease", "alzhiemer disease", "alzhiemers disease"]:
+            with self.subTest(text=text):
+                match = matcher.get_best_match(text, strict=True)
+                self.assertEqual(ALZHEIMER_REFERENCE, match.reference)
+                self.assertLess(match.score, 0.8 * NORMALIZED_MATCH_FACTOR)
+
+        # scores are scaled by the similarity, based on the edit distance
+        match = matcher.get_best_match("alzhiemer disease", strict=True)
+        self.assertAlmostEqual(0.8 * NORMALIZED_MATCH_FACTOR * (1 - 1 / 17), match.score)
+
+        self.assertIsNone(matcher.get_best_match("alzhiemerz diseas"))
+        self.assertIsNone(matcher.get_best_match("parkinson disease"))
+
+    def test_prefix_length(self) -> None:
+        """Test that typos after the prefix can still be found."""
+        matcher = FuzzyMatcher.from_literal_mappings(
+            [LiteralMapping(reference=R1, text="hyperlipidemia", predicate=v.has_label)],
+            prefix_length=5,
+        )
+        self.assertEqual(R1, matcher.get_best_match("hyperlipidaemia", strict=True).reference)
+        self.assertEqual(R1, matcher.get_best_match("hyprelipidemia", strict=True).reference)
+
+    def test_fallback(self) -> None:
+        """Test using the fuzzy matcher as a fallback."""
+        exact = DictMatcher.from_literal_mappings([LiteralMapping(reference=R2, text="lung")])
+        matcher = FuzzyMatcher.from_literal_mappings(
+            [LiteralMapping(reference=R1, text="lungs")], matcher=exact
+        )
+        self.assertEqual([R2], [m.reference for m in matcher.get_matches("lung")])
+        self.assertEqual([R1], [m.reference for m in matcher.get_matches("lungz")])
+
+        matcher = FuzzyMatcher.from_literal_mappings([], matcher=exact)
+        self.assertTrue(matcher.not_empty())
@@ -1,7 +1,20 @@
 """Tests for Gilda."""
 
-from ssslm import literal_mappings_to_gilda
-from ssslm.ner import GildaGrounder
+from functools import partial
+from typing import Any
+
+from curies import NamedReference
+from curies import vocabulary as v
+
+from ssslm import LiteralMapping, literal_mappings_to_gilda
+from ssslm.ner import (
+    GildaGrounder,
+    GildaMatcher,
+    _get_gilda_priority_key,
+    _get_gilda_term_key,
+    _group_duplicate_gilda_terms,
+    _ScopedGildaEntries,
+)
 from tests import cases
 from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
 
@@ -27,4 +40,183 @@ class GildaTestCase(cases.BaseNERTestCase):
                 self.fail(msg=f"could not ground {t}")
             self.assertEqual(ALZHEIMER_REFERENCE, match.reference)
 
+        texts = ["alzheimer disease", "nope", "alzheimer disease"]
+        self.assertEqual(
+            [grounder.get_matches(text) for text in texts], grounder.get_matches_batch(texts)
+        )
+
         self.assert_ner_alzheimer(grounder)
+
+    def test_limit(self) -> None:
+        """Test limiting the number of matches."""
+        reference = NamedReference(prefix="doid", identifier="10652", name="Alzheimer's disease")
+        lm_4 = LiteralMapping(reference=reference, text="Alzheimer disease")
+        matcher = GildaMatcher.from_literal_mappings([LM_1, LM_2, LM_3, lm_4])
+
+        text = "alzheimer disease"
+        matches = matcher.get_matches(text)
+        self.assertEqual(2, len(matches))
+        self.assertEqual(matches[:1], matcher.get_matches(text, limit=1))
+        self.assertEqual(matches[:1], matcher.get_matches(text, min_score=matches[0].score))
+        self.assertEqual([], matcher.get_matches(text, min_score=1.0))
+        self.assertEqual(matches[0], matcher.get_best_match(text))
+        self.assertEqual(matches[:1], matcher.get_best_match_batch([text]))
+        self.assertIsNone(matcher.get_best_match("nope"))
+
+        # references are only constructed once per term
+        self.assertIs(matches[0].reference, matcher.get_best_match(text, strict=True).reference)
+
+    def test_sub_indexes(self) -> None:
+        """Test grounding against per-namespace and per-organism sub-indexes."""
+        doid = NamedReference(prefix="doid", identifier="10652", name="Alzheimer's disease")
+        human = NamedReference(prefix="ncbitaxon", identifier="9606", name="Homo sapiens")
+        mouse = NamedReference(prefix="ncbitaxon", identifier="10090", name="Mus musculus")
+        human_gene = NamedReference(prefix="hgnc", identifier="613", name="APOE")
+        mouse_gene = NamedReference(prefix="mgi", identifier="88057", name="Apoe")
+        literal_mappings = [
+            LM_1,
+            LM_2,
+            LM_3,
+            LiteralMapping(reference=doid, text="Alzheimer disease"),
+            LiteralMapping(reference=human_gene, text="APOE", taxon=human),
+            LiteralMapping(reference=mouse_gene, text="Apoe", taxon=mouse),
+        ]
+        matcher = GildaMatcher.from_literal_mappings(literal_mappings)
+        indexed_matcher = GildaMatcher.from_literal_mappings(literal_mappings, sub_indexes=True)
+
+        namespaces_and_organisms: list[tuple[list[str] | None, list[str] | None]] = [
+            (None, None),
+            (["doid"], None),
+            (["MESH", "doid"], None),
+            (["nope"], None),
+            (None, ["10090"]),
+            (None, ["10090", "9606"]),
+            (["hgnc"], ["10090"]),
+        ]
+        for namespaces, organisms in namespaces_and_organisms:
+            for text in ["alzheimer disease", "apoe"]:
+                with self.subTest(text=text, namespaces=namespaces, organisms=organisms):
+                    self.assertEqual(
+                        matcher.get_matches(text, namespaces=namespaces, organisms=organisms),
+                        indexed_matcher.get_matches(
+                            text, namespaces=namespaces, organisms=organisms
+                        ),
+                    )
+
+        self.assertEqual(
+            [mouse_gene],
+            [m.reference for m in indexed_matcher.get_matches("apoe", organisms=["10090"])],
+        )
+        # the same Gilda grounder is used, and lookups are restricted to relevant terms
+        entries = indexed_matcher._grounder.entries
+        self.assertIsInstance(entries, _ScopedGildaEntries)
+        self.assertEqual(["hgnc", "mgi"], sorted(term.db for term in entries.get("apoe", [])))
+        with indexed_matcher._scope(["hgnc"], None):
+            self.assertEqual(["hgnc"], [term.db for term in entries.get("apoe", [])])
+            self.assertEqual([], entries.get("alzheimer disease", []))
+        with indexed_matcher._scope(None, ["10090"]):
+            self.assertEqual(["mgi"], [term.db for term in entries.get("apoe", [])])
+        self.assertEqual(2, len(entries.get("apoe", [])))
+        # wrapping the same Gilda grounder again reuses the view
+        self.assertIs(
+            entries, GildaMatcher(indexed_matcher._grounder, sub_indexes=True)._scoped_entries
+        )
+
+    def test_update(self) -> None:
+        """Test adding and removing literal mappings is the same as rebuilding."""
+        doid = NamedReference(prefix="doid", identifier="10652", name="Alzheimer's disease")
+        human = NamedReference(prefix="ncbitaxon", identifier="9606", name="Homo sapiens")
+        human_gene = NamedReference(prefix="hgnc", identifier="613", name="APOE")
+        # these are duplicates, of which the label is chosen
+        synonym = LiteralMapping(reference=doid, text="Alzheimer disease")
+        label = LiteralMapping(reference=doid, text="Alzheimer disease", predicate=v.has_label)
+        gene = LiteralMapping(reference=human_gene, text="APOE", taxon=human)
+        base = [LM_1, LM_2, synonym]
+        additions = [LM_3, label, gene, LiteralMapping(reference=doid, text="risk for alzheimers")]
+        removals = [LM_1, label, gene]
+        remaining = [lm for lm in base + additions if lm not in removals]
+
+        for filter_duplicates, sub_indexes in [(True, False), (False, False), (True, True)]:
+            with self.subTest(filter_duplicates=filter_duplicates, sub_indexes=sub_indexes):
+                build = partial(
+                    GildaMatcher.from_literal_mappings,
+                    filter_duplicates=filter_duplicates,
+                    sub_indexes=sub_indexes,
+                )
+                matcher = build(base)
+                matcher.add_literal_mappings(additions)
+                self.assert_same_gilda(build(base + additions), matcher)
+                matcher.remove_literal_mappings(removals)
+                self.assert_same_gilda(build(remaining), matcher)
+                self.assertNotIn("apoe", matcher._grounder.prefix_index)
+
+                # the synonym takes the place of the removed label
+                self.assertEqual(
+                    [("doid", "synonym")],
+                    [(t.db, t.status) for t in matcher._grounder.entries["alzheimer disease"]],
+                )
+
+    def assert_same_gilda(self, expected: GildaMatcher[Any], matcher: GildaMatcher[Any]) -> None:
+        """Test that two Gilda matchers have the same index and give the same matches."""
+        self.assertEqual(
+            {
+                k: [term.to_list() for term in terms]
+                for k, terms in expected._grounder.entries.items()
+            },
+            {
+                k: [term.to_list() for term in terms]
+                for k, terms in matcher._grounder.entries.items()
+            },
+        )
+        self.assertEqual(expected._grounder.prefix_index, matcher._grounder.prefix_index)
+        for text in ["alzheimer disease", "Alzheimer's disease", "apoe", "risk for alzheimers"]:
+            for namespaces in [None, ["doid"]]:
+                self.assertEqual(
+                    expected.get_matches(text, namespaces=namespaces),
+                    matcher.get_matches(text, namespaces=namespaces),
+                )
+
+    def test_term_keys(self) -> None:
+        """Test the keys for choosing between duplicate terms are the same as Gilda's."""
+        import gilda.term
+        from gilda import Term
+        from gilda.term import filter_out_duplicates
+
+        terms = [
+            Term(
+                norm_text=text.lower(),
+                text=text,
+                db=db,
+                id="1",
+                entry_name=text,
+                status=status,
+                source=source,
+                source_db=source_db,
+                source_id=source_id,
+            )
+            for text in ["Alzheimer disease", "APOE"]
+            for db in ["DOID", "MESH"]
+            for status in ["curated", "name", "synonym", "former_name"]
+            for source, source_db, source_id in [
+                (db.lower(), None, None),
+                ("other", None, None),
+                ("other", "UMLS", "C0002395"),
+            ]
+        ]
+        expected = filter_out_duplicates(list(terms))  # type:ignore[no-untyped-call]
+        groups = _group_duplicate_gilda_terms(terms)
+        self.assertEqual(len(expected), len(groups))
+        self.assertEqual(
+            sorted(term.to_list() for term in expected),
+            sorted(min(group, key=_get_gilda_priority_key).to_list() for group in groups.values()),
+        )
+
+        # compare with Gilda's private implementations, if they still exist
+        term_key = getattr(gilda.term, "_term_key", None)
+        if term_key is not None:
+            self.assertEqual([term_key(t) for t in terms], [_get_gilda_term_key(t) for t in terms])
+        priority_key = getattr(gilda.term, "_priority_key", None)
+        if priority_key is not None:
+            self.assertEqual(
+                [priority_key(t) for t in terms], [_get_gilda_priority_key(t) for t in terms]
+            )
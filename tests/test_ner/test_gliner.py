@@ -1,12 +1,47 @@
 """Tests for GLiNER."""
 
 import importlib.util
+import sys
+import types
 import unittest
+from typing import Any
+from unittest import mock
 
-from ssslm.ner import GLiNERGrounder
+from ssslm.ner import DeduplicationInfo, GLiNERGrounder, _get_windows, _merge_window_entities
 from tests import cases
 
 
+class MockGLiNER:
+    """A mock GLiNER model that finds the given phrases."""
+
+    def __init__(self, phrases: list[str]) -> None:
+        """Initialize the mock model with phrases to find."""
+        self.phrases = phrases
+        self.batches: list[list[str]] = []
+
+    def predict_entities(
+        self, text: str, labels: list[str], threshold: float = 0.5
+    ) -> list[dict[str, Any]]:
+        """Predict entities by finding phrases in the text."""
+        rv = []
+        for phrase in self.phrases:
+            start = text.find(phrase)
+            while start != -1:
+                end = start + len(phrase)
+                rv.append(
+                    {"start": start, "end": end, "text": phrase, "label": labels[0], "score": 1.0}
+                )
+                start = text.find(phrase, end)
+        return sorted(rv, key=lambda entity: entity["start"])
+
+    def batch_predict_entities(
+        self, texts: list[str], labels: list[str], threshold: float = 0.5
+    ) -> list[list[dict[str, Any]]]:
+        """Predict entities for several texts."""
+        self.batches.append(texts)
+        return [self.predict_entities(text, labels, threshold=threshold) for text in texts]
+
+
 class GlinerTestCase(cases.BaseNERTestCase):
     """Test GLiNER."""
 
@@ -18,3 +53,129 @@ class GlinerTestCase(cases.BaseNERTestCase):
             labels=["disease"],
         )
         self.assert_ner_alzheimer(grounder)
+
+    def test_batch(self) -> None:
+        """Test batch annotation with a mock model."""
+        grounder = GLiNERGrounder(
+            matcher=cases.MockMatcher(),
+            model=MockGLiNER(["Alzheimer disease"]),  # type:ignore[arg-type,unused-ignore]
+            labels=["disease"],
+        )
+        self.assert_ner_alzheimer(grounder)
+
+        texts = [cases.TEXT.replace("'s", ""), "Nothing here.", "Alzheimer disease"]
+        self.assertEqual(
+            [grounder.annotate(text) for text in texts],
+            grounder.annotate_batch(texts),
+        )
+
+    def test_windows(self) -> None:
+        """Test splitting text into windows."""
+        text = "a bb  ccc d ee"
+        self.assertEqual([(0, text)], _get_windows(text, 5, 1))
+        self.assertEqual(
+            [(0, "a bb  ccc"), (6, "ccc d ee")],
+            _get_windows(text, 3, 1),
+        )
+        self.assertEqual(
+            [(0, "a bb"), (2, "bb  ccc"), (6, "ccc d"), (10, "d ee")],
+            _get_windows(text, 2, 1),
+        )
+
+    def test_merge(self) -> None:
+        """Test merging entities from overlapping windows."""
+        entities = [
+            {"start": 0, "end": 5, "score": 0.5},
+            {"start": 10, "end": 15, "score": 0.6},
+            {"start": 10, "end": 20, "score": 0.7},
+            {"start": 0, "end": 5, "score": 0.8},
+            {"start": 25, "end": 30, "score": 0.9},
+            {"start": 12, "end": 18, "score": 0.4},
+        ]
+        # only entities with the same span are merged, so nested and overlapping
+        # entities are kept
+        self.assertEqual(
+            [
+                {"start": 0, "end": 5, "score": 0.8},
+                {"start": 10, "end": 15, "score": 0.6},
+                {"start": 10, "end": 20, "score": 0.7},
+                {"start": 12, "end": 18, "score": 0.4},
+                {"start": 25, "end": 30, "score": 0.9},
+            ],
+            _merge_window_entities(entities),
+        )
+
+    def test_annotation_text(self) -> None:
+        """Test that annotations refer to the document text, not the entity text."""
+        grounder = GLiNERGrounder(
+            matcher=cases.MockMatcher(),
+            model=MockGLiNER(["Alzheimer disease"]),  # type:ignore[arg-type,unused-ignore]
+            labels=["disease"],
+        )
+        text = cases.TEXT.replace("'s", "")
+        annotations = grounder.annotate(text)
+        self.assertNotEqual([], annotations)
+        for annotation in annotations:
+            self.assertEqual(text, annotation.text)
+            self.assertEqual("Alzheimer disease", annotation.substr)
+
+    def test_threads(self) -> None:
+        """Test that the number of threads is only changed while predicting."""
+        num_threads = [4]
+        calls: list[int] = []
+
+        def set_num_threads(threads: int) -> None:
+            calls.append(threads)
+            num_threads[0] = threads
+
+        torch = types.SimpleNamespace(
+            get_num_threads=lambda: num_threads[0], set_num_threads=set_num_threads
+        )
+        with mock.patch.dict(sys.modules, {"torch": torch}):
+            grounder = GLiNERGrounder(
+                matcher=cases.MockMatcher(),
+                model=MockGLiNER(["Alzheimer disease"]),  # type:ignore[arg-type,unused-ignore]
+                labels=["disease"],
+                threads=1,
+            )
+            self.assertEqual([], calls)
+            self.assertEqual(1, grounder.with_matcher(cases.MockMatcher()).threads)
+            self.assert_ner_alzheimer(grounder)
+            self.assertEqual(4, num_threads[0])
+            self.assertEqual([1, 4], calls[:2])
+
+    def test_long(self) -> None:
+        """Test annotating texts that are longer than the window size."""
+        model = MockGLiNER(["Alzheimer disease"])
+        grounder = GLiNERGrounder(
+            matcher=cases.MockMatcher(),
+            model=model,  # type:ignore[arg-type,unused-ignore]
+            labels=["disease"],
+            window_size=10,
+            window_overlap=3,
+            batch_size=4,
+        )
+        sentence = "The APOE e4 mutation is correlated with risk for Alzheimer disease. "
+        text = sentence * 5
+        annotations = grounder.annotate(text)
+        self.assertEqual(
+            [sentence.index("Alzheimer") + i * len(sentence) for i in range(5)],
+            [annotation.start for annotation in annotations],
+        )
+        for annotation in annotations:
+            self.assertEqual("Alzheimer disease", text[annotation.start : annotation.end])
+
+        model.batches.clear()
+        self.assertEqual(DeduplicationInfo(5, 1), grounder.deduplication_info())
+        self.assertEqual([annotations, []], grounder.annotate_batch([text, "Nothing here."]))
+        self.assertTrue(all(len(batch) <= 4 for batch in model.batches))
+        self.assertEqual(["Nothing here."], model.batches[-1][-1:])
+
+        with self.assertRaises(ValueError):
+            GLiNERGrounder(
+                matcher=cases.MockMatcher(),
+                model=model,  # type:ignore[arg-type,unused-ignore]
+                labels=["disease"],
+                window_size=3,
+                window_overlap=3,
+            )
@@ -0,0 +1,98 @@
+"""Tests for the MinHash-LSH matcher."""
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+from curies import NamedReference
+from curies import vocabulary as v
+
+from ssslm import LiteralMapping
+from ssslm.ner import DictMatcher, MinHashMatcher
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+R1 = NamedReference(prefix="p1", identifier="1", name="one")
+R2 = NamedReference(prefix="p2", identifier="2", name="two")
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), reason="ssslm[minhash] is required")
+class TestMinHash(unittest.TestCase):
+    """Tests for the MinHash-LSH matcher."""
+
+    def setUp(self) -> None:
+        """Set up the test case with a matcher."""
+        self.literal_mappings = [
+            LM_1,
+            LM_2,
+            LM_3,
+            LiteralMapping(reference=R1, text="Parkinson disease", predicate=v.has_label),
+            LiteralMapping(reference=R2, text="purkinje cell", predicate=v.has_label),
+        ]
+        # use many bands with few rows, so the small examples reliably become candidates
+        self.matcher = MinHashMatcher.from_literal_mappings(self.literal_mappings, bands=64, rows=1)
+
+    def test_exact(self) -> None:
+        """Test that exact matches get the same score as the dictionary matcher."""
+        dict_matcher = DictMatcher.from_literal_mappings(self.literal_mappings)
+        for text in ["Parkinson disease", "PURKINJE  cell", "Alzheimer's disease"]:
+            with self.subTest(text=text):
+                expected = dict_matcher.get_best_match(text, strict=True)
+                match = self.matcher.get_best_match(text, strict=True)
+                self.assertEqual(expected.reference, match.reference)
+                self.assertAlmostEqual(expected.score, match.score)
+
+    def test_approximate(self) -> None:
+        """Test approximate matching."""
+        match = self.matcher.get_best_match("alzheimers diseases", strict=True)
+        self.assertEqual(ALZHEIMER_REFERENCE, match.reference)
+        self.assertLess(match.score, 0.8)
+
+        self.assertEqual(R2, self.matcher.get_best_match("purkinje cells", strict=True).reference)
+        self.assertIsNone(self.matcher.get_best_match("hippocampus"))
+
+    def test_batch(self) -> None:
+        """Test batch matching is the same as matching one at a time."""
+        texts = ["alzheimers disease", "parkinsons", "purkinje cells", "hippocampus", ""]
+        self.assertEqual(
+            [self.matcher.get_matches(text) for text in texts],
+            self.matcher.get_matches_batch(texts),
+        )
+        self.assertEqual([], self.matcher.get_matches_batch([]))
+
+    def test_filters(self) -> None:
+        """Test filtering by namespace."""
+        matcher = MinHashMatcher.from_literal_mappings(
+            self.literal_mappings, bands=64, rows=1, min_similarity=0.2
+        )
+        matches = matcher.get_matches("alzheimer disease", namespaces=["p1"])
+        self.assertEqual([R1], [match.reference for match in matches])
+
+    def test_persist(self) -> None:
+        """Test saving and loading the index."""
+        texts = ["alzheimers disease", "purkinje cells", "hippocampus"]
+        expected = self.matcher.get_matches_batch(texts)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath("index.npz")
+            self.matcher.save(path)
+            matcher = MinHashMatcher.from_literal_mappings(
+                self.literal_mappings, bands=64, rows=1, path=path
+            )
+            self.assertEqual(expected, matcher.get_matches_batch(texts))
+
+            with self.assertRaises(ValueError):
+                MinHashMatcher.from_literal_mappings(self.literal_mappings[1:], path=path)
+
+            # the index is written if the file doesn't exist yet
+            other_path = Path(directory).joinpath("other.npz")
+            MinHashMatcher.from_literal_mappings(self.literal_mappings, path=other_path)
+            self.assertTrue(other_path.is_file())
+
+    def test_workers(self) -> None:
+        """Test computing signatures in several processes gives the same index."""
+        keys = [f"text {i}" for i in range(10_000)]
+        self.assertTrue(
+            (
+                self.matcher._get_signatures(keys) == self.matcher._get_signatures(keys, workers=2)
+            ).all()
+        )
@@ -1,5 +1,7 @@
 """Tests for NER."""
 
+import importlib.util
+import io
 import tempfile
 from pathlib import Path
 
@@ -12,6 +14,7 @@ from ssslm.ner import (
     Annotation,
     GildaMatcher,
     Match,
+    iter_annotations,
     make_grounder,
     read_annotations,
     write_annotations,
@@ -95,7 +98,62 @@ class TestNER(cases.BaseNERTestCase):
             end=10,
             text="hello",
         )
+        annotation_2 = Annotation(
+            match=Match(
+                reference=curies.NamableReference(
+                    prefix="prefix", identifier="identifier", name="name"
+                ),
+                score=0.5,
+            ),
+            start=12,
+            end=20,
+            text="goodbye",
+        )
+        annotation_3 = Annotation(
+            match=Match(
+                reference=curies.NamableReference(prefix="prefix", identifier="identifier2"),
+                score=0.5,
+            ),
+            start=0,
+            end=1,
+            text="x",
+        )
+        annotations = [annotation, annotation_2, annotation_3]
+        names = ["test.tsv", "test.tsv.gz", "test.jsonl", "test.jsonl.gz"]
+        if importlib.util.find_spec("pyarrow"):
+            names.append("test.parquet")
         with tempfile.TemporaryDirectory() as directory:
             path = Path(directory).joinpath("test.tsv")
-            write_annotations([annotation], path)
-            self.assertEqual([annotation], read_annotations(path))
+            write_annotations(annotations, path)
+            self.assertEqual(
+                "curie\tname\tscore\tstart\tend\ttext",
+                path.read_text().splitlines()[0],
+            )
+
+            for name in names:
+                with self.subTest(name=name):
+                    path = Path(directory).joinpath(name)
+                    write_annotations(annotations, path, batch_size=1)
+                    self.assertEqual(annotations, read_annotations(path))
+                    self.assertEqual(annotations, list(iter_annotations(path)))
+                    trusted = read_annotations(path, trusted=True)
+                    self.assertEqual(annotations, trusted)
+                    self.assertIs(trusted[0].reference, trusted[1].reference)
+                    self.assertIsNone(trusted[2].name)
+
+            path = Path(directory).joinpath("test.txt")
+            write_annotations(annotations, path, annotation_format="jsonl")
+            self.assertEqual(annotations, read_annotations(path, annotation_format="jsonl"))
+
+            # Parquet files are compressed internally and need a path or a binary file
+            with self.assertRaises(ValueError):
+                write_annotations(annotations, Path(directory).joinpath("test.parquet.gz"))
+            with self.assertRaises(ValueError):
+                write_annotations(annotations, io.StringIO(), annotation_format="parquet")
+            with self.assertRaises(ValueError):
+                read_annotations(io.StringIO(), annotation_format="parquet")
+
+        file = io.StringIO()
+        write_annotations(annotations, file, annotation_format="jsonl")
+        file.seek(0)
+        self.assertEqual(annotations, read_annotations(file, annotation_format="jsonl"))
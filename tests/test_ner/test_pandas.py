@@ -1,11 +1,14 @@
 """Tests for pandas integration."""
 
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 from curies import NamedReference
 
 from ssslm import Match, make_grounder
 from ssslm.model import PANDAS_AVAILABLE, LiteralMapping
+from tests.cases import LM_1, LM_2, LM_3
 
 
 @unittest.skipUnless(PANDAS_AVAILABLE, reason="This test requires pandas")
@@ -67,3 +70,75 @@ class TestPandas(unittest.TestCase):
             ],
             df.values.tolist(),
         )
+
+    def test_ground_unique(self) -> None:
+        """Test each unique value is only grounded once."""
+        import pandas as pd
+
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+        texts: list[list[str]] = []
+        get_best_match_batch = grounder.get_best_match_batch
+
+        def _get_best_match_batch(texts_: list[str], **kwargs: Any) -> list[Match | None]:
+            texts.append(list(texts_))
+            return get_best_match_batch(texts_, **kwargs)
+
+        grounder.get_best_match_batch = _get_best_match_batch  # type:ignore
+
+        values = ["alzheimer disease", None, "nope", 5, float("nan"), "alzheimer disease"]
+        df = pd.DataFrame({"disease": values * 3})
+        grounder.ground_df(df, "disease")
+        self.assertEqual([["alzheimer disease", "nope"]], texts)
+        self.assertEqual(
+            ["MESH:D000544", None, None, None, None, "MESH:D000544"] * 3,
+            df["disease_grounded"].tolist(),
+        )
+
+        # values are only grounded once across chunks
+        chunks = [df.iloc[:4].copy(), df.iloc[4:].copy(), pd.DataFrame({"disease": ["a"]})]
+        results = list(grounder.ground_df_chunks(chunks, "disease", target_column="curie"))
+        self.assertEqual(3, len(results))
+        self.assertEqual(
+            df["disease_grounded"].tolist(),
+            pd.concat(results[:2])["curie"].tolist(),
+        )
+        self.assertEqual(
+            [["alzheimer disease", "nope"], ["alzheimer disease", "nope"], ["a"]], texts
+        )
+
+        # only the most recently used values are remembered across chunks
+        texts.clear()
+        chunks = [
+            pd.DataFrame({"disease": ["alzheimer disease", "nope"]}),
+            pd.DataFrame({"disease": ["nope", "alzheimer disease"]}),
+        ]
+        results = list(grounder.ground_df_chunks(chunks, "disease", memo_size=1))
+        self.assertEqual(
+            [["MESH:D000544", None], [None, "MESH:D000544"]],
+            [df["disease_grounded"].tolist() for df in results],
+        )
+        self.assertEqual([["alzheimer disease", "nope"], ["alzheimer disease"]], texts)
+
+    def test_ground_unhashable(self) -> None:
+        """Test grounding a column with unhashable values, which are skipped."""
+        import pandas as pd
+
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+        df = pd.DataFrame({"disease": [["alzheimer disease"], "alzheimer disease", None, {}]})
+        grounder.ground_df(df, "disease")
+        self.assertEqual([None, "MESH:D000544", None, None], df["disease_grounded"].tolist())
+
+    def test_ground_parallel(self) -> None:
+        """Test grounding unique values in parallel."""
+        import pandas as pd
+
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+        values = [f"value {i}" for i in range(100)] + ["alzheimer disease"]
+        expected = [None] * 100 + ["MESH:D000544"]
+        df = pd.DataFrame({"disease": values})
+        grounder.ground_df(df, "disease", executor=2)
+        self.assertEqual(expected, df["disease_grounded"].tolist())
+
+        with ThreadPoolExecutor(2) as executor:
+            grounder.ground_df(df, "disease", target_column="curie", executor=executor)
+        self.assertEqual(expected, df["curie"].tolist())
@@ -0,0 +1,77 @@
+"""Tests for compact annotation tables."""
+
+import importlib.util
+import unittest
+from typing import Any, Literal
+
+from ssslm import make_grounder
+from ssslm.ner import Annotation, AnnotationTable, Annotator, RawAnnotation
+from tests import cases
+from tests.cases import LM_1, LM_2, LM_3
+
+TEXTS = [
+    cases.TEXT,
+    "Nothing to see here.",
+    "Alzheimer disease and alzheimer's disease",
+]
+
+
+class DefaultAnnotator(Annotator):
+    """An annotator that uses the default raw implementation."""
+
+    def __init__(self) -> None:
+        """Wrap a dictionary-based grounder."""
+        self.grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+
+    def annotate(self, text: str, **kwargs: Any) -> list[Annotation]:
+        """Annotate with the wrapped grounder."""
+        return self.grounder.annotate(text, **kwargs)
+
+
+class TestRaw(unittest.TestCase):
+    """Tests for compact annotation tables."""
+
+    def test_implementations(self) -> None:
+        """Test converting back to annotations gives the same results."""
+        implementations: list[Literal["dict", "aho-corasick", "trie"]] = [
+            "dict",
+            "aho-corasick",
+            "trie",
+        ]
+        for implementation in implementations:
+            with self.subTest(implementation=implementation):
+                grounder = make_grounder([LM_1, LM_2, LM_3], implementation=implementation)
+                table = grounder.annotate_batch_raw(TEXTS)
+                self.assertIsInstance(table, AnnotationTable)
+                self.assertEqual([cases.ALZHEIMER_REFERENCE], table.references)
+                self.assertEqual(3, len(table))
+                self.assertEqual(grounder.annotate_batch(TEXTS), table.to_annotations(TEXTS))
+
+        annotator = DefaultAnnotator()
+        self.assertEqual(
+            annotator.grounder.annotate_batch_raw(TEXTS).rows,
+            annotator.annotate_batch_raw(TEXTS).rows,
+        )
+
+    def test_table(self) -> None:
+        """Test constructing a table."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="dict")
+        table = AnnotationTable.from_annotations(grounder.annotate_batch(TEXTS))
+        self.assertEqual(
+            [(0, 49, 68, 0), (2, 0, 17, 0), (2, 22, 41, 0)],
+            [(row.document, row.start, row.end, row.reference) for row in table.rows],
+        )
+        self.assertEqual(
+            [0.8, 0.72, 0.8],
+            [round(row.score, 2) for row in table.rows],
+        )
+        self.assertIsInstance(table.rows[0], RawAnnotation)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), reason="NumPy is required")
+    def test_numpy(self) -> None:
+        """Test converting to a NumPy structured array."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="aho-corasick")
+        array = grounder.annotate_batch_raw(TEXTS).to_numpy()
+        self.assertEqual([0, 2, 2], array["document"].tolist())
+        self.assertEqual([0, 0, 0], array["reference"].tolist())
+        self.assertEqual([49, 0, 22], array["start"].tolist())
@@ -2,11 +2,65 @@
 
 import importlib.util
 import unittest
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
 
-from ssslm.ner import SpacyGrounder
+from ssslm.ner import SPACY_DISABLE_DEFAULT, DeduplicationInfo, Match, SpacyGrounder
 from tests import cases
 
 
+class MockSpan(NamedTuple):
+    """A mock spaCy span."""
+
+    text: str
+    start_char: int
+    end_char: int
+
+
+class MockDoc(NamedTuple):
+    """A mock spaCy document."""
+
+    ents: list[MockSpan]
+
+
+class MockLanguage:
+    """A mock spaCy language model that finds the given phrases."""
+
+    def __init__(self, phrases: list[str]) -> None:
+        """Initialize the mock model with phrases to find."""
+        self.phrases = phrases
+        self.calls: list[dict[str, Any]] = []
+
+    def __call__(self, text: str, **kwargs: Any) -> MockDoc:
+        """Process a document by finding phrases in the text."""
+        ents = []
+        for phrase in self.phrases:
+            start = text.find(phrase)
+            while start != -1:
+                ents.append(MockSpan(phrase, start, start + len(phrase)))
+                start = text.find(phrase, start + len(phrase))
+        return MockDoc(sorted(ents, key=lambda span: span.start_char))
+
+    def pipe(self, texts: Iterable[str], **kwargs: Any) -> Iterator[MockDoc]:
+        """Process several documents."""
+        self.calls.append(kwargs)
+        for text in texts:
+            yield self(text)
+
+
+class CountingMatcher(cases.MockMatcher):
+    """A mock matcher that records the texts it matches."""
+
+    def __init__(self) -> None:
+        """Initialize the record."""
+        self.texts: list[str] = []
+
+    def get_matches(self, text: str, **kwargs: Any) -> list[Match]:
+        """Record the text and return a match."""
+        self.texts.append(text)
+        return super().get_matches(text, **kwargs)
+
+
 class ScispaCyTestCase(cases.BaseNERTestCase):
     """Test scispacy."""
 
@@ -25,3 +79,62 @@ class ScispaCyTestCase(cases.BaseNERTestCase):
             spacy_model=spacy_model,
         )
         self.assert_ner_alzheimer(grounder)
+
+    def test_batch(self) -> None:
+        """Test batch annotation with a mock model."""
+        grounder = SpacyGrounder(
+            matcher=cases.MockMatcher(),
+            spacy_model=MockLanguage(["Alzheimer disease", "APOE"]),  # type:ignore[arg-type,unused-ignore]
+        )
+        self.assert_ner_alzheimer(grounder)
+
+        texts = [cases.TEXT.replace("'s", ""), "Nothing here.", "Alzheimer disease"]
+        self.assertEqual(
+            [grounder.annotate(text) for text in texts],
+            grounder.annotate_batch(texts),
+        )
+
+    def test_batch_options(self) -> None:
+        """Test options for batch annotation, and that entity texts are deduplicated."""
+        matcher = CountingMatcher()
+        language = MockLanguage(["Alzheimer disease", "APOE"])
+        grounder = SpacyGrounder(
+            matcher=matcher,
+            spacy_model=language,  # type:ignore[arg-type,unused-ignore]
+            batch_size=5,
+            n_process=2,
+        )
+        texts = ["APOE and Alzheimer disease", "Alzheimer disease", "APOE", "APOE"]
+        annotations = grounder.annotate_batch(texts)
+        self.assertEqual([2, 1, 1, 1], [len(a) for a in annotations])
+        self.assertEqual(["APOE", "Alzheimer disease"], matcher.texts)
+        self.assertEqual(
+            [{"batch_size": 5, "n_process": 2, "disable": list(SPACY_DISABLE_DEFAULT)}],
+            language.calls,
+        )
+
+    def test_deduplicate(self) -> None:
+        """Test entity texts are only grounded once per document or batch."""
+        texts = ["APOE and APOE and Alzheimer disease", "APOE", "Alzheimer disease"]
+        language = MockLanguage(["Alzheimer disease", "APOE"])
+
+        matcher = CountingMatcher()
+        grounder = SpacyGrounder(matcher=matcher, spacy_model=language)  # type:ignore[arg-type,unused-ignore]
+        self.assertEqual(2, len(grounder.annotate("APOE and APOE")))
+        self.assertEqual(["APOE"], matcher.texts)
+        self.assertEqual(DeduplicationInfo(2, 1), grounder.deduplication_info())
+        grounder.deduplication_clear()
+
+        grounder.annotate_batch(texts)
+        self.assertEqual(DeduplicationInfo(5, 2), grounder.deduplication_info())
+
+        matcher = CountingMatcher()
+        grounder = SpacyGrounder(
+            matcher=matcher,
+            spacy_model=language,  # type:ignore[arg-type,unused-ignore]
+            deduplicate="document",
+        )
+        annotations = grounder.annotate_batch(texts)
+        self.assertEqual([3, 1, 1], [len(a) for a in annotations])
+        self.assertEqual(["APOE", "Alzheimer disease", "APOE", "Alzheimer disease"], matcher.texts)
+        self.assertEqual(DeduplicationInfo(5, 4), grounder.deduplication_info())
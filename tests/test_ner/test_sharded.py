@@ -0,0 +1,228 @@
+"""Tests for sharded grounders."""
+
+import gc
+import importlib.util
+import itertools
+import unittest
+from typing import Any
+
+from curies import NamedReference
+
+from ssslm import LiteralMapping
+from ssslm.ner import (
+    Annotation,
+    Implementation,
+    Match,
+    ShardedGrounder,
+    ShardPartition,
+    _get_shard_normalizer,
+    _merge_shard_annotations,
+    _merge_shard_matches,
+    _normalize,
+    _partition_literal_mappings,
+    make_grounder,
+)
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+DOID_REFERENCE = NamedReference(prefix="DOID", identifier="10652", name="Alzheimer's disease")
+HEART_REFERENCE = NamedReference(prefix="UBERON", identifier="0000948", name="heart")
+LITERAL_MAPPINGS = [
+    LM_1,
+    LM_2,
+    LM_3,
+    LiteralMapping(reference=DOID_REFERENCE, text="Alzheimer's disease"),
+    LiteralMapping(reference=HEART_REFERENCE, text="heart"),
+]
+IL6_REFERENCE = NamedReference(prefix="hgnc", identifier="6018", name="IL6")
+IL6_MESH_REFERENCE = NamedReference(prefix="mesh", identifier="D015850", name="Interleukin-6")
+#: Literal mappings whose texts collide after normalization, across several prefixes
+COLLIDING = [
+    *LITERAL_MAPPINGS,
+    LiteralMapping(reference=DOID_REFERENCE, text="alzheimer disease"),
+    LiteralMapping(reference=HEART_REFERENCE, text="HEART"),
+    LiteralMapping(reference=IL6_REFERENCE, text="IL-6"),
+    LiteralMapping(reference=IL6_REFERENCE, text="IL6"),
+    LiteralMapping(reference=IL6_MESH_REFERENCE, text="il-6"),
+    LiteralMapping(reference=IL6_MESH_REFERENCE, text="Interleukin 6"),
+]
+QUERIES = ["Alzheimer's disease", "alzheimer disease", "heart", "IL-6", "il6", "interleukin 6"]
+DOCUMENTS = ["IL-6 in the heart and Alzheimer disease.", "Interleukin 6 and alzheimer's disease"]
+
+
+class TestSharded(unittest.TestCase):
+    """Tests for sharded grounders."""
+
+    def test_partition(self) -> None:
+        """Test partitioning literal mappings."""
+        shards = _partition_literal_mappings(LITERAL_MAPPINGS, 3, "prefix", normalize=_normalize)
+        self.assertEqual(
+            [{"MESH"}, {"DOID"}, {"UBERON"}],
+            [{lm.reference.prefix for lm in shard} for shard in shards],
+        )
+
+        shards = _partition_literal_mappings(LITERAL_MAPPINGS, 2, "text", normalize=_normalize)
+        self.assertEqual(len(LITERAL_MAPPINGS), sum(len(shard) for shard in shards))
+        # the same normalized text always goes in the same shard
+        self.assertEqual(1, sum(LITERAL_MAPPINGS[3] in shard and LM_3 in shard for shard in shards))
+
+        with self.assertRaises(ValueError):
+            _partition_literal_mappings(
+                LITERAL_MAPPINGS,
+                2,
+                "nope",  # type:ignore[arg-type]
+                normalize=_normalize,
+            )
+
+    @unittest.skipUnless(importlib.util.find_spec("gilda"), reason="gilda is required")
+    def test_partition_gilda(self) -> None:
+        """Test that texts are partitioned with Gilda's normalization for Gilda shards."""
+        self.assertIs(_normalize, _get_shard_normalizer("dict"))
+        normalize = _get_shard_normalizer(None)
+        self.assertEqual(normalize("IL-6"), normalize("IL6"))
+        literal_mappings = COLLIDING[-4:-1]
+        for shards in range(2, 8):
+            partitioned = _partition_literal_mappings(
+                literal_mappings, shards, "text", normalize=normalize
+            )
+            # all of Gilda's texts for "il6" go in the same shard
+            self.assertEqual([3], [len(shard) for shard in partitioned if shard])
+
+    def test_colliding(self) -> None:
+        """Test that sharded results are the same as unsharded results for colliding texts."""
+        cases: list[tuple[Implementation, dict[str, Any]]] = [
+            ("dict", {}),
+            ("trie", {}),
+            ("aho-corasick", {"overlapping": True}),
+        ]
+        partitions: list[ShardPartition] = ["prefix", "text"]
+        for implementation, kwargs in cases:
+            expected = make_grounder(COLLIDING, implementation=implementation, **kwargs)
+            for partition, shards in itertools.product(partitions, (2, 3, 5)):
+                with (
+                    self.subTest(implementation=implementation, partition=partition, shards=shards),
+                    ShardedGrounder(
+                        COLLIDING,
+                        shards=shards,
+                        partition=partition,
+                        implementation=implementation,
+                        **kwargs,
+                    ) as grounder,
+                ):
+                    self.assertEqual(
+                        expected.get_matches_batch(QUERIES), grounder.get_matches_batch(QUERIES)
+                    )
+                    if implementation == "aho-corasick":
+                        # only overlapping annotators give the same annotations, since
+                        # the others keep the longest match in each shard
+                        self.assertEqual(
+                            expected.annotate_batch(DOCUMENTS), grounder.annotate_batch(DOCUMENTS)
+                        )
+
+    def test_grounder(self) -> None:
+        """Test scatter-gather across shards."""
+        for partition in ("prefix", "text"):
+            with (
+                self.subTest(partition=partition),
+                ShardedGrounder(
+                    LITERAL_MAPPINGS, shards=3, partition=partition, implementation="dict"
+                ) as grounder,
+            ):
+                self.assertTrue(grounder.not_empty())
+                self.assertEqual(
+                    {ALZHEIMER_REFERENCE, DOID_REFERENCE},
+                    {match.reference for match in grounder.get_matches("Alzheimer's disease")},
+                )
+                self.assertEqual(
+                    [[ALZHEIMER_REFERENCE], [HEART_REFERENCE], []],
+                    [
+                        [match.reference for match in matches]
+                        for matches in grounder.get_matches_batch(
+                            ["alzheimer disease", "heart", "lung"], namespaces=["MESH", "UBERON"]
+                        )
+                    ],
+                )
+
+                annotations = grounder.annotate("The heart and Alzheimer's disease.")
+                self.assertEqual(
+                    [(4, 9), (14, 33), (14, 33)], [(a.start, a.end) for a in annotations]
+                )
+                self.assertEqual(
+                    {ALZHEIMER_REFERENCE, DOID_REFERENCE},
+                    {a.reference for a in annotations[1:]},
+                )
+                self.assertEqual(
+                    [1, 0], [len(a) for a in grounder.annotate_batch(["heart", "lung"])]
+                )
+
+    def test_namespaces(self) -> None:
+        """Test that shards without the requested prefixes aren't queried."""
+        with ShardedGrounder(LITERAL_MAPPINGS, shards=3, implementation="dict") as grounder:
+            self.assertEqual(
+                [DOID_REFERENCE],
+                [
+                    match.reference
+                    for match in grounder.get_matches("Alzheimer's disease", namespaces=["DOID"])
+                ],
+            )
+            self.assertEqual([], grounder.get_matches_batch(["heart"], namespaces=["GO"])[0])
+
+            # shards are in other processes, so they can't be updated in place
+            with self.assertRaises(NotImplementedError):
+                grounder.add_literal_mappings([LM_3])
+
+    def test_merge(self) -> None:
+        """Test that results for the same reference from several shards are deduplicated."""
+        self.assertEqual(
+            [
+                Match(reference=ALZHEIMER_REFERENCE, score=0.9),
+                Match(reference=DOID_REFERENCE, score=0.5),
+            ],
+            _merge_shard_matches(
+                [
+                    [Match(reference=ALZHEIMER_REFERENCE, score=0.8)],
+                    [
+                        Match(reference=ALZHEIMER_REFERENCE, score=0.9),
+                        Match(reference=DOID_REFERENCE, score=0.5),
+                    ],
+                ]
+            ),
+        )
+
+        text = "Alzheimer's disease"
+        self.assertEqual(
+            [(0, 19, ALZHEIMER_REFERENCE, 0.9), (0, 19, DOID_REFERENCE, 0.5)],
+            [
+                (a.start, a.end, a.reference, a.score)
+                for a in _merge_shard_annotations(
+                    [
+                        [
+                            Annotation(
+                                text=text,
+                                start=0,
+                                end=19,
+                                match=Match(reference=ALZHEIMER_REFERENCE, score=score),
+                            )
+                            for score in (0.8, 0.9)
+                        ],
+                        [
+                            Annotation(
+                                text=text,
+                                start=0,
+                                end=19,
+                                match=Match(reference=DOID_REFERENCE, score=0.5),
+                            )
+                        ],
+                    ]
+                )
+            ],
+        )
+
+    def test_finalize(self) -> None:
+        """Test that worker processes are shut down when the grounder is garbage collected."""
+        grounder = ShardedGrounder(LITERAL_MAPPINGS, shards=2, implementation="dict")
+        self.assertEqual(1, len(grounder.get_matches("heart")))
+        finalizer = grounder._finalizer
+        self.assertTrue(finalizer.alive)
+        del grounder
+        gc.collect()
+        self.assertFalse(finalizer.alive)
@@ -0,0 +1,74 @@
+"""Tests for the TF-IDF matcher."""
+
+import importlib.util
+import unittest
+
+from curies import NamedReference
+from curies import vocabulary as v
+
+from ssslm import LiteralMapping
+from ssslm.ner import DictMatcher, TfidfMatcher
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+R1 = NamedReference(prefix="p1", identifier="1", name="one")
+R2 = NamedReference(prefix="p2", identifier="2", name="two")
+
+
+@unittest.skipUnless(
+    all(importlib.util.find_spec(name) for name in ["numpy", "scipy"]),
+    reason="ssslm[tfidf] is required",
+)
+class TestTfidf(unittest.TestCase):
+    """Tests for the TF-IDF matcher."""
+
+    def setUp(self) -> None:
+        """Set up the test case with a matcher."""
+        self.literal_mappings = [
+            LM_1,
+            LM_2,
+            LM_3,
+            LiteralMapping(reference=R1, text="Parkinson disease", predicate=v.has_label),
+            LiteralMapping(reference=R2, text="purkinje cell", predicate=v.has_label),
+        ]
+        self.matcher = TfidfMatcher.from_literal_mappings(self.literal_mappings)
+
+    def test_exact(self) -> None:
+        """Test that exact matches get the same score as the dictionary matcher."""
+        dict_matcher = DictMatcher.from_literal_mappings(self.literal_mappings)
+        for text in ["Parkinson disease", "PURKINJE  cell", "Alzheimer's disease"]:
+            with self.subTest(text=text):
+                expected = dict_matcher.get_best_match(text, strict=True)
+                match = self.matcher.get_best_match(text, strict=True)
+                self.assertEqual(expected.reference, match.reference)
+                self.assertAlmostEqual(expected.score, match.score)
+
+    def test_approximate(self) -> None:
+        """Test approximate matching."""
+        match = self.matcher.get_best_match("alzheimers diseases", strict=True)
+        self.assertEqual(ALZHEIMER_REFERENCE, match.reference)
+        self.assertLess(match.score, 0.8)
+
+        self.assertEqual(R2, self.matcher.get_best_match("purkinje cells", strict=True).reference)
+        self.assertIsNone(self.matcher.get_best_match("hippocampus"))
+
+    def test_batch(self) -> None:
+        """Test batch matching is the same as matching one at a time."""
+        texts = ["alzheimers disease", "parkinsons", "purkinje cells", "hippocampus", ""]
+        self.assertEqual(
+            [self.matcher.get_matches(text) for text in texts],
+            self.matcher.get_matches_batch(texts),
+        )
+
+    def test_top_k(self) -> None:
+        """Test limiting the number of candidates."""
+        matcher = TfidfMatcher.from_literal_mappings(
+            self.literal_mappings, top_k=1, min_similarity=0.0
+        )
+        matches = matcher.get_matches("disease")
+        self.assertEqual(1, len(matches))
+
+    def test_filters(self) -> None:
+        """Test filtering by namespace."""
+        matcher = TfidfMatcher.from_literal_mappings(self.literal_mappings, min_similarity=0.2)
+        matches = matcher.get_matches("alzheimer disease", namespaces=["p1"])
+        self.assertEqual([R1], [match.reference for match in matches])
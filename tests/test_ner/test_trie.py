@@ -0,0 +1,86 @@
+"""Tests for the token trie grounder."""
+
+from curies import NamedReference
+
+from ssslm import LiteralMapping, make_grounder
+from ssslm.ner import RegexTokenizer, TrieGrounder
+from tests import cases
+from tests.cases import ALZHEIMER_REFERENCE, LM_1, LM_2, LM_3
+
+R1 = NamedReference(prefix="p1", identifier="1", name="one")
+R2 = NamedReference(prefix="p2", identifier="2", name="two")
+R3 = NamedReference(prefix="p3", identifier="3", name="three")
+
+
+class TrieTestCase(cases.BaseNERTestCase):
+    """Test the token trie grounder."""
+
+    def test_tokenizer(self) -> None:
+        """Test the regular expression tokenizer."""
+        tokenizer = RegexTokenizer()
+        self.assertEqual([(0, 3), (3, 4), (4, 5), (6, 9)], tokenizer("Alz's dis"))
+
+        tokenizer = RegexTokenizer(r"\S+")
+        self.assertEqual([(0, 5), (6, 9)], tokenizer("Alz's dis"))
+
+    def test_annotate(self) -> None:
+        """Test annotation."""
+        grounder = make_grounder([LM_1, LM_2, LM_3], implementation="trie")
+        self.assertIsInstance(grounder, TrieGrounder)
+        self.assert_ner_alzheimer(grounder)
+
+        text = "ALZHEIMER'S disease and Alzheimer's disease"
+        annotations = grounder.annotate(text)
+        self.assertEqual(
+            [(0, 19), (24, 43)], [(annotation.start, annotation.end) for annotation in annotations]
+        )
+        self.assertEqual({ALZHEIMER_REFERENCE}, {a.reference for a in annotations})
+
+    def test_longest_match(self) -> None:
+        """Test that overlaps are resolved to the leftmost, longest match."""
+        literal_mappings = [
+            LiteralMapping(reference=R1, text="lung"),
+            LiteralMapping(reference=R2, text="lung cancer"),
+            LiteralMapping(reference=R3, text="cancer cell"),
+        ]
+        grounder = TrieGrounder.from_literal_mappings(literal_mappings)
+        annotations = grounder.annotate("A lung cancer cell in the lung")
+        self.assertEqual(
+            [(R2, 2, 13), (R1, 26, 30)], [(a.reference, a.start, a.end) for a in annotations]
+        )
+
+        # if the longest match gets filtered, fall back to a shorter one
+        annotations = grounder.annotate("lung cancer cell", namespaces=["p1", "p3"])
+        self.assertEqual(
+            [(R1, 0, 4), (R3, 5, 16)], [(a.reference, a.start, a.end) for a in annotations]
+        )
+
+    def test_custom_tokenizer(self) -> None:
+        """Test using a custom tokenizer."""
+        grounder = TrieGrounder.from_literal_mappings(
+            [LiteralMapping(reference=R1, text="il-6")], tokenizer=RegexTokenizer(r"\S+")
+        )
+        self.assertEqual(
+            [(R1, 9, 13)],
+            [(a.reference, a.start, a.end) for a in grounder.annotate("Elevated IL-6 levels")],
+        )
+        self.assertEqual([], grounder.annotate("Elevated IL - 6 levels"))
+
+    def test_colliding_tokens(self) -> None:
+        """Test that texts with the same tokens are all found by annotation."""
+        literal_mappings = [
+            LiteralMapping(reference=R1, text="IL-6"),
+            LiteralMapping(reference=R2, text="IL - 6"),
+        ]
+        grounder = TrieGrounder.from_literal_mappings(literal_mappings)
+        self.assertEqual([R1], [m.reference for m in grounder.get_matches("IL-6")])
+        self.assertEqual(
+            {R1, R2},
+            {a.reference for a in grounder.annotate("we saw IL-6 here")},
+        )
+        # adding a text with the same tokens doesn't hide the existing ones
+        grounder = TrieGrounder.from_literal_mappings(literal_mappings[:1])
+        grounder.add_literal_mappings([LiteralMapping(reference=R3, text="il - 6")])
+        self.assertEqual({R1, R3}, {a.reference for a in grounder.annotate("we saw IL-6 here")})
+        grounder.remove_literal_mappings([LiteralMapping(reference=R3, text="il - 6")])
+        self.assertEqual([R1], [a.reference for a in grounder.annotate("we saw IL-6 here")])
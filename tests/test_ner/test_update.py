@@ -0,0 +1,212 @@
+"""Tests for adding and removing literal mappings in place."""
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from curies import NamedReference
+from curies import vocabulary as v
+
+import ssslm
+from ssslm import LiteralMapping
+from ssslm.ner import (
+    AhoCorasickGrounder,
+    CachedGrounder,
+    DictGrounder,
+    DictMatcher,
+    EmbeddingMatcher,
+    EnsembleMatcher,
+    FuzzyMatcher,
+    MinHashMatcher,
+    TfidfMatcher,
+    TrieGrounder,
+)
+from tests.cases import LM_1, LM_2, LM_3, TEXT
+
+DOID_REFERENCE = NamedReference(prefix="DOID", identifier="10652", name="Alzheimer's disease")
+APOE_REFERENCE = NamedReference(prefix="hgnc", identifier="613", name="APOE")
+HUMAN = NamedReference(prefix="ncbitaxon", identifier="9606", name="Homo sapiens")
+
+BASE = [
+    LM_1,
+    LM_2,
+    LiteralMapping(reference=DOID_REFERENCE, text="Alzheimer disease", predicate=v.has_label),
+    LiteralMapping(reference=APOE_REFERENCE, text="APOE", taxon=HUMAN),
+]
+ADDITIONS = [
+    LM_3,
+    # the same text with a different predicate, which changes the order of entries
+    LiteralMapping(reference=DOID_REFERENCE, text="alzheimer disease", predicate=v.has_label),
+    LiteralMapping(reference=APOE_REFERENCE, text="APOE e4 mutation", taxon=HUMAN),
+    LiteralMapping(reference=DOID_REFERENCE, text="risk for alzheimers"),
+]
+REMOVALS = [
+    LM_1,
+    ADDITIONS[2],
+    # this isn't in the index, so it's skipped
+    LiteralMapping(reference=DOID_REFERENCE, text="nope"),
+]
+QUERIES = [
+    "alzheimer disease",
+    "Alzheimer's disease",
+    "alzheimers disease",
+    "APOE",
+    "apoe e4 mutation",
+    "risk for alzheimers",
+    "nope",
+]
+DOCUMENTS = [TEXT, "APOE e4 mutation and risk for alzheimers.", "Alzheimer disease"]
+
+
+def _remove(literal_mappings: list[LiteralMapping[Any]]) -> list[LiteralMapping[Any]]:
+    return [
+        literal_mapping for literal_mapping in literal_mappings if literal_mapping not in REMOVALS
+    ]
+
+
+class TestUpdate(unittest.TestCase):
+    """Tests for adding and removing literal mappings in place."""
+
+    def assert_consistent(
+        self, cls: type[DictMatcher[Any]], *, places: int | None = None, **kwargs: Any
+    ) -> None:
+        """Test that updating a matcher gives the same results as rebuilding it."""
+        matcher = cls.from_literal_mappings(BASE, **kwargs)
+        matcher.add_literal_mappings(ADDITIONS)
+        expected = cls.from_literal_mappings(BASE + ADDITIONS, **kwargs)
+        self.assertEqual(expected._index, matcher._index)
+        self.assert_same_results(expected, matcher, places=places)
+
+        matcher.remove_literal_mappings(REMOVALS)
+        expected = cls.from_literal_mappings(_remove(BASE + ADDITIONS), **kwargs)
+        self.assertEqual(expected._index, matcher._index)
+        self.assert_same_results(expected, matcher, places=places)
+
+        # removed texts can be added back
+        matcher.add_literal_mappings(REMOVALS[:2])
+        expected = cls.from_literal_mappings(_remove(BASE + ADDITIONS) + REMOVALS[:2], **kwargs)
+        self.assert_same_results(expected, matcher, places=places)
+
+    def assert_same_results(
+        self, expected: DictMatcher[Any], matcher: DictMatcher[Any], *, places: int | None = None
+    ) -> None:
+        """Test that two matchers give the same matches and annotations.
+
+        :param places: If given, scores are compared after rounding to this many decimal
+            places, for matchers whose scores depend on the order of texts in the index
+        """
+        for text in [*QUERIES, "alzheimer diseese", "apoe e4 mutaton"]:
+            with self.subTest(text=text):
+                if places is None:
+                    self.assertEqual(expected.get_matches(text), matcher.get_matches(text))
+                else:
+                    self.assertEqual(
+                        [(m.reference, round(m.score, places)) for m in expected.get_matches(text)],
+                        [(m.reference, round(m.score, places)) for m in matcher.get_matches(text)],
+                    )
+        if isinstance(expected, ssslm.Grounder) and isinstance(matcher, ssslm.Grounder):
+            self.assertEqual(expected.annotate_batch(DOCUMENTS), matcher.annotate_batch(DOCUMENTS))
+
+    def test_dict(self) -> None:
+        """Test updating dictionary-based matchers and grounders."""
+        for cls in [DictMatcher, DictGrounder, AhoCorasickGrounder, TrieGrounder, FuzzyMatcher]:
+            with self.subTest(cls=cls.__name__):
+                self.assert_consistent(cls)
+        self.assert_consistent(AhoCorasickGrounder, overlapping=True)
+
+    def test_aho_corasick(self) -> None:
+        """Test that only new texts are compiled into the automaton for added texts."""
+        grounder = AhoCorasickGrounder.from_literal_mappings(BASE)
+        grounder.add_literal_mappings(ADDITIONS)
+        self.assertEqual({"apoe e4 mutation", "risk for alzheimers"}, grounder._added_keys)
+        grounder.remove_literal_mappings(REMOVALS)
+        self.assertEqual({"risk for alzheimers"}, grounder._added_keys)
+        self.assertIn("apoe", grounder._automaton)
+        self.assertNotIn("apo", grounder._automaton)
+
+    def test_wrapped(self) -> None:
+        """Test that wrappers update the wrapped matcher and clear their caches."""
+        grounder = CachedGrounder(grounder=DictGrounder.from_literal_mappings(BASE))
+        self.assertEqual([], grounder.get_matches("risk for alzheimers"))
+        self.assertEqual([], grounder.annotate("risk for alzheimers"))
+        grounder.add_literal_mappings(ADDITIONS)
+        self.assertEqual(
+            [DOID_REFERENCE], [m.reference for m in grounder.get_matches("risk for alzheimers")]
+        )
+        self.assertEqual(1, len(grounder.annotate("risk for alzheimers")))
+        grounder.remove_literal_mappings(ADDITIONS)
+        self.assertEqual([], grounder.get_matches("risk for alzheimers"))
+
+        with self.assertRaises(NotImplementedError):
+            EnsembleMatcher([grounder]).add_literal_mappings(ADDITIONS)
+
+    @unittest.skipUnless(importlib.util.find_spec("scipy"), reason="ssslm[tfidf] is required")
+    def test_tfidf(self) -> None:
+        """Test updating a TF-IDF matcher, which re-vectorizes all texts."""
+        self.assert_consistent(TfidfMatcher, places=10)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), reason="ssslm[minhash] is required")
+    def test_minhash(self) -> None:
+        """Test updating a MinHash matcher, which only computes signatures for new texts."""
+        self.assert_consistent(MinHashMatcher, min_similarity=0.3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "index.npz"
+            matcher = MinHashMatcher.from_literal_mappings(BASE, path=path)
+            matcher.add_literal_mappings(ADDITIONS)
+            matcher.remove_literal_mappings(REMOVALS)
+            # the stored index is for the original texts until it's saved again
+            with self.assertRaises(ValueError):
+                MinHashMatcher(dict(matcher._index), path=path)
+            matcher.save(path)
+            loaded = MinHashMatcher(dict(matcher._index), path=path)
+            self.assert_same_results(matcher, loaded)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), reason="ssslm[embedding] is required")
+    def test_embedding(self) -> None:
+        """Test updating an embedding matcher, which only embeds new texts."""
+        import numpy as np
+
+        from tests.test_ner.test_embedding import hashing_encoder
+
+        # added vectors are compared separately from stored vectors, so the similarities
+        # differ by floating point error
+        self.assert_consistent(
+            EmbeddingMatcher, encoder=hashing_encoder, min_similarity=0.3, places=6
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "vectors.npy"
+            matcher = EmbeddingMatcher.from_literal_mappings(
+                BASE, encoder=hashing_encoder, path=path
+            )
+            matcher.add_literal_mappings(ADDITIONS)
+            matcher.remove_literal_mappings(REMOVALS)
+            expected = EmbeddingMatcher.from_literal_mappings(
+                _remove(BASE + ADDITIONS), encoder=hashing_encoder
+            )
+            self.assert_same_results(expected, matcher, places=6)
+            # the stored vectors aren't loaded into memory, and removed rows are masked
+            self.assertIsInstance(matcher._vectors, np.memmap)
+            self.assertEqual(
+                len(matcher._keys), len(matcher._vectors) + len(matcher._added_vectors)
+            )
+            self.assertEqual(len(matcher._keys) - len(matcher._index), matcher._removed_rows.sum())
+            # the stored vectors are for the original texts until they're saved again
+            with self.assertRaises(ValueError):
+                EmbeddingMatcher(dict(matcher._index), encoder=hashing_encoder, path=path)
+            matcher.save(path)
+            loaded = EmbeddingMatcher(dict(matcher._index), encoder=hashing_encoder, path=path)
+            self.assert_same_results(matcher, loaded, places=6)
+            self.assertEqual(len(matcher._index), len(loaded._vectors))
+
+        # added texts are assigned to existing clusters
+        matcher = EmbeddingMatcher.from_literal_mappings(
+            BASE, encoder=hashing_encoder, clusters=2, probes=2
+        )
+        matcher.add_literal_mappings(ADDITIONS)
+        matcher.remove_literal_mappings(REMOVALS)
+        self.assertEqual(len(matcher._keys), len(matcher._cluster_rows))
+        self.assertEqual(DOID_REFERENCE, matcher.get_matches("risk for alzheimers")[0].reference)